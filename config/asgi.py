@@ -0,0 +1,30 @@
+# ruff: noqa
+"""
+ASGI config for PanaSystem project.
+
+This module contains the ASGI application used by the uvicorn workers of
+gunicorn (see compose/production/django/start, with DJANGO_SERVER=asgi).
+It should expose a module-level variable named ``application``.
+
+Synchronous views, the DRF viewsets, run in a thread of the worker. The
+async views under ``api/v1/async/`` run on the event loop, so a worker
+keeps serving other requests while their queries run or while a slow
+client downloads a response.
+
+"""
+
+import os
+import sys
+from pathlib import Path
+
+from django.core.asgi import get_asgi_application
+
+# This allows easy placement of apps within the interior
+# panasystem directory.
+BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
+sys.path.append(str(BASE_DIR / "panasystem"))
+# We defer to a DJANGO_SETTINGS_MODULE already in the environment.
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
+
+# This application object is used by any ASGI server configured to use this file.
+application = get_asgi_application()
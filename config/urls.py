@@ -11,6 +11,11 @@ from django.views import defaults as default_views
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+# Views
+from panasystem.customers.views import AsyncCustomerSearchView
+from panasystem.products.views import AsyncBarcodeView
+from panasystem.sales.views import AsyncSaleListView, AsyncSaleTotalsView
+
 urlpatterns = [
     # Django Admin, use {% url 'admin:index' %}
     path(settings.ADMIN_URL, admin.site.urls),
@@ -23,6 +28,11 @@ urlpatterns = [
 urlpatterns += [
     # API base url
     path("api/v1/", include("config.api_router")),
+    # Async read endpoints, they do not hold a worker while querying under ASGI
+    path("api/v1/async/sales/", AsyncSaleListView.as_view(), name="async-sales"),
+    path("api/v1/async/sales/totals/", AsyncSaleTotalsView.as_view(), name="async-sales-totals"),
+    path("api/v1/async/products/barcode/<str:barcode>/", AsyncBarcodeView.as_view(), name="async-products-barcode"),
+    path("api/v1/async/customers/", AsyncCustomerSearchView.as_view(), name="async-customers"),
     # JWT token endpoints
     # path("api/v1/token/", TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path("api/v1/token/refresh/", TokenRefreshView.as_view(), name='token_refresh'),
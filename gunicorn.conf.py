@@ -0,0 +1,72 @@
+# ruff: noqa
+"""Gunicorn configuration for production, see the Deployment section of the README.
+
+Every setting can be overridden with an environment variable, in the
+production env file of the django service.
+"""
+import multiprocessing
+import os
+import sys
+
+
+def env_int(name, default):
+    return int(os.environ.get(name) or default)
+
+
+def env_bool(name, default):
+    value = os.environ.get(name)
+    if not value:
+        return default
+    return value.lower() in ("true", "1", "yes")
+
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+
+# Two processes per core plus one, with threads so a worker serving a
+# slow query or a slow client still answers other requests. Each thread
+# keeps its own database connection (CONN_MAX_AGE), so workers * threads
+# must stay under the max_connections of PostgreSQL.
+workers = env_int("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1)
+threads = env_int("GUNICORN_THREADS", 4)
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+
+# Import Django once in the master, the workers are forked from it ready
+# to serve and share the memory of the imported code.
+preload_app = env_bool("GUNICORN_PRELOAD", True)
+
+# Replace each worker after a number of requests, with jitter so they do
+# not all restart at once, to bound the memory a long lived worker grows.
+max_requests = env_int("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = env_int("GUNICORN_MAX_REQUESTS_JITTER", 100)
+
+keepalive = env_int("GUNICORN_KEEPALIVE", 5)
+timeout = env_int("GUNICORN_TIMEOUT", 30)
+graceful_timeout = env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+
+
+def _close_connections():
+    # Without preload_app Django is not loaded yet, there is nothing to close.
+    if "django.db" not in sys.modules:
+        return
+    from django.core.cache import close_caches
+    from django.db import connections
+
+    connections.close_all()
+    close_caches()
+
+
+def pre_fork(server, worker):
+    """Close the connections the master opened while preloading.
+
+    A connection inherited by the workers would be one socket shared by
+    several processes.
+    """
+    _close_connections()
+
+
+def post_fork(server, worker):
+    """Start the worker without database or cache connections, they open on first use."""
+    _close_connections()
@@ -0,0 +1,111 @@
+# ruff: noqa
+"""Load test of concurrent connections against running servers.
+
+Opens ``--connections`` clients at once against each ``--url`` for
+``--duration`` seconds. With ``--slow`` every client reads the responses
+at that many bytes per second, like the POS phones on rural mobile
+links, which is what holds the sync workers. Reports per URL the
+requests served, errors and timeouts, and the latency percentiles.
+
+Compare the WSGI and the ASGI setup by starting both with the same
+number of workers, for example:
+
+    gunicorn config.wsgi -w 4 -b 127.0.0.1:8000
+    gunicorn config.asgi -w 4 -k uvicorn.workers.UvicornWorker -b 127.0.0.1:8001
+    python loadtest.py --token $ACCESS --connections 200 --slow 2048 \\
+        --url http://127.0.0.1:8000/api/v1/sales/ \\
+        --url http://127.0.0.1:8001/api/v1/async/sales/
+
+Only the standard library is used, so it runs from any machine.
+"""
+import argparse
+import asyncio
+import math
+import ssl
+import time
+from urllib.parse import urlsplit
+
+
+def percentile(ordered, percent):
+    """Return the nearest-rank percentile of sorted values."""
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def summarize(url, results, elapsed):
+    """Return the report line of a URL from (status, seconds) results."""
+    latencies = sorted(seconds for status, seconds in results if status == 200)
+    errors = sum(1 for status, _ in results if status not in (200, None))
+    timeouts = sum(1 for status, _ in results if status is None)
+    line = f"{url}\n  {len(latencies)} ok ({len(latencies) / elapsed:.1f}/s), {errors} errors, {timeouts} timeouts"
+    if latencies:
+        line += "\n  " + ", ".join(
+            f"p{percent} {percentile(latencies, percent) * 1000:.0f} ms" for percent in (50, 95, 99)
+        )
+    return line
+
+
+async def request(url, token, slow, timeout):
+    """Make a GET request, reading the response at ``slow`` bytes per second."""
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    context = ssl.create_default_context() if parts.scheme == "https" else None
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(parts.hostname, port, ssl=context), timeout)
+    try:
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        headers = f"GET {path or '/'} HTTP/1.1\r\nHost: {parts.netloc}\r\nConnection: close\r\n"
+        if token:
+            headers += f"Authorization: Bearer {token}\r\n"
+        writer.write((headers + "\r\n").encode())
+        await writer.drain()
+
+        status_line = await asyncio.wait_for(reader.readline(), timeout)
+        status = int(status_line.split()[1])
+        chunk = max(slow // 10, 1) if slow else 65536
+        while True:
+            data = await asyncio.wait_for(reader.read(chunk), timeout)
+            if not data:
+                return status
+            if slow:
+                await asyncio.sleep(len(data) / slow)
+    finally:
+        writer.close()
+
+
+async def client(url, token, slow, timeout, deadline, results):
+    """Make requests one after the other until the deadline."""
+    while time.monotonic() < deadline:
+        start = time.monotonic()
+        try:
+            status = await request(url, token, slow, timeout)
+        except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+            status = None
+        results.append((status, time.monotonic() - start))
+
+
+async def run(url, connections, duration, token, slow, timeout):
+    """Load a URL and return its report line."""
+    results = []
+    start = time.monotonic()
+    await asyncio.gather(*[
+        client(url, token, slow, timeout, start + duration, results) for _ in range(connections)
+    ])
+    return summarize(url, results, time.monotonic() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test of concurrent connections.")
+    parser.add_argument("--url", action="append", required=True, help="URL to load, repeat to compare servers.")
+    parser.add_argument("--connections", type=int, default=100, help="Clients at once (100 by default).")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds per URL (30 by default).")
+    parser.add_argument("--token", help="Access token sent as 'Authorization: Bearer'.")
+    parser.add_argument("--slow", type=int, default=0, help="Bytes per second each client reads, 0 for full speed.")
+    parser.add_argument("--timeout", type=float, default=30, help="Seconds before a request times out (30 by default).")
+    args = parser.parse_args()
+    for url in args.url:
+        print(asyncio.run(run(url, args.connections, args.duration, args.token, args.slow, args.timeout)))
+
+
+if __name__ == "__main__":
+    main()
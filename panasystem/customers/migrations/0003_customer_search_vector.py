@@ -0,0 +1,47 @@
+# Generated by Django 4.2.11 on 2026-10-17 22:41
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+FORWARD = """
+CREATE TRIGGER customer_search_vector_update
+BEFORE INSERT OR UPDATE OF name, email, celular, address ON customers_customer
+FOR EACH ROW EXECUTE FUNCTION tsvector_update_trigger(search_vector, 'pg_catalog.simple', name, email, celular, address);
+UPDATE customers_customer SET search_vector = to_tsvector('pg_catalog.simple', concat_ws(' ', name, email, celular, address));
+"""
+
+BACKWARD = "DROP TRIGGER IF EXISTS customer_search_vector_update ON customers_customer;"
+
+
+def create_trigger(apps, schema_editor):
+    """Keep the search vector up to date on every insert and update, also from bulk writes."""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(FORWARD)
+
+
+def drop_trigger(apps, schema_editor):
+    """Drop the search vector trigger."""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(BACKWARD)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_alter_customer_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Name, email, celular and address words, kept up to date by a database trigger.', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='customer_search_vector'),
+        ),
+        migrations.RunPython(create_trigger, drop_trigger),
+    ]
@@ -1,6 +1,8 @@
 """Customers models."""
 
 # Django
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 # Utilities
@@ -82,10 +84,19 @@ class Customer(PanaderiaModel):
         )
     """
 
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text='Name, email, celular and address words, kept up to date by a database trigger.'
+    )
+
     class Meta:
         """Meta options."""
         verbose_name = "Cliente"
         verbose_name_plural = "Clientes"
+        indexes = [
+            GinIndex(fields=['search_vector'], name='customer_search_vector'),
+        ]
 
     def __str__(self):
         """Return name."""
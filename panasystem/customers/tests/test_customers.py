@@ -164,4 +164,46 @@ def test_filter_customers(api_client):
     response = api_client[0].get(url, format='json')
     assert response.status_code == status.HTTP_200_OK
     assert len(response.data) == 1
-    assert response.data[0]['name'] == 'Bob'
\ No newline at end of file
+    assert response.data[0]['name'] == 'Bob'
+
+
+@pytest.mark.django_db
+def test_search_customers_word_prefix(api_client):
+    """
+    Test searching customers.
+
+    Ensures that the search matches the start of the words of the name,
+    email, celular and address, and that updates are searchable.
+    """
+    john = Customer.objects.create(name="John Doe", email="john@example.com", celular="3534111111")
+    Customer.objects.create(name="Jane Roe", address="San Martin 123")
+    url = '/api/v1/customers/?search='
+
+    response = api_client[0].get(url + 'jo', format='json')
+    assert [customer['name'] for customer in response.data] == ["John Doe"]
+    response = api_client[0].get(url + 'mart', format='json')
+    assert [customer['name'] for customer in response.data] == ["Jane Roe"]
+    response = api_client[0].get(url + '3534', format='json')
+    assert [customer['name'] for customer in response.data] == ["John Doe"]
+
+    john.name = "Johnny Smith"
+    john.save()
+    response = api_client[0].get(url + 'smi', format='json')
+    assert [customer['name'] for customer in response.data] == ["Johnny Smith"]
+
+
+@pytest.mark.django_db
+def test_async_search_customers(api_client):
+    """
+    Test searching customers through the async endpoint.
+
+    Ensures that it answers like the customers list, with the filters and
+    the ranked search.
+    """
+    Customer.objects.create(name="John Doe", email="john@example.com", city=Customer.CITY_LUCA)
+    Customer.objects.create(name="Jane Roe", address="San Martin 123", city=Customer.CITY_ARROYO_CABRAL)
+    for query in ('?search=jo', '?search=mart', '?city=ac', ''):
+        response = api_client[0].get('/api/v1/async/customers/' + query)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == api_client[0].get('/api/v1/customers/' + query).json()
+    assert [customer['name'] for customer in api_client[0].get('/api/v1/async/customers/?search=jo').json()] == ["John Doe"]
@@ -1 +1,2 @@
-from .customers import CustomerViewSet
\ No newline at end of file
+from .customers import CustomerViewSet
+from .asynchronous import AsyncCustomerSearchView
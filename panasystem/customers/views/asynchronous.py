@@ -0,0 +1,31 @@
+"""Customers async views."""
+
+# Serializers
+from panasystem.customers.serializers import CustomerSerializer
+
+# Views
+from panasystem.customers.views.customers import CustomerViewSet
+
+# Utilities
+from panasystem.utils.views import AsyncAPIView
+
+
+class AsyncCustomerSearchView(AsyncAPIView):
+    """
+    List and search customers with the async ORM.
+
+    Same filters and search as the customers list ('?search=', best
+    matches first, at most 50), unpaginated.
+
+    Permissions:
+    - Requires the user to be authenticated.
+    """
+
+    filter_backends = CustomerViewSet.filter_backends
+    filterset_fields = CustomerViewSet.filterset_fields
+    search_fields = CustomerViewSet.search_fields
+
+    async def get(self, request, *args, **kwargs):
+        """List the customers."""
+        queryset = await self.afilter_queryset(CustomerViewSet.queryset.all())
+        return CustomerSerializer([customer async for customer in queryset], many=True).data
@@ -2,7 +2,6 @@
 
 # Django REST Framework
 from rest_framework import mixins, viewsets
-from rest_framework.filters import SearchFilter
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 
@@ -12,8 +11,14 @@ from panasystem.customers.serializers import CustomerSerializer
 # Models
 from panasystem.customers.models import Customer
 
+# Utilities
+from panasystem.utils.filters import RankedSearchFilter
+from panasystem.utils.mixins import StreamingListMixin
+from panasystem.utils.pagination import OptionalPagination
 
-class CustomerViewSet(mixins.CreateModelMixin,
+
+class CustomerViewSet(StreamingListMixin,
+                      mixins.CreateModelMixin,
                       mixins.UpdateModelMixin,
                       mixins.RetrieveModelMixin,
                       mixins.ListModelMixin,
@@ -26,7 +31,9 @@ class CustomerViewSet(mixins.CreateModelMixin,
     - Create a customer
     - List customers with filtering and search capabilities
         * Filter by 'is_active' and 'city'
-        * Search by 'name', 'email', 'celular', and 'address'
+        * Search by 'name', 'email', 'celular', and 'address' (words starting with the search, best matches first, at most 50)
+    - Paginate the list by page ('?pagination=page') or by cursor ('?pagination=cursor'), unpaginated by default
+    - Stream the whole list with '?stream=json' or '?stream=ndjson'
     - Retrieve a specific customer
     - Update a customer's details
     - Delete a customer
@@ -37,8 +44,9 @@ class CustomerViewSet(mixins.CreateModelMixin,
 
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
-    filter_backends = (DjangoFilterBackend, SearchFilter)
+    filter_backends = (DjangoFilterBackend, RankedSearchFilter)
     filterset_fields = ('is_active', 'city')
     search_fields = ('name', 'email', 'celular', 'address')
     permission_classes = [IsAuthenticated]
-    pagination_class = None
\ No newline at end of file
+    pagination_class = OptionalPagination
+    cursor_ordering = ('name', 'pk')
\ No newline at end of file
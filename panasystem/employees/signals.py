@@ -0,0 +1,18 @@
+"""Employees signals."""
+
+# Django
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+# Models
+from panasystem.employees.models import Employee
+
+# Utilities
+from panasystem.utils.versions import bump_version
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def bump_employees_version(sender, **kwargs):
+    """Invalidate the cached employees lists."""
+    bump_version(sender)
@@ -3,6 +3,10 @@
 # Pytest
 import pytest
 
+# Django
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 # Django REST Framework
 from rest_framework import status
 
@@ -127,4 +131,40 @@ def test_search_employees(api_client):
     response = api_client[0].get(url, format='json')
     assert response.status_code == status.HTTP_200_OK
     assert len(response.data) == 1
-    assert response.data[0]['name'] == 'John Doe'
\ No newline at end of file
+    assert response.data[0]['name'] == 'John Doe'
+
+
+@pytest.mark.django_db
+def test_list_employees_cached(api_client):
+    """
+    Test the cached employees list and its conditional GET.
+
+    Ensures that the list is served from the cache with its ETag and
+    Last-Modified, that a matching request gets a 304, and that a write
+    invalidates both.
+    """
+    Employee.objects.create(name="John Doe")
+    url = '/api/v1/employees/'
+    response = api_client[0].get(url, format='json')
+    assert response.status_code == status.HTTP_200_OK
+    etag = response['ETag']
+    last_modified = response['Last-Modified']
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client[0].get(url, format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert [employee['name'] for employee in response.data] == ['John Doe']
+    assert response['ETag'] == etag
+    assert not any('employees_employee' in query['sql'] for query in queries)
+
+    response = api_client[0].get(url, format='json', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response['ETag'] == etag
+    response = api_client[0].get(url, format='json', HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    api_client[0].post(url, {'name': 'Jane Doe'}, format='json')
+    response = api_client[0].get(url, format='json', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response['ETag'] != etag
+    assert len(response.data) == 2
@@ -11,8 +11,14 @@ from panasystem.employees.serializers import EmployeeSerializer
 # Models
 from panasystem.employees.models import Employee
 
+# Utilities
+from panasystem.utils.mixins import CachedListMixin, StreamingListMixin
+from panasystem.utils.pagination import OptionalPagination
 
-class EmployeeViewSet(mixins.CreateModelMixin,
+
+class EmployeeViewSet(CachedListMixin,
+                      StreamingListMixin,
+                      mixins.CreateModelMixin,
                       mixins.UpdateModelMixin,
                       mixins.RetrieveModelMixin,
                       mixins.ListModelMixin,
@@ -24,6 +30,9 @@ class EmployeeViewSet(mixins.CreateModelMixin,
     Provides the following actions:
     - Create an employee
     - List employees with search capability by 'name'
+    - Paginate the list by page ('?pagination=page') or by cursor ('?pagination=cursor'), unpaginated by default
+    - Stream the whole list with '?stream=json' or '?stream=ndjson'
+    - Cache the list until the table changes, a matching 'If-None-Match' or 'If-Modified-Since' gets a 304
     - Retrieve a specific employee
     - Update an employee's details
     - Delete an employee
@@ -37,4 +46,5 @@ class EmployeeViewSet(mixins.CreateModelMixin,
     filter_backends = (SearchFilter,)
     search_fields = ('name',)
     permission_classes = [IsAuthenticated]
-    pagination_class = None
\ No newline at end of file
+    pagination_class = OptionalPagination
+    cursor_ordering = ('name', 'pk')
\ No newline at end of file
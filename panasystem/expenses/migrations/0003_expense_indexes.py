@@ -0,0 +1,55 @@
+# Generated by Django 4.2.11 on 2026-10-17 22:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from panasystem.utils.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    # Build the indexes without locking the table against writes, on PostgreSQL.
+    atomic = False
+
+    dependencies = [
+        ('expenses', '0002_alter_expense_supplier'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='expense',
+            index=models.Index(fields=['date'], name='expense_date'),
+        ),
+        AddIndexConcurrently(
+            model_name='expense',
+            index=models.Index(fields=['category', 'date'], name='expense_category_date'),
+        ),
+        AddIndexConcurrently(
+            model_name='expense',
+            index=models.Index(fields=['employee', 'date'], name='expense_employee_date'),
+        ),
+        AddIndexConcurrently(
+            model_name='expense',
+            index=models.Index(fields=['supplier', 'date'], name='expense_supplier_date'),
+        ),
+        AddIndexConcurrently(
+            model_name='expense',
+            index=models.Index(fields=['-created', '-modified'], name='expense_created_modified'),
+        ),
+        # The (category|employee|supplier, date) indexes cover the lookups by foreign key.
+        migrations.AlterField(
+            model_name='expense',
+            name='category',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='expenses.expensecategory', verbose_name='Categoría'),
+        ),
+        migrations.AlterField(
+            model_name='expense',
+            name='employee',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='employees.employee', verbose_name='Empleado'),
+        ),
+        migrations.AlterField(
+            model_name='expense',
+            name='supplier',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='suppliers.supplier', verbose_name='Proveedor'),
+        ),
+    ]
@@ -47,13 +47,15 @@ class Expense(PanaderiaModel):
     category = models.ForeignKey(
         ExpenseCategory,
         on_delete=models.CASCADE,
-        verbose_name='Categoría'
+        verbose_name='Categoría',
+        db_index=False
     )
 
     employee = models.ForeignKey(
         'employees.Employee',
         on_delete=models.CASCADE,
-        verbose_name='Empleado'
+        verbose_name='Empleado',
+        db_index=False
     )
 
     supplier = models.ForeignKey(
@@ -61,9 +63,25 @@ class Expense(PanaderiaModel):
         on_delete=models.CASCADE,
         verbose_name='Proveedor',
         null=True,
-        blank=True
+        blank=True,
+        db_index=False
     )
 
+    class Meta(PanaderiaModel.Meta):
+        """Meta options.
+
+        Expenses are listed by date, alone or together with the category,
+        the employee or the supplier. The foreign keys are looked up through
+        those indexes, they have no index of their own.
+        """
+        indexes = [
+            models.Index(fields=['date'], name='expense_date'),
+            models.Index(fields=['category', 'date'], name='expense_category_date'),
+            models.Index(fields=['employee', 'date'], name='expense_employee_date'),
+            models.Index(fields=['supplier', 'date'], name='expense_supplier_date'),
+            models.Index(fields=['-created', '-modified'], name='expense_created_modified'),
+        ]
+
     def __str__(self):
         """Return Expense #self.pk: $self.total"""
         return f"Expense #{self.pk}: ${self.total}"
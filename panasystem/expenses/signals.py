@@ -0,0 +1,18 @@
+"""Expenses signals."""
+
+# Django
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+# Models
+from panasystem.expenses.models import ExpenseCategory
+
+# Utilities
+from panasystem.utils.versions import bump_version
+
+
+@receiver(post_save, sender=ExpenseCategory)
+@receiver(post_delete, sender=ExpenseCategory)
+def bump_expense_categories_version(sender, **kwargs):
+    """Invalidate the cached expense category lists."""
+    bump_version(sender)
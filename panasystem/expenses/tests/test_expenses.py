@@ -213,4 +213,26 @@ def test_filter_expenses(api_client):
     url = f'/api/v1/expenses/?date={expense_date.date()}'
     response = api_client[0].get(url, format='json')
     assert response.status_code == status.HTTP_200_OK
-    assert len(response.data) == 2
\ No newline at end of file
+    assert len(response.data) == 2
+
+
+@pytest.mark.django_db
+def test_list_expenses_paginated(api_client):
+    """
+    Test listing expenses with pagination.
+
+    Ensures that the list is only paginated when asked.
+    """
+    category = ExpenseCategory.objects.create(name="Utilities", description="Monthly utility bills")
+    employee = Employee.objects.create(name="John Doe")
+    for total in range(1, 26):
+        Expense.objects.create(total=total, category=category, employee=employee)
+    url = '/api/v1/expenses/'
+    response = api_client[0].get(url, format='json')
+    assert len(response.data) == 25
+    response = api_client[0].get(url + '?pagination=cursor', format='json')
+    assert len(response.data['results']) == 20
+    assert response.data['next'] is not None
+    response = api_client[0].get(url + '?pagination=page&page=2', format='json')
+    assert response.data['count'] == 25
+    assert len(response.data['results']) == 5
@@ -16,6 +16,8 @@ from panasystem.expenses.models import Expense, ExpenseCategory
 
 # Utilities
 from datetime import datetime, timedelta
+from panasystem.utils.pagination import OptionalPagination
+from panasystem.utils.mixins import CachedListMixin, StreamingListMixin
 
 
 class DateFilter(django_filters.Filter):
@@ -41,7 +43,8 @@ class ExpenseFilter(filters.FilterSet):
         fields = ['employee', 'category', 'supplier', 'date']
 
 
-class ExpenseViewSet(mixins.CreateModelMixin,
+class ExpenseViewSet(StreamingListMixin,
+                     mixins.CreateModelMixin,
                      mixins.UpdateModelMixin,
                      mixins.RetrieveModelMixin,
                      mixins.ListModelMixin,
@@ -53,6 +56,8 @@ class ExpenseViewSet(mixins.CreateModelMixin,
     Provides the following actions:
     - Create an expense
     - List expenses with filters by 'employee', 'category', 'supplier', and 'date', and search capability by 'description'
+    - Paginate the list by page ('?pagination=page') or by date cursor ('?pagination=cursor'), unpaginated by default
+    - Stream the whole list with '?stream=json' or '?stream=ndjson'
     - Retrieve a specific expense
     - Update an expense's details
     - Delete an expense
@@ -67,10 +72,12 @@ class ExpenseViewSet(mixins.CreateModelMixin,
     filterset_class = ExpenseFilter
     search_fields = ('description',)
     permission_classes = [IsAuthenticated]
-    pagination_class = None
+    pagination_class = OptionalPagination
 
 
-class ExpenseCategoryViewSet(mixins.CreateModelMixin,
+class ExpenseCategoryViewSet(CachedListMixin,
+                             StreamingListMixin,
+                             mixins.CreateModelMixin,
                              mixins.UpdateModelMixin,
                              mixins.RetrieveModelMixin,
                              mixins.ListModelMixin,
@@ -82,6 +89,9 @@ class ExpenseCategoryViewSet(mixins.CreateModelMixin,
     Provides the following actions:
     - Create an expense category
     - List expense categories
+    - Paginate the list by page ('?pagination=page') or by cursor ('?pagination=cursor'), unpaginated by default
+    - Stream the whole list with '?stream=json' or '?stream=ndjson'
+    - Cache the list until the table changes, a matching 'If-None-Match' or 'If-Modified-Since' gets a 304
     - Retrieve a specific expense category
     - Update an expense category's details
     - Delete an expense category
@@ -92,5 +102,6 @@ class ExpenseCategoryViewSet(mixins.CreateModelMixin,
 
     queryset = ExpenseCategory.objects.all()
     serializer_class = ExpenseCategorySerializer
-    pagination_class = None
+    pagination_class = OptionalPagination
+    cursor_ordering = ('name', 'pk')
     permission_classes = [IsAuthenticated]
\ No newline at end of file
@@ -4,7 +4,8 @@
 from django.contrib import admin
 
 # Model
-from panasystem.products.models.products import Product, PriceHistory, Category, Brand
+from panasystem.products.models.products import Product, PriceHistory, Category, Brand, ProductTombstone
+from panasystem.products.models.stock import StockMovement, StockSnapshot
 
 
 @admin.register(Product)
@@ -36,5 +37,43 @@ class PriceHistoryAdmin(admin.ModelAdmin):
         'modified'
     )
 
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    """Stock movement admin."""
+
+    list_display = (
+        'pk',
+        'product',
+        'kind',
+        'quantity',
+        'description',
+        'created'
+    )
+    list_filter = ('kind',)
+
+
+@admin.register(StockSnapshot)
+class StockSnapshotAdmin(admin.ModelAdmin):
+    """Stock snapshot admin."""
+
+    list_display = (
+        'pk',
+        'product',
+        'date',
+        'balance'
+    )
+
 admin.site.register(Category)
-admin.site.register(Brand)
\ No newline at end of file
+admin.site.register(Brand)
+
+
+@admin.register(ProductTombstone)
+class ProductTombstoneAdmin(admin.ModelAdmin):
+    """Product tombstone admin."""
+
+    list_display = (
+        'pk',
+        'product_pk',
+        'created'
+    )
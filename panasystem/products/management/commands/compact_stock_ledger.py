@@ -0,0 +1,48 @@
+"""Compact stock ledger command."""
+
+# Django
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.timezone import now
+
+# Services
+from panasystem.products.services import compact_stock_movements
+
+# Utilities
+from datetime import datetime, timedelta
+
+
+class Command(BaseCommand):
+    """Fold old stock movements into dated snapshots.
+
+    Meant to run periodically (e.g. from cron) so that stock-as-of-date
+    queries only read the latest snapshot and the recent movements.
+    """
+
+    help = 'Fold stock movements older than the given date into snapshots.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--before',
+            help='Fold movements created before this date (YYYY-MM-DD).'
+        )
+        parser.add_argument(
+            '--keep-days',
+            type=int,
+            default=90,
+            help='When --before is not given, keep the movements of the last N days (default: 90).'
+        )
+
+    def handle(self, *args, **options):
+        if options['before']:
+            try:
+                before = datetime.strptime(options['before'], '%Y-%m-%d')
+            except ValueError:
+                raise CommandError('Invalid date format. Use YYYY-MM-DD.') from None
+        else:
+            before = now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=options['keep_days'])
+
+        try:
+            folded = compact_stock_movements(before)
+        except ValueError as error:
+            raise CommandError(str(error)) from None
+        self.stdout.write(self.style.SUCCESS(f'Folded {folded} stock movements into snapshots before {before:%Y-%m-%d}.'))
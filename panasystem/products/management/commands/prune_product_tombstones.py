@@ -0,0 +1,22 @@
+"""Prune product tombstones command."""
+
+# Django
+from django.core.management.base import BaseCommand
+
+# Services
+from panasystem.products.services import prune_product_tombstones
+from panasystem.products.services.catalog import tombstone_days
+
+
+class Command(BaseCommand):
+    """Delete the product tombstones older than the kept days.
+
+    Catalog syncs from versions older than CATALOG_TOMBSTONE_DAYS already
+    get the full catalog, so these deletions are no longer needed.
+    """
+
+    help = 'Delete the product deletions older than CATALOG_TOMBSTONE_DAYS (90 by default).'
+
+    def handle(self, *args, **options):
+        deleted = prune_product_tombstones()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} product tombstones older than {tombstone_days()} days.'))
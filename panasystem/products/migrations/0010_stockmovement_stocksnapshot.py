@@ -0,0 +1,51 @@
+# Generated by Django 4.2.11 on 2026-10-17 22:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_alter_product_category_alter_product_supplier'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, help_text='Date time on which the object was created.', verbose_name='created at')),
+                ('modified', models.DateTimeField(auto_now=True, help_text='Date time on which the object was last modified.', verbose_name='modified at')),
+                ('date', models.DateTimeField(verbose_name='Fecha')),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Saldo')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshots', to='products.product', verbose_name='Producto')),
+            ],
+            options={
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, help_text='Date time on which the object was created.', verbose_name='created at')),
+                ('modified', models.DateTimeField(auto_now=True, help_text='Date time on which the object was last modified.', verbose_name='modified at')),
+                ('kind', models.CharField(choices=[('sal', 'Venta'), ('adj', 'Ajuste'), ('ret', 'Devolución'), ('dlv', 'Entrega de proveedor')], max_length=3, verbose_name='Tipo')),
+                ('quantity', models.DecimalField(decimal_places=2, help_text='Positiva si ingresa stock, negativa si egresa.', max_digits=10, verbose_name='Cantidad')),
+                ('description', models.TextField(blank=True, max_length=100, null=True, verbose_name='Descripción')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='products.product', verbose_name='Producto')),
+            ],
+            options={
+                'ordering': ['-created'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='stocksnapshot',
+            constraint=models.UniqueConstraint(fields=('product', 'date'), name='stocksnapshot_product_date'),
+        ),
+        migrations.AddIndex(
+            model_name='stockmovement',
+            index=models.Index(fields=['product', 'created'], name='stockmovement_product_created'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+
+def create_opening_balances(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    StockMovement = apps.get_model("products", "StockMovement")
+
+    # Record the current stock of every tracked product as the first
+    # movement of the ledger, so the ledger balance matches current_stock.
+    StockMovement.objects.bulk_create(
+        [
+            StockMovement(
+                product_id=product_id,
+                kind="adj",
+                quantity=current_stock,
+                description="Stock inicial",
+            )
+            for product_id, current_stock in Product.objects.filter(
+                current_stock__gt=0
+            ).values_list("id", "current_stock")
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0010_stockmovement_stocksnapshot"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_opening_balances, migrations.RunPython.noop),
+    ]
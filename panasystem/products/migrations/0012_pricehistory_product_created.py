@@ -0,0 +1,22 @@
+# Generated by Django 4.2.11 on 2026-10-17 22:36
+
+from django.db import migrations, models
+
+from panasystem.utils.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    # Build the index without locking the table against writes, on PostgreSQL.
+    atomic = False
+
+    dependencies = [
+        ('products', '0011_stock_opening_balances'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='pricehistory',
+            index=models.Index(fields=['product', 'created'], name='pricehistory_product_created'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.11 on 2026-10-17 22:41
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+FORWARD = """
+CREATE TRIGGER product_search_vector_update
+BEFORE INSERT OR UPDATE OF name, barcode ON products_product
+FOR EACH ROW EXECUTE FUNCTION tsvector_update_trigger(search_vector, 'pg_catalog.simple', name, barcode);
+UPDATE products_product SET search_vector = to_tsvector('pg_catalog.simple', concat_ws(' ', name, barcode));
+"""
+
+BACKWARD = "DROP TRIGGER IF EXISTS product_search_vector_update ON products_product;"
+
+
+def create_trigger(apps, schema_editor):
+    """Keep the search vector up to date on every insert and update, also from bulk writes."""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(FORWARD)
+
+
+def drop_trigger(apps, schema_editor):
+    """Drop the search vector trigger."""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(BACKWARD)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0012_pricehistory_product_created'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Name and barcode words, kept up to date by a database trigger.', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='product_search_vector'),
+        ),
+        migrations.RunPython(create_trigger, drop_trigger),
+    ]
@@ -1 +1,2 @@
-from .products import Product, PriceHistory, Category, Brand
\ No newline at end of file
+from .products import Product, PriceHistory, Category, Brand, ProductTombstone
+from .stock import StockMovement, StockSnapshot
@@ -1,6 +1,8 @@
 """Products models."""
 
 # Django
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 # Utilities
@@ -114,22 +116,37 @@ class Product(PanaderiaModel):
         null=True
     )
 
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text='Name and barcode words, kept up to date by a database trigger.'
+    )
+
+    class Meta(PanaderiaModel.Meta):
+        """Meta options."""
+        indexes = [
+            GinIndex(fields=['search_vector'], name='product_search_vector'),
+            models.Index(fields=['modified'], name='product_modified'),
+        ]
+
     def update_price(self, public_price, wholesale_price):
-        """Update price and create price history."""
+        """Update price and create price history.
+
+        Only the prices are saved, the stock is written by the stock
+        services alone so a concurrent sale is not overwritten.
+        """
         self.public_price = public_price
         self.wholesale_price = wholesale_price
         PriceHistory.objects.create(product=self, public_price=public_price, wholesale_price=wholesale_price)
-        self.save()
+        self.save(update_fields=['public_price', 'wholesale_price', 'modified'])
 
     def update_stock(self, quantity):
         """Update current stock after creating a sale."""
-        if self.current_stock is not None:
-            if self.current_stock >= quantity:
-                self.current_stock -= quantity
-                self.save()
-            else:
-                raise ValueError("Stock insuficiente para actualizar.")
-        
+        from panasystem.products.services import decrement_stock
+
+        decrement_stock({self.pk: quantity})
+        self.refresh_from_db(fields=['current_stock', 'modified'])
+
     def get_brand_name(self):
         """Get brand name."""
         return self.brand.name if self.brand else None
@@ -162,4 +179,28 @@ class PriceHistory(PanaderiaModel):
 
     class Meta:
         """Meta options."""
-        ordering = ['-created']
\ No newline at end of file
+        ordering = ['-created']
+        indexes = [
+            models.Index(fields=['product', 'created'], name='pricehistory_product_created'),
+        ]
+
+
+class ProductTombstone(PanaderiaModel):
+    """Product tombstone model.
+
+    Records the deletion of a product so catalog clients syncing changes
+    since a version also drop it.
+    """
+
+    product_pk = models.BigIntegerField('Producto')
+
+    class Meta:
+        """Meta options."""
+        ordering = ['-created']
+        indexes = [
+            models.Index(fields=['created'], name='producttombstone_created'),
+        ]
+
+    def __str__(self):
+        """Return product pk and deletion date."""
+        return f'{self.product_pk} - {self.created}'
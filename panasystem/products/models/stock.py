@@ -0,0 +1,100 @@
+"""Stock models."""
+
+# Django
+from django.db import models
+
+# Utilities
+from panasystem.utils.models import PanaderiaModel
+
+
+class StockMovement(PanaderiaModel):
+    """Stock movement model.
+
+    Append-only ledger of every change to a product's stock. The sum of
+    the movements of a product, plus its latest snapshot, matches the
+    materialized ``Product.current_stock``.
+    """
+
+    KIND_SALE = 'sal'
+    KIND_ADJUSTMENT = 'adj'
+    KIND_RETURN = 'ret'
+    KIND_DELIVERY = 'dlv'
+
+    KINDS = (
+        (KIND_SALE, 'Venta'),
+        (KIND_ADJUSTMENT, 'Ajuste'),
+        (KIND_RETURN, 'Devolución'),
+        (KIND_DELIVERY, 'Entrega de proveedor')
+    )
+
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.CASCADE,
+        related_name='stock_movements',
+        verbose_name='Producto'
+    )
+
+    kind = models.CharField(
+        'Tipo',
+        choices=KINDS,
+        max_length=3
+    )
+
+    quantity = models.DecimalField(
+        'Cantidad',
+        max_digits=10,
+        decimal_places=2,
+        help_text='Positiva si ingresa stock, negativa si egresa.'
+    )
+
+    description = models.TextField(
+        'Descripción',
+        max_length=100,
+        null=True,
+        blank=True
+    )
+
+    class Meta:
+        """Meta options."""
+        ordering = ['-created']
+        indexes = [
+            models.Index(fields=['product', 'created'], name='stockmovement_product_created'),
+        ]
+
+    def __str__(self):
+        """Return product, kind and quantity."""
+        return f'{self.product_id} - {self.get_kind_display()} - {self.quantity}'
+
+
+class StockSnapshot(PanaderiaModel):
+    """Stock snapshot model.
+
+    Balance of a product right before ``date``. Movements older than the
+    snapshot are folded into it by the compaction job.
+    """
+
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.CASCADE,
+        related_name='stock_snapshots',
+        verbose_name='Producto'
+    )
+
+    date = models.DateTimeField('Fecha')
+
+    balance = models.DecimalField(
+        'Saldo',
+        max_digits=10,
+        decimal_places=2
+    )
+
+    class Meta:
+        """Meta options."""
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'date'], name='stocksnapshot_product_date'),
+        ]
+
+    def __str__(self):
+        """Return product, date and balance."""
+        return f'{self.product_id} - {self.date} - {self.balance}'
@@ -1 +1 @@
-from .products import CategorySerializer, PriceHistorySerializer, ProductSerializer, BrandSerializer
\ No newline at end of file
+from .products import CategorySerializer, PriceHistorySerializer, ProductSerializer, ProductListSerializer, CatalogProductSerializer, BrandSerializer, StockMovementSerializer, PriceAsOfSerializer, ProductRepriceSerializer, ProductImportSerializer
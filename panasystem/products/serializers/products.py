@@ -5,9 +5,16 @@ from rest_framework import serializers
 from django.core.exceptions import ValidationError
 
 # Models
-from panasystem.products.models import Category, Product, PriceHistory, Brand
+from panasystem.products.models import Category, Product, PriceHistory, Brand, StockMovement
 from panasystem.suppliers.models import Supplier
 
+# Services
+from panasystem.products.services import create_products, set_stock
+
+# Utilities
+from datetime import date, datetime
+from decimal import Decimal
+
 
 class CategorySerializer(serializers.ModelSerializer):
     """Serializer for the Category model."""
@@ -60,30 +67,17 @@ class ProductSerializer(serializers.ModelSerializer):
         )
 
     def create(self, validated_data):
-        """Create product."""
-        category = validated_data.pop('category')
-        brand = validated_data.pop('brand', None)
-        supplier = validated_data.pop('supplier', None)
-
-        product = Product.objects.create(
-            category=category,
-            brand=brand,
-            supplier=supplier,
-            **validated_data
-        )
-        
-        public_price = validated_data.get('public_price')
-        wholesale_price = validated_data.get('wholesale_price', None)
-
-        if wholesale_price is not None:
-            product.update_price(public_price, wholesale_price)
-        else:
-            product.update_price(public_price, None)
-
+        """Create product with its initial price history and stock."""
+        product, = create_products([Product(**validated_data)])
         return product
 
     def update(self, instance, validated_data):
-        """Update product."""
+        """Update product.
+
+        The stock is never saved with the rest of the row, which would
+        overwrite the decrements of concurrent sales. It changes through
+        ``set_stock`` only.
+        """
         instance.category = validated_data.get('category', instance.category)
         instance.brand = validated_data.get('brand', instance.brand)
         instance.supplier = validated_data.get('supplier', instance.supplier)
@@ -93,10 +87,211 @@ class ProductSerializer(serializers.ModelSerializer):
         public_price = validated_data.get('public_price', instance.public_price)
         wholesale_price = validated_data.get('wholesale_price', instance.wholesale_price)
         instance.description = validated_data.get('description', instance.description)
-        instance.current_stock = validated_data.get('current_stock', instance.current_stock)
+        if 'current_stock' in validated_data and validated_data['current_stock'] != instance.current_stock:
+            set_stock(instance, validated_data['current_stock'])
 
         if public_price != instance.public_price or (wholesale_price is not None and wholesale_price != instance.wholesale_price):
             instance.update_price(public_price, wholesale_price)
 
-        instance.save()
-        return instance
\ No newline at end of file
+        instance.save(update_fields=['category', 'brand', 'supplier', 'barcode', 'name', 'description', 'modified'])
+        return instance
+
+
+class ProductListSerializer(serializers.ModelSerializer):
+    """Compact serializer for product listings.
+
+    Only the latest entries of the price history are returned, the view
+    prefetches them in ``recent_price_history``.
+    """
+
+    price_history = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Product
+        fields = (
+            'pk',
+            'barcode',
+            'name',
+            'category',
+            'public_price',
+            'wholesale_price',
+            'current_stock',
+            'brand',
+            'supplier',
+            'price_history',
+            'created',
+            'modified'
+        )
+        read_only_fields = fields
+
+    def get_price_history(self, product):
+        """Return the latest price history entries."""
+        history = getattr(product, 'recent_price_history', None)
+        if history is None:
+            history = product.price_history.all()[:self.context.get('price_history_limit', 3)]
+        return PriceHistorySerializer(history, many=True).data
+
+
+class CatalogProductSerializer(serializers.ModelSerializer):
+    """Serializer for the products of the catalog snapshot, what a POS needs to sell."""
+
+    class Meta:
+        model = Product
+        fields = (
+            'pk',
+            'barcode',
+            'name',
+            'category',
+            'brand',
+            'supplier',
+            'public_price',
+            'wholesale_price',
+            'current_stock',
+            'modified'
+        )
+        read_only_fields = fields
+
+
+class StockMovementSerializer(serializers.ModelSerializer):
+    """Serializer for the StockMovement model."""
+
+    class Meta:
+        model = StockMovement
+        fields = ('pk', 'product', 'kind', 'quantity', 'description', 'created')
+        read_only_fields = ('product', 'created')
+
+    def validate_quantity(self, value):
+        """Verify the quantity is not zero."""
+        if value == 0:
+            raise serializers.ValidationError('Quantity must not be zero.')
+        return value
+
+
+class PriceAsOfSerializer(serializers.Serializer):
+    """Serializer for a price lookup of a product at a date (YYYY-MM-DD, the end of that day) or a datetime."""
+
+    product = serializers.IntegerField()
+    date = serializers.CharField()
+
+    def validate_date(self, value):
+        """Parse the date or datetime."""
+        try:
+            return date.fromisoformat(value) if len(value) == 10 else datetime.fromisoformat(value)
+        except ValueError:
+            raise serializers.ValidationError('Invalid date format. Use YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS.') from None
+
+
+class RepricePriceSerializer(serializers.Serializer):
+    """Serializer for the explicit new prices of a product."""
+
+    product = serializers.IntegerField()
+    public_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'), required=False)
+    wholesale_price = serializers.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        min_value=Decimal('0.01'),
+        required=False,
+        allow_null=True
+    )
+
+
+class ProductRepriceSerializer(serializers.Serializer):
+    """Serializer for a bulk price change.
+
+    The prices change by a percentage, by an amount or to an explicit price
+    list, for the products of a category, brand or supplier.
+    """
+
+    APPLY_TO = ('public', 'wholesale', 'both')
+
+    category = serializers.IntegerField(required=False)
+    brand = serializers.IntegerField(required=False)
+    supplier = serializers.IntegerField(required=False)
+    percentage = serializers.DecimalField(max_digits=6, decimal_places=2, min_value=Decimal('-99.99'), required=False)
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    prices = RepricePriceSerializer(many=True, required=False)
+    apply_to = serializers.ChoiceField(choices=APPLY_TO, default='both')
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        """Verify that exactly one change is given, and to which products it applies."""
+        changes = [name for name in ('percentage', 'amount', 'prices') if data.get(name) is not None]
+        if len(changes) != 1:
+            raise serializers.ValidationError('Indicate one of percentage, amount or prices.')
+        if 'prices' in data:
+            products = [line['product'] for line in data['prices']]
+            if len(set(products)) != len(products):
+                raise serializers.ValidationError({'prices': ['Each product can only be given once.']})
+        elif not any(name in data for name in ('category', 'brand', 'supplier')):
+            raise serializers.ValidationError('Indicate a category, brand or supplier to change the prices of.')
+        return data
+
+
+class ProductImportListSerializer(serializers.ListSerializer):
+    """Import many products with a fixed number of queries.
+
+    Categories, brands and suppliers are resolved by name with one query
+    each, barcodes are checked with one query, and the products are created
+    with their history and stock in bulk. Nothing is imported if any row
+    has errors, which are reported per row.
+    """
+
+    def create(self, validated_data):
+        """Create the products in bulk."""
+        related = {}
+        for name, model in (('category', Category), ('brand', Brand), ('supplier', Supplier)):
+            names = {data[name] for data in validated_data if data.get(name)}
+            # With repeated names, the oldest object wins.
+            related[name] = {obj.name: obj for obj in model.objects.filter(name__in=names).order_by('-pk')}
+
+        barcodes = [data['barcode'] for data in validated_data if data.get('barcode')]
+        taken = set(Product.objects.filter(barcode__in=barcodes).values_list('barcode', flat=True))
+        seen = set()
+
+        errors = [{} for _ in validated_data]
+        products = []
+        for index, data in enumerate(validated_data):
+            for name in ('category', 'brand', 'supplier'):
+                value = data.get(name)
+                if value:
+                    data[name] = related[name].get(value)
+                    if data[name] is None:
+                        errors[index][name] = [f'{name.capitalize()} "{value}" does not exist.']
+                else:
+                    data[name] = None
+            barcode = data.get('barcode') or None
+            if barcode in taken or barcode in seen:
+                errors[index]['barcode'] = [f'Product with barcode {barcode} already exists.']
+            if barcode:
+                seen.add(barcode)
+            data['barcode'] = barcode
+            products.append(Product(**data))
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return create_products(products)
+
+
+class ProductImportSerializer(serializers.Serializer):
+    """Serializer for a row of a product import, category, brand and supplier are given by name."""
+
+    barcode = serializers.CharField(max_length=50, required=False, allow_null=True, allow_blank=True)
+    name = serializers.CharField(max_length=50)
+    category = serializers.CharField(max_length=50)
+    brand = serializers.CharField(max_length=50, required=False, allow_null=True, allow_blank=True)
+    supplier = serializers.CharField(max_length=50, required=False, allow_null=True, allow_blank=True)
+    public_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+    wholesale_price = serializers.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        min_value=Decimal('0.01'),
+        required=False,
+        allow_null=True
+    )
+    current_stock = serializers.IntegerField(min_value=0, max_value=32767, required=False, allow_null=True)
+    description = serializers.CharField(max_length=100, required=False, allow_null=True, allow_blank=True)
+
+    class Meta:
+        """Meta options."""
+
+        list_serializer_class = ProductImportListSerializer
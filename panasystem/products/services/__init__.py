@@ -0,0 +1,12 @@
+from .stock import (
+    InsufficientStock,
+    adjust_stock,
+    compact_stock_movements,
+    decrement_stock,
+    set_stock,
+    stock_as_of,
+)
+from .barcodes import aresolve_barcode, clear_barcode_cache, invalidate_products, resolve_barcode
+from .catalog import catalog_changes, catalog_version, prune_product_tombstones
+from .products import create_products
+from .prices import price_as_of, prices_as_of, reprice_products
@@ -0,0 +1,177 @@
+"""Barcode services."""
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# Models
+from panasystem.products.models import Product
+
+# Utilities
+from collections import OrderedDict
+from threading import Lock
+import time
+
+BARCODE_KEY = 'products:barcode:{}'
+PRODUCT_KEY = 'products:resolve:{}'
+
+
+class _LocalCache:
+    """Small LRU cache of this process, with a short time to live.
+
+    Other processes cannot invalidate it, so the time to live bounds how
+    stale an entry can be after a change made elsewhere.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key):
+        """Return the value of a fresh entry, or None."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entry when full."""
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def discard(self, pks):
+        """Remove the entries of the given products."""
+        with self.lock:
+            for key in [key for key, (_, value) in self.entries.items() if value['pk'] in pks]:
+                del self.entries[key]
+
+    def clear(self):
+        """Remove every entry."""
+        with self.lock:
+            self.entries.clear()
+
+
+_local = _LocalCache(
+    maxsize=getattr(settings, 'BARCODE_CACHE_LOCAL_SIZE', 2048),
+    ttl=getattr(settings, 'BARCODE_CACHE_LOCAL_TTL', 5)
+)
+
+
+def _payload(product):
+    """Return what a barcode resolves to."""
+    return {
+        'pk': product['pk'],
+        'barcode': product['barcode'],
+        'name': product['name'],
+        'public_price': str(product['public_price']),
+        'wholesale_price': str(product['wholesale_price']) if product['wholesale_price'] is not None else None,
+        'current_stock': product['current_stock']
+    }
+
+
+def _lookup(barcode):
+    """Return the query of the product with this barcode."""
+    return (
+        Product.objects
+        .filter(barcode=barcode)
+        .values('pk', 'barcode', 'name', 'public_price', 'wholesale_price', 'current_stock')
+    )
+
+
+def _shared_entries(barcode, payload):
+    """Return the shared cache entries of a resolution and their timeout."""
+    timeout = getattr(settings, 'BARCODE_CACHE_TIMEOUT', 60 * 60)
+    return {BARCODE_KEY.format(barcode): payload['pk'], PRODUCT_KEY.format(payload['pk']): payload}, timeout
+
+
+def resolve_barcode(barcode):
+    """Return the product with exactly this barcode, or None.
+
+    The product is looked up in the cache of this process, then in the
+    shared cache (barcode to pk, pk to product) and last in the database,
+    through the unique barcode index.
+    """
+    payload = _local.get(barcode)
+    if payload is not None:
+        return payload
+
+    pk = cache.get(BARCODE_KEY.format(barcode))
+    if pk is not None:
+        payload = cache.get(PRODUCT_KEY.format(pk))
+        # A product whose barcode changed leaves its old barcode behind.
+        if payload is not None and payload['barcode'] != barcode:
+            cache.delete(BARCODE_KEY.format(barcode))
+            payload = None
+
+    if payload is None:
+        product = _lookup(barcode).first()
+        if product is None:
+            return None
+        payload = _payload(product)
+        cache.set_many(*_shared_entries(barcode, payload))
+
+    _local.set(barcode, payload)
+    return payload
+
+
+async def aresolve_barcode(barcode):
+    """Return the product with exactly this barcode, or None, with the async cache and ORM.
+
+    Same lookups as resolve_barcode.
+    """
+    payload = _local.get(barcode)
+    if payload is not None:
+        return payload
+
+    pk = await cache.aget(BARCODE_KEY.format(barcode))
+    if pk is not None:
+        payload = await cache.aget(PRODUCT_KEY.format(pk))
+        if payload is not None and payload['barcode'] != barcode:
+            await cache.adelete(BARCODE_KEY.format(barcode))
+            payload = None
+
+    if payload is None:
+        product = await _lookup(barcode).afirst()
+        if product is None:
+            return None
+        payload = _payload(product)
+        await cache.aset_many(*_shared_entries(barcode, payload))
+
+    _local.set(barcode, payload)
+    return payload
+
+
+def invalidate_products(pks, barcodes=()):
+    """Drop the cached resolutions of products whose price, stock or barcode changed.
+
+    The entries are dropped right away and again when the transaction
+    commits, so a lookup made in between cannot keep the old values.
+    """
+    pks = set(pks)
+    keys = [PRODUCT_KEY.format(pk) for pk in pks] + [BARCODE_KEY.format(barcode) for barcode in barcodes if barcode]
+    if not keys:
+        return
+
+    def delete():
+        cache.delete_many(keys)
+        _local.discard(pks)
+
+    delete()
+    transaction.on_commit(delete)
+
+
+def clear_barcode_cache():
+    """Drop the cached resolutions of this process."""
+    _local.clear()
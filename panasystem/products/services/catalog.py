@@ -0,0 +1,50 @@
+"""Catalog services."""
+
+# Django
+from django.conf import settings
+from django.db.models import Max
+from django.utils.timezone import now
+
+# Models
+from panasystem.products.models import Product, ProductTombstone
+
+# Utilities
+from datetime import timedelta
+
+# Changes committed by transactions that started before a version was
+# taken can carry an older ``modified``, deltas look back this much further.
+SYNC_OVERLAP = timedelta(minutes=1)
+
+
+def tombstone_days():
+    """Return how many days the deletions are kept for delta syncs."""
+    return getattr(settings, 'CATALOG_TOMBSTONE_DAYS', 90)
+
+
+def catalog_version():
+    """Return the version of the catalog, the date of its latest change or deletion."""
+    changed = Product.objects.aggregate(version=Max('modified'))['version']
+    deleted = ProductTombstone.objects.aggregate(version=Max('created'))['version']
+    latest = max([version for version in (changed, deleted) if version is not None], default=None)
+    return latest.isoformat() if latest else '0'
+
+
+def catalog_changes(since=None):
+    """Return the changes of the catalog since a version.
+
+    Returns whether it is the full catalog, the products to send and the
+    pks of the products deleted. Versions older than the kept deletions get
+    the full catalog.
+    """
+    if since is None or since < now() - timedelta(days=tombstone_days()):
+        return True, Product.objects.all(), []
+    since = since - SYNC_OVERLAP
+    deleted = ProductTombstone.objects.filter(created__gte=since).values_list('product_pk', flat=True)
+    return False, Product.objects.filter(modified__gte=since), list(deleted)
+
+
+def prune_product_tombstones(before=None):
+    """Delete the tombstones older than ``before``, by default the kept days. Returns how many."""
+    before = before or now() - timedelta(days=tombstone_days())
+    deleted, _ = ProductTombstone.objects.filter(created__lt=before).delete()
+    return deleted
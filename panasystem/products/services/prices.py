@@ -0,0 +1,152 @@
+"""Price services."""
+
+# Django
+from django.db import transaction
+from django.utils.timezone import now
+
+# Models
+from panasystem.products.models import PriceHistory, Product
+
+# Services
+from panasystem.products.services.barcodes import invalidate_products
+
+# Utilities
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date as date_type, datetime, time
+from decimal import Decimal, ROUND_HALF_UP
+
+CENT = Decimal('0.01')
+
+
+def _moment(date):
+    """Return the datetime a price is looked up at, a date means the end of that day."""
+    if isinstance(date, date_type) and not isinstance(date, datetime):
+        return datetime.combine(date, time.max)
+    return date
+
+
+def _price(entry):
+    """Return the prices of a price history entry."""
+    if entry is None:
+        return None
+    created, public_price, wholesale_price = entry
+    return {'date': created, 'public_price': public_price, 'wholesale_price': wholesale_price}
+
+
+def price_as_of(product, date):
+    """Return the prices of a product at ``date``, or None if it had no price yet.
+
+    The lookup reads a single row of the (product, created) index.
+    """
+    entry = (
+        PriceHistory.objects
+        .filter(product=product, created__lte=_moment(date))
+        .order_by('-created', '-pk')
+        .values_list('created', 'public_price', 'wholesale_price')
+        .first()
+    )
+    return _price(entry)
+
+
+def prices_as_of(pairs):
+    """Return the prices of many (product, date) pairs with a single query.
+
+    The histories of the products involved are read once, up to the latest
+    date asked, and each pair is resolved with a binary search. Returns a
+    dict mapping every pair to its prices, or to None if the product had no
+    price yet.
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return {}
+
+    moments = {pair: (getattr(pair[0], 'pk', pair[0]), _moment(pair[1])) for pair in pairs}
+    histories = defaultdict(list)
+    entries = (
+        PriceHistory.objects
+        .filter(product__in={pk for pk, _ in moments.values()}, created__lte=max(moment for _, moment in moments.values()))
+        .order_by('product', 'created', 'pk')
+        .values_list('product', 'created', 'public_price', 'wholesale_price')
+    )
+    for product, created, public_price, wholesale_price in entries:
+        histories[product].append((created, public_price, wholesale_price))
+
+    prices = {}
+    for pair, (product, moment) in moments.items():
+        history = histories[product]
+        position = bisect_right(history, moment, key=lambda entry: entry[0])
+        prices[pair] = _price(history[position - 1]) if position else None
+    return prices
+
+
+def _new_price(price, percentage=None, amount=None):
+    """Return a price changed by a percentage or an amount, rounded to cents."""
+    if price is None:
+        return None
+    if percentage is not None:
+        price = price * (1 + Decimal(percentage) / 100)
+    if amount is not None:
+        price = price + Decimal(amount)
+    return price.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def reprice_products(queryset, percentage=None, amount=None, prices=None, apply_to='both', dry_run=False):
+    """Change the prices of many products at once.
+
+    The prices of the products in ``queryset`` change by a ``percentage``,
+    by an ``amount``, or to the explicit ``prices``, a dict mapping product
+    pks to {'public_price', 'wholesale_price'}. ``apply_to`` is 'public',
+    'wholesale' or 'both'. The products are updated with one bulk_update and
+    their history rows inserted with one bulk_create, in a single
+    transaction; with ``dry_run`` nothing is written.
+
+    Returns the changes, one dict per product whose prices change. Raises
+    ValueError if a new price would not be greater than zero.
+    """
+    changes = []
+    changed = []
+    with transaction.atomic():
+        products = queryset.only('pk', 'name', 'public_price', 'wholesale_price').order_by('pk')
+        if not dry_run:
+            products = products.select_for_update()
+
+        for product in products:
+            public_price, wholesale_price = product.public_price, product.wholesale_price
+            if prices is not None:
+                new_prices = prices[product.pk]
+                public_price = new_prices.get('public_price', public_price)
+                wholesale_price = new_prices.get('wholesale_price', wholesale_price)
+            else:
+                if apply_to in ('public', 'both'):
+                    public_price = _new_price(public_price, percentage, amount)
+                if apply_to in ('wholesale', 'both'):
+                    wholesale_price = _new_price(wholesale_price, percentage, amount)
+
+            if public_price <= 0 or (wholesale_price is not None and wholesale_price <= 0):
+                raise ValueError(f'El nuevo precio de {product.name} debe ser mayor a 0.')
+            if public_price == product.public_price and wholesale_price == product.wholesale_price:
+                continue
+
+            changes.append({
+                'product': product.pk,
+                'name': product.name,
+                'old_public_price': product.public_price,
+                'new_public_price': public_price,
+                'old_wholesale_price': product.wholesale_price,
+                'new_wholesale_price': wholesale_price
+            })
+            product.public_price, product.wholesale_price = public_price, wholesale_price
+            changed.append(product)
+
+        if changed and not dry_run:
+            modified = now()
+            for product in changed:
+                product.modified = modified
+            Product.objects.bulk_update(changed, ['public_price', 'wholesale_price', 'modified'], batch_size=500)
+            PriceHistory.objects.bulk_create([
+                PriceHistory(product=product, public_price=product.public_price, wholesale_price=product.wholesale_price)
+                for product in changed
+            ], batch_size=500)
+            invalidate_products(product.pk for product in changed)
+    return changes
@@ -0,0 +1,32 @@
+"""Product services."""
+
+# Django
+from django.db import transaction
+
+# Models
+from panasystem.products.models import PriceHistory, Product, StockMovement
+
+
+def create_products(products, batch_size=500):
+    """Insert new products together with their initial price history and stock.
+
+    Products, history rows and opening stock movements are each inserted
+    with one bulk_create per batch, in a single transaction, so a product
+    costs no extra save. Returns the products with their pks set.
+    """
+    with transaction.atomic():
+        products = Product.objects.bulk_create(products, batch_size=batch_size)
+        PriceHistory.objects.bulk_create([
+            PriceHistory(product=product, public_price=product.public_price, wholesale_price=product.wholesale_price)
+            for product in products
+        ], batch_size=batch_size)
+        StockMovement.objects.bulk_create([
+            StockMovement(
+                product=product,
+                kind=StockMovement.KIND_ADJUSTMENT,
+                quantity=product.current_stock,
+                description='Stock inicial'
+            )
+            for product in products if product.current_stock
+        ], batch_size=batch_size)
+    return products
@@ -0,0 +1,157 @@
+"""Stock services."""
+
+# Django
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Now
+from django.utils.timezone import now
+
+# Models
+from panasystem.products.models import Product, StockMovement, StockSnapshot
+
+# Services
+from panasystem.products.services.barcodes import invalidate_products
+
+# Utilities
+from decimal import Decimal
+
+
+class InsufficientStock(ValueError):
+    """Raised when a stock movement would leave a product below zero.
+
+    ``failures`` holds one dict per failing product with the requested
+    quantity and the stock that was available.
+    """
+
+    def __init__(self, failures):
+        self.failures = failures
+        super().__init__('Stock insuficiente para actualizar.')
+
+
+class _Rollback(Exception):
+    """Undo a partially applied stock update."""
+
+
+def _case(values):
+    """Return a CASE expression mapping each product pk to a quantity."""
+    return Case(
+        *[When(pk=pk, then=Value(value)) for pk, value in values.items()],
+        output_field=DecimalField(max_digits=10, decimal_places=2)
+    )
+
+
+def adjust_stock(deltas, kind=StockMovement.KIND_ADJUSTMENT, description=None):
+    """Apply signed stock deltas to many products in a single UPDATE.
+
+    ``deltas`` maps product pks to the quantity to add, negative values
+    decrement the stock. The update is conditional on the resulting stock
+    not being negative, so concurrent sales cannot oversell a product.
+    Products without a tracked stock (``current_stock`` is null) are left
+    untouched. If any product fails, nothing is applied.
+
+    Every applied delta is recorded in the stock ledger as a movement of
+    the given ``kind``.
+    """
+    deltas = {pk: delta for pk, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    try:
+        with transaction.atomic():
+            updated = Product.objects.filter(
+                Q(current_stock__isnull=True) | Q(current_stock__gte=_case({pk: -delta for pk, delta in deltas.items()})),
+                pk__in=deltas
+            ).update(
+                current_stock=F('current_stock') + _case(deltas),
+                modified=Now()
+            )
+            if updated != len(deltas):
+                raise _Rollback
+            # The ledger is written in the same transaction as the stock, so
+            # they cannot disagree whatever the caller's transaction.
+            tracked = Product.objects.filter(pk__in=deltas, current_stock__isnull=False).values_list('pk', flat=True)
+            StockMovement.objects.bulk_create([
+                StockMovement(product_id=pk, kind=kind, quantity=deltas[pk], description=description)
+                for pk in tracked
+            ])
+    except _Rollback:
+        stocks = dict(Product.objects.filter(pk__in=deltas).values_list('pk', 'current_stock'))
+        failures = [
+            {'product': pk, 'requested': -delta, 'available': stocks.get(pk)}
+            for pk, delta in deltas.items()
+            if pk not in stocks or (stocks[pk] is not None and stocks[pk] + delta < 0)
+        ]
+        raise InsufficientStock(failures) from None
+
+    invalidate_products(deltas)
+
+
+def decrement_stock(quantities, kind=StockMovement.KIND_SALE, description=None):
+    """Decrement the stock of many products, e.g. after a sale."""
+    adjust_stock({pk: -quantity for pk, quantity in quantities.items()}, kind=kind, description=description)
+
+
+def set_stock(product, stock, description=None):
+    """Set the stock of a product to an absolute value, e.g. after a count.
+
+    Setting the stock to null stops tracking it; the ledger is zeroed with
+    an adjustment so it keeps matching ``current_stock``.
+    """
+    if product.current_stock is not None and stock is not None:
+        adjust_stock({product.pk: stock - product.current_stock}, description=description)
+        product.refresh_from_db(fields=['current_stock', 'modified'])
+        return
+
+    quantity = stock if stock is not None else -(product.current_stock or 0)
+    Product.objects.filter(pk=product.pk).update(current_stock=stock, modified=Now())
+    invalidate_products([product.pk])
+    if quantity:
+        StockMovement.objects.create(
+            product=product,
+            kind=StockMovement.KIND_ADJUSTMENT,
+            quantity=quantity,
+            description=description
+        )
+    product.current_stock = stock
+
+
+def stock_as_of(product, date):
+    """Return the stock balance of a product at ``date``.
+
+    The balance is the latest snapshot before ``date`` plus the movements
+    recorded after it, so the cost does not depend on the age of the ledger.
+    """
+    snapshot = StockSnapshot.objects.filter(product=product, date__lte=date).order_by('-date').first()
+    movements = StockMovement.objects.filter(product=product, created__lte=date)
+    if snapshot is not None:
+        movements = movements.filter(created__gte=snapshot.date)
+    balance = snapshot.balance if snapshot is not None else Decimal(0)
+    return balance + (movements.aggregate(total=Sum('quantity'))['total'] or 0)
+
+
+def compact_stock_movements(before):
+    """Fold the movements created before ``before`` into dated snapshots.
+
+    Returns the number of movements folded. ``before`` must be in the past
+    and later than every existing snapshot.
+    """
+    if before > now():
+        raise ValueError('La fecha indicada no puede ser futura.')
+    if StockSnapshot.objects.filter(date__gte=before).exists():
+        raise ValueError('Ya existen snapshots posteriores a la fecha indicada.')
+
+    with transaction.atomic():
+        movements = StockMovement.objects.filter(created__lt=before)
+        totals = movements.values('product').annotate(total=Sum('quantity')).values_list('product', 'total')
+        latest = StockSnapshot.objects.filter(
+            pk=Subquery(
+                StockSnapshot.objects.filter(product=OuterRef('product')).order_by('-date').values('pk')[:1]
+            )
+        )
+        balances = dict(latest.values_list('product', 'balance'))
+        StockSnapshot.objects.bulk_create([
+            StockSnapshot(product_id=product_id, date=before, balance=balances.get(product_id, 0) + total)
+            for product_id, total in totals
+        ])
+        folded, _ = movements.delete()
+    return folded
@@ -0,0 +1,38 @@
+"""Products signals."""
+
+# Django
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+# Models
+from panasystem.products.models import Brand, Category, Product, ProductTombstone
+
+# Services
+from panasystem.products.services import invalidate_products
+
+# Utilities
+from panasystem.utils.versions import bump_version
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_barcode_cache(sender, instance, raw=False, **kwargs):
+    """Drop the cached barcode resolution of a saved or deleted product."""
+    if raw:
+        return
+    invalidate_products([instance.pk], barcodes=[instance.barcode])
+
+
+@receiver(post_delete, sender=Product)
+def record_tombstone(sender, instance, **kwargs):
+    """Record the deletion for the catalog delta syncs."""
+    ProductTombstone.objects.create(product_pk=instance.pk)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Brand)
+@receiver(post_delete, sender=Brand)
+def bump_catalog_lists_version(sender, **kwargs):
+    """Invalidate the cached category and brand lists."""
+    bump_version(sender)
@@ -0,0 +1,118 @@
+"""Test barcode resolution."""
+
+# Pytest
+import pytest
+
+# Django
+from django.core.cache import cache
+
+# Django REST Framework
+from rest_framework import status
+
+# Models
+from panasystem.products.models import Product, Category
+
+# Services
+from panasystem.products.services import clear_barcode_cache, decrement_stock, reprice_products, resolve_barcode
+
+# Utils
+from panasystem.utils.connect_api_tests import api_client
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    """Start and end every test with empty caches."""
+    cache.clear()
+    clear_barcode_cache()
+    yield
+    cache.clear()
+    clear_barcode_cache()
+
+
+@pytest.fixture
+def bread():
+    """Create a product with a barcode."""
+    category = Category.objects.create(name="Bakery")
+    return Product.objects.create(
+        name="Bread", barcode="7790001", category=category, public_price=2, wholesale_price=1, current_stock=10
+    )
+
+
+@pytest.mark.django_db
+def test_resolve_barcode_cached(bread, django_assert_num_queries):
+    """
+    Test resolving a barcode twice.
+
+    Ensures that the second lookup is served without queries, from this
+    process or from the shared cache.
+    """
+    with django_assert_num_queries(1):
+        assert resolve_barcode("7790001")['pk'] == bread.pk
+    with django_assert_num_queries(0):
+        assert resolve_barcode("7790001")['current_stock'] == 10
+    clear_barcode_cache()
+    with django_assert_num_queries(0):
+        assert resolve_barcode("7790001")['name'] == "Bread"
+    assert resolve_barcode("0000000") is None
+
+
+@pytest.mark.django_db
+def test_resolve_barcode_invalidated(bread):
+    """
+    Test the invalidation of resolved barcodes.
+
+    Ensures that saves, price updates, stock movements, barcode changes and
+    deletions are seen by the next lookup.
+    """
+    resolve_barcode("7790001")
+    bread.update_price(3, 2)
+    assert resolve_barcode("7790001")['public_price'] == '3.00'
+
+    decrement_stock({bread.pk: 4})
+    assert resolve_barcode("7790001")['current_stock'] == 6
+
+    reprice_products(Product.objects.filter(pk=bread.pk), percentage=100)
+    assert resolve_barcode("7790001")['wholesale_price'] == '4.00'
+
+    bread.barcode = "7790002"
+    bread.save()
+    assert resolve_barcode("7790001") is None
+    assert resolve_barcode("7790002")['pk'] == bread.pk
+
+    bread.delete()
+    assert resolve_barcode("7790002") is None
+
+
+@pytest.mark.django_db
+def test_barcode_endpoint(api_client, bread):
+    """
+    Test the barcode endpoint.
+
+    Ensures that the price follows the kind of sale and that unknown
+    barcodes are not found.
+    """
+    response = api_client[0].get('/api/v1/products/barcode/7790001/', format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['price'] == '2.00'
+    assert response.data['current_stock'] == 10
+    response = api_client[0].get('/api/v1/products/barcode/7790001/?is_bakery=true', format='json')
+    assert response.data['price'] == '1.00'
+    response = api_client[0].get('/api/v1/products/barcode/0000000/', format='json')
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_async_barcode_endpoint(bread, api_client):
+    """
+    Test resolving a barcode through the async endpoint.
+
+    Ensures that it answers like the barcode action and shares its cache.
+    """
+    response = api_client[0].get('/api/v1/async/products/barcode/7790001/?is_bakery=true')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == api_client[0].get('/api/v1/products/barcode/7790001/?is_bakery=true').json()
+    assert response.json()['price'] == '1.00'
+    assert resolve_barcode("7790001")['pk'] == bread.pk
+
+    response = api_client[0].get('/api/v1/async/products/barcode/0000000/')
+    assert response.status_code == status.HTTP_404_NOT_FOUND
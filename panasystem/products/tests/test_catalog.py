@@ -0,0 +1,90 @@
+"""Test catalog snapshot."""
+
+# Pytest
+import pytest
+
+# Django
+from django.core.management import call_command
+
+# Django REST Framework
+from rest_framework import status
+
+# Models
+from panasystem.products.models import Product, Category, ProductTombstone
+
+# Services
+from panasystem.products.services import catalog
+
+# Utilities
+from datetime import datetime, timedelta
+from io import StringIO
+
+# Utils
+from panasystem.utils.connect_api_tests import api_client
+
+
+@pytest.mark.django_db
+def test_catalog_sync(api_client, monkeypatch):
+    """
+    Test syncing the catalog.
+
+    Ensures that the snapshot is versioned, that an unchanged catalog gets
+    a 304 and that a delta only returns the changed and deleted products,
+    with its own ETag. The version of an empty catalog can be synced from.
+    """
+    monkeypatch.setattr(catalog, 'SYNC_OVERLAP', timedelta(0))
+    url = '/api/v1/products/catalog/'
+    response = api_client[0].get(url, format='json')
+    assert response.data['version'] == '0'
+    response = api_client[0].get(f'{url}?since=0', format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['full'] is True
+
+    category = Category.objects.create(name="Bakery")
+    bread = Product.objects.create(name="Bread", category=category, public_price=1)
+    milk = Product.objects.create(name="Milk", category=category, public_price=1)
+    cake = Product.objects.create(name="Cake", category=category, public_price=1)
+
+    response = api_client[0].get(url, format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['full'] is True
+    assert [product['name'] for product in response.data['products']] == ["Bread", "Milk", "Cake"]
+    version = response.data['version']
+    assert response['ETag'] == f'"{version}"'
+
+    response = api_client[0].get(url, format='json', HTTP_IF_NONE_MATCH=f'"{version}"')
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    milk.update_price(2, None)
+    cake_pk = cake.pk
+    cake.delete()
+    response = api_client[0].get(f'{url}?since={version}', format='json', HTTP_IF_NONE_MATCH=f'"{version}"')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['full'] is False
+    assert [product['public_price'] for product in response.data['products']] == ['2.00']
+    assert response.data['deleted'] == [cake_pk]
+    assert response.data['version'] > version
+    assert response['ETag'] == f'"{response.data["version"]}:{version}"'
+
+    response = api_client[0].get(f'{url}?since=2000-01-01T00:00:00', format='json')
+    assert response.data['full'] is True
+    assert {product['pk'] for product in response.data['products']} == {bread.pk, milk.pk}
+
+    response = api_client[0].get(f'{url}?since=yesterday', format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_prune_product_tombstones_command():
+    """
+    Test pruning old product tombstones.
+
+    Ensures that only the tombstones older than the kept days are deleted.
+    """
+    ProductTombstone.objects.create(product_pk=1)
+    old = ProductTombstone.objects.create(product_pk=2)
+    ProductTombstone.objects.filter(pk=old.pk).update(created=datetime.now() - timedelta(days=200))
+    out = StringIO()
+    call_command('prune_product_tombstones', stdout=out)
+    assert 'Deleted 1 product tombstones' in out.getvalue()
+    assert list(ProductTombstone.objects.values_list('product_pk', flat=True)) == [1]
@@ -0,0 +1,170 @@
+"""Test price services."""
+
+# Pytest
+import pytest
+
+# Django REST Framework
+from rest_framework import status
+
+# Models
+from panasystem.products.models import Product, Category, PriceHistory
+from panasystem.sales.models import Sale
+
+# Services
+from panasystem.products.services import price_as_of, prices_as_of
+
+# Utilities
+from datetime import date, datetime
+from decimal import Decimal
+
+# Utils
+from panasystem.utils.connect_api_tests import api_client
+
+
+@pytest.fixture
+def priced_products():
+    """Create two products with prices set on January 1st, 10th and 20th, 2024."""
+    category = Category.objects.create(name="Bakery")
+    products = []
+    for name, base in (("Bread", 10), ("Milk", 100)):
+        product = Product.objects.create(name=name, category=category, public_price=base)
+        for day in (1, 10, 20):
+            product.update_price(base + day, base + day - 1)
+            PriceHistory.objects.filter(pk=product.price_history.latest('pk').pk).update(created=datetime(2024, 1, day, 12))
+        products.append(product)
+    return products
+
+
+@pytest.mark.django_db
+def test_price_as_of(priced_products):
+    """
+    Test looking up the prices of a product at a date.
+
+    Ensures that the latest prices set before the date are returned, a date
+    meaning the end of that day.
+    """
+    bread, _ = priced_products
+    assert price_as_of(bread, date(2023, 12, 31)) is None
+    assert price_as_of(bread, datetime(2024, 1, 10, 11))['public_price'] == 11
+    assert price_as_of(bread, date(2024, 1, 10))['public_price'] == 20
+    assert price_as_of(bread, date(2024, 3, 1))['wholesale_price'] == 29
+
+
+@pytest.mark.django_db
+def test_prices_as_of(priced_products, django_assert_num_queries):
+    """
+    Test looking up the prices of many products at many dates.
+
+    Ensures that every pair is resolved with a single query.
+    """
+    bread, milk = priced_products
+    pairs = [(bread.pk, date(2024, 1, day)) for day in range(1, 31)] + [(milk, date(2023, 5, 1)), (milk.pk, date(2024, 1, 15))]
+    with django_assert_num_queries(1):
+        prices = prices_as_of(pairs)
+    assert [prices[bread.pk, date(2024, 1, day)]['public_price'] for day in (1, 9, 10, 19, 20, 30)] == [11, 11, 20, 20, 30, 30]
+    assert prices[milk, date(2023, 5, 1)] is None
+    assert prices[milk.pk, date(2024, 1, 15)]['public_price'] == 110
+
+
+@pytest.mark.django_db
+def test_price_endpoints(api_client, priced_products):
+    """
+    Test the price lookup endpoints.
+
+    Ensures that the prices of one product and of many pairs are returned
+    and that invalid dates are rejected.
+    """
+    bread, milk = priced_products
+    response = api_client[0].get(f'/api/v1/products/{bread.pk}/price/?date=2024-01-15', format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['public_price'] == Decimal(20)
+
+    response = api_client[0].post('/api/v1/products/prices/', [
+        {'product': milk.pk, 'date': '2024-01-20T11:00:00'},
+        {'product': bread.pk, 'date': '2023-01-01'}
+    ], format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data[0]['public_price'] == Decimal(110)
+    assert response.data[1]['public_price'] is None
+
+    response = api_client[0].get(f'/api/v1/products/{bread.pk}/price/?date=15/01/2024', format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_backdated_sales_priced_at_their_date(api_client, priced_products):
+    """
+    Test creating backdated sales.
+
+    Ensures that the lines of a backdated sale are priced with the prices
+    the products had at the date of the sale.
+    """
+    bread, _ = priced_products
+    response = api_client[0].post('/api/v1/sales/', [
+        {'date': '2024-01-15T10:00:00', 'sale_details': [{'product': bread.pk, 'quantity': 2}]},
+        {'date': '2024-01-15T10:00:00', 'is_bakery': True, 'sale_details': [{'product': bread.pk, 'quantity': 1}]},
+        {'sale_details': [{'product': bread.pk, 'quantity': 1}]}
+    ], format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    totals = sorted(Sale.objects.values_list('total', flat=True))
+    assert totals == [19, 30, 40]
+
+
+@pytest.mark.django_db
+def test_edited_backdated_sale_priced_at_its_date(api_client, priced_products):
+    """
+    Test adding lines to a backdated sale.
+
+    Ensures that the new lines are priced as of the sale date, like the
+    lines the sale was created with.
+    """
+    bread, milk = priced_products
+    response = api_client[0].post('/api/v1/sales/', [
+        {'date': '2024-01-15T10:00:00', 'sale_details': [{'product': bread.pk, 'quantity': 2}]}
+    ], format='json')
+    sale = response.data[0]['pk']
+    response = api_client[0].patch(f'/api/v1/sales/{sale}/', {
+        'sale_details': [{'product': bread.pk, 'quantity': 2}, {'product': milk.pk, 'quantity': 1}]
+    }, format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert Sale.objects.get(pk=sale).total == 150
+
+
+@pytest.mark.django_db
+def test_reprice_products(api_client, django_assert_max_num_queries):
+    """
+    Test changing the prices of a whole category.
+
+    Ensures that a dry run only returns the changes and that applying them
+    updates the products and their history with a fixed number of queries.
+    """
+    bakery = Category.objects.create(name="Bakery")
+    dairy = Category.objects.create(name="Dairy")
+    for number in range(50):
+        Product.objects.create(name=f"Bread {number}", category=bakery, public_price=100, wholesale_price=80)
+    milk = Product.objects.create(name="Milk", category=dairy, public_price=100)
+    url = '/api/v1/products/reprice/'
+
+    response = api_client[0].post(url, {'category': bakery.pk, 'percentage': '12.5', 'dry_run': True}, format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['count'] == 50
+    assert response.data['changes'][0]['new_public_price'] == Decimal('112.50')
+    assert not PriceHistory.objects.exists()
+
+    with django_assert_max_num_queries(12):
+        response = api_client[0].post(url, {'category': bakery.pk, 'percentage': '12.5', 'apply_to': 'wholesale'}, format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert set(Product.objects.filter(category=bakery).values_list('public_price', 'wholesale_price')) == {(100, 90)}
+    assert PriceHistory.objects.filter(wholesale_price=90).count() == 50
+    assert Product.objects.get(pk=milk.pk).public_price == 100
+
+    response = api_client[0].post(url, {'prices': [{'product': milk.pk, 'public_price': '150'}]}, format='json')
+    assert response.data['changes'][0]['new_public_price'] == Decimal(150)
+    assert Product.objects.get(pk=milk.pk).public_price == 150
+
+    response = api_client[0].post(url, {'category': dairy.pk, 'amount': '-150'}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = api_client[0].post(url, {'category': dairy.pk, 'amount': '5', 'percentage': '5'}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = api_client[0].post(url, {'percentage': '5'}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
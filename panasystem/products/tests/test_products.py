@@ -3,11 +3,19 @@
 # Pytest
 import pytest
 
+# Utilities
+import json
+
+# Django
+from django.db import connection
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test.utils import CaptureQueriesContext
+
 # Django REST Framework
 from rest_framework import status
 
 # Models
-from panasystem.products.models import Product, Category, Brand
+from panasystem.products.models import Product, Category, Brand, PriceHistory, StockMovement
 from panasystem.suppliers.models import Supplier
 
 # Serializers
@@ -186,4 +194,181 @@ def test_retrieve_product(api_client):
     assert response.data['public_price'] == "1.99"
     assert response.data['wholesale_price'] == "1.50"
     assert response.data['brand'] == brand.id
-    assert response.data['supplier'] == supplier.id
\ No newline at end of file
+    assert response.data['supplier'] == supplier.id
+
+
+@pytest.mark.django_db
+def test_list_products_paginated_and_streamed(api_client):
+    """
+    Test listing products paginated and streamed.
+
+    Ensures that the cursor pages are ordered by name and that the streamed
+    JSON and NDJSON bodies contain every product.
+    """
+    category = Category.objects.create(name="Bakery", description="Bakery products")
+    for name in ("Milk", "Bread", "Cake"):
+        Product.objects.create(name=name, category=category, public_price=1)
+    url = '/api/v1/products/'
+
+    response = api_client[0].get(url + '?pagination=cursor&page_size=2', format='json')
+    assert [product['name'] for product in response.data['results']] == ["Bread", "Cake"]
+    response = api_client[0].get(response.data['next'], format='json')
+    assert [product['name'] for product in response.data['results']] == ["Milk"]
+
+    response = api_client[0].get(url + '?stream=json&category=' + str(category.pk), format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Content-Type'] == 'application/json'
+    products = json.loads(b''.join(response.streaming_content))
+    assert sorted(product['name'] for product in products) == ["Bread", "Cake", "Milk"]
+    assert products[0]['price_history'] == []
+
+    response = api_client[0].get(url + '?stream=ndjson', format='json')
+    lines = b''.join(response.streaming_content).decode().splitlines()
+    assert len(lines) == 3
+    assert {json.loads(line)['name'] for line in lines} == {"Milk", "Bread", "Cake"}
+
+    response = api_client[0].get(url + '?stream=xml', format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_list_products_price_history(api_client):
+    """
+    Test the price history in the product list and its endpoint.
+
+    Ensures that the list runs the same queries whatever the number of
+    products and price changes, returns only the latest entries and that
+    the whole history has its own endpoint.
+    """
+    category = Category.objects.create(name="Bakery", description="Bakery products")
+    url = '/api/v1/products/'
+
+    def list_queries():
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client[0].get(url, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        return len(queries)
+
+    product = Product.objects.create(name="Bread", category=category, public_price=1)
+    product.update_price(2, None)
+    few = list_queries()
+    for name in ("Milk", "Cake", "Cookies"):
+        other = Product.objects.create(name=name, category=category, public_price=1)
+        for price in range(2, 8):
+            other.update_price(price, None)
+    assert list_queries() == few
+
+    response = api_client[0].get(url + '?search=Milk', format='json')
+    assert [entry['public_price'] for entry in response.data[0]['price_history']] == ['7.00', '6.00', '5.00']
+    assert 'description' not in response.data[0]
+    response = api_client[0].get(url + '?search=Milk&history=1', format='json')
+    assert len(response.data[0]['price_history']) == 1
+    response = api_client[0].get(url + '?history=100', format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = api_client[0].get(f'{url}{other.pk}/price-history/', format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data) == 6
+
+
+@pytest.mark.django_db
+def test_create_product_single_write(api_client):
+    """
+    Test the writes of a product creation.
+
+    Ensures that the product is inserted once, with its price history and
+    opening stock, and never saved again.
+    """
+    category = Category.objects.create(name="Bakery", description="Bakery products")
+    data = {'name': 'Bread', 'category': category.id, 'public_price': 2, 'wholesale_price': 1, 'current_stock': 10}
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client[0].post('/api/v1/products/', data, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    writes = [query['sql'].split()[0] for query in queries if query['sql'].split()[0] in ('INSERT', 'UPDATE')]
+    assert writes == ['INSERT', 'INSERT', 'INSERT']
+    product = Product.objects.get(pk=response.data['pk'])
+    assert product.price_history.get().wholesale_price == 1
+    assert product.stock_movements.get().quantity == 10
+
+
+@pytest.mark.django_db
+def test_import_products(api_client, django_assert_max_num_queries):
+    """
+    Test importing products from JSON and CSV.
+
+    Ensures that names are resolved, errors are reported per row without
+    importing anything and that valid rows are imported in bulk.
+    """
+    category = Category.objects.create(name="Bakery")
+    Brand.objects.create(name="BrandX")
+    Product.objects.create(name="Bread", barcode="111", category=category, public_price=1)
+    url = '/api/v1/products/import/'
+
+    rows = [
+        {'name': 'Cake', 'category': 'Bakery', 'public_price': '5', 'barcode': '111'},
+        {'name': 'Milk', 'category': 'Dairy', 'public_price': '2', 'brand': 'BrandX'},
+        {'name': 'Cookies', 'category': 'Bakery', 'public_price': '-1'}
+    ]
+    response = api_client[0].post(url, rows, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'public_price' in response.data[2]
+    rows.pop()
+    response = api_client[0].post(url, rows, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'barcode' in response.data[0]
+    assert 'category' in response.data[1]
+    assert Product.objects.count() == 1
+
+    lines = ['name;category;brand;public_price;wholesale_price;current_stock;barcode']
+    lines += [f'Cookies {number};Bakery;BrandX;{number + 1};;{number};{1000 + number}' for number in range(100)]
+    upload = SimpleUploadedFile('products.csv', '\n'.join(lines).encode(), content_type='text/csv')
+    with django_assert_max_num_queries(20):
+        response = api_client[0].post(url, {'file': upload}, format='multipart')
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data['count'] == 100
+    assert Product.objects.filter(brand__name='BrandX', wholesale_price__isnull=True).count() == 100
+    assert PriceHistory.objects.count() == 100
+    assert StockMovement.objects.count() == 99
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != 'postgresql', reason='The search index is a PostgreSQL tsvector.')
+def test_search_products(api_client):
+    """
+    Test searching products.
+
+    Ensures that every word must start a word of the name or barcode, that
+    products created in bulk are searchable and that results are capped.
+    """
+    category = Category.objects.create(name="Bakery")
+    Product.objects.create(name="Pan casero", barcode="7790001", category=category, public_price=1)
+    Product.objects.create(name="Panettone", category=category, public_price=1)
+    Product.objects.create(name="Leche", category=category, public_price=1)
+    Product.objects.bulk_create([Product(name=f"Galletas {number}", category=category, public_price=1) for number in range(60)])
+    url = '/api/v1/products/?search='
+
+    response = api_client[0].get(url + 'pan', format='json')
+    assert {product['name'] for product in response.data} == {"Pan casero", "Panettone"}
+    response = api_client[0].get(url + 'pan%20cas', format='json')
+    assert [product['name'] for product in response.data] == ["Pan casero"]
+    response = api_client[0].get(url + '779', format='json')
+    assert [product['name'] for product in response.data] == ["Pan casero"]
+    response = api_client[0].get(url + 'galle', format='json')
+    assert len(response.data) == 50
+    response = api_client[0].get(url + 'ettone', format='json')
+    assert response.data == []
+
+
+@pytest.mark.django_db
+def test_search_products_fallback(api_client, monkeypatch):
+    """
+    Test searching products without PostgreSQL.
+
+    Ensures that the search falls back to icontains.
+    """
+    monkeypatch.setattr(connection, 'vendor', 'sqlite')
+    category = Category.objects.create(name="Bakery")
+    Product.objects.create(name="Panettone", category=category, public_price=1)
+    Product.objects.create(name="Leche", category=category, public_price=1)
+    response = api_client[0].get('/api/v1/products/?search=ettone', format='json')
+    assert [product['name'] for product in response.data] == ["Panettone"]
@@ -0,0 +1,185 @@
+"""Test stock services."""
+
+# Pytest
+import pytest
+
+# Django
+from django.utils.timezone import now
+
+# Django REST Framework
+from rest_framework import status
+
+# Models
+from panasystem.products.models import Product, Category, StockMovement, StockSnapshot
+
+# Serializers
+from panasystem.products.serializers import ProductSerializer
+
+# Services
+from panasystem.products.services import (
+    InsufficientStock,
+    adjust_stock,
+    compact_stock_movements,
+    decrement_stock,
+    stock_as_of,
+)
+
+# Utilities
+from datetime import datetime
+
+# Utils
+from panasystem.utils.connect_api_tests import api_client
+
+
+@pytest.fixture
+def products():
+    """Create a product with tracked stock and one without."""
+    category = Category.objects.create(name="Bakery")
+    bread = Product.objects.create(name="Bread", category=category, public_price=1, current_stock=10)
+    milk = Product.objects.create(name="Milk", category=category, public_price=1, current_stock=5)
+    cake = Product.objects.create(name="Cake", category=category, public_price=1)
+    return bread, milk, cake
+
+
+@pytest.mark.django_db
+def test_decrement_stock(products, django_assert_num_queries):
+    """
+    Test decrementing the stock of many products at once.
+
+    Ensures that every product is updated in a single UPDATE and that
+    products without tracked stock are left untouched.
+    """
+    bread, milk, cake = products
+    with django_assert_num_queries(5):
+        decrement_stock({bread.pk: 4, milk.pk: 5, cake.pk: 2})
+    bread.refresh_from_db()
+    milk.refresh_from_db()
+    cake.refresh_from_db()
+    assert bread.current_stock == 6
+    assert milk.current_stock == 0
+    assert cake.current_stock is None
+
+
+@pytest.mark.django_db
+def test_decrement_stock_insufficient(products):
+    """
+    Test decrementing more stock than available.
+
+    Ensures that nothing is applied and the failing products are reported.
+    """
+    bread, milk, _ = products
+    with pytest.raises(InsufficientStock) as error:
+        decrement_stock({bread.pk: 4, milk.pk: 6})
+    assert error.value.failures == [{'product': milk.pk, 'requested': 6, 'available': 5}]
+    bread.refresh_from_db()
+    assert bread.current_stock == 10
+
+
+@pytest.mark.django_db
+def test_edit_product_keeps_concurrent_sale(products):
+    """
+    Test editing a product while a sale decrements its stock.
+
+    Ensures that saving the edit, with the stock read before the sale,
+    does not overwrite the decrement.
+    """
+    bread, _, _ = products
+    serializer = ProductSerializer(bread, data={'name': 'Bread', 'public_price': 2}, partial=True)
+    assert serializer.is_valid()
+    decrement_stock({bread.pk: 4})
+    serializer.save()
+    bread.refresh_from_db()
+    assert bread.current_stock == 6
+    assert bread.public_price == 2
+
+
+@pytest.mark.django_db
+def test_adjust_stock_ledger_failure(products, monkeypatch):
+    """
+    Test a stock update whose ledger write fails.
+
+    Ensures that the stock is not changed without its movements.
+    """
+    bread, _, _ = products
+
+    def fail(*args, **kwargs):
+        raise RuntimeError('ledger write failed')
+
+    monkeypatch.setattr(StockMovement.objects, 'bulk_create', fail)
+    with pytest.raises(RuntimeError):
+        decrement_stock({bread.pk: 4})
+    bread.refresh_from_db()
+    assert bread.current_stock == 10
+
+
+@pytest.mark.django_db
+def test_adjust_stock_increment(products):
+    """
+    Test adding stock back to a product.
+
+    Ensures that positive deltas increment the stock.
+    """
+    bread, _, _ = products
+    adjust_stock({bread.pk: 3})
+    bread.refresh_from_db()
+    assert bread.current_stock == 13
+    bread.update_stock(13)
+    assert bread.current_stock == 0
+
+
+@pytest.mark.django_db
+def test_stock_movements_ledger(products):
+    """
+    Test that stock changes are recorded in the ledger.
+
+    Ensures that only products with tracked stock get movements.
+    """
+    bread, _, cake = products
+    decrement_stock({bread.pk: 4, cake.pk: 1})
+    movement = StockMovement.objects.get(product=bread)
+    assert movement.kind == StockMovement.KIND_SALE
+    assert movement.quantity == -4
+    assert not StockMovement.objects.filter(product=cake).exists()
+
+
+@pytest.mark.django_db
+def test_compact_stock_movements(products):
+    """
+    Test folding old movements into snapshots.
+
+    Ensures that the stock as of a date is the same before and after compaction.
+    """
+    bread, _, _ = products
+    adjust_stock({bread.pk: 10}, kind=StockMovement.KIND_DELIVERY)
+    decrement_stock({bread.pk: 3})
+    StockMovement.objects.update(created=datetime(2024, 1, 1))
+    decrement_stock({bread.pk: 2})
+
+    assert stock_as_of(bread, datetime(2024, 6, 1)) == 7
+    assert compact_stock_movements(datetime(2024, 2, 1)) == 2
+    assert StockMovement.objects.count() == 1
+    assert StockSnapshot.objects.get(product=bread).balance == 7
+    assert stock_as_of(bread, datetime(2024, 6, 1)) == 7
+    assert stock_as_of(bread, now()) == 5
+    with pytest.raises(ValueError):
+        compact_stock_movements(datetime(2024, 1, 15))
+
+
+@pytest.mark.django_db
+def test_product_stock_endpoint(api_client, products):
+    """
+    Test recording a stock movement via the API.
+
+    Ensures that the stock is updated and the movement is recorded.
+    """
+    bread, _, cake = products
+    url = f'/api/v1/products/{bread.id}/stock/'
+    response = api_client[0].post(url, {'kind': StockMovement.KIND_DELIVERY, 'quantity': 5}, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data['current_stock'] == 15
+    response = api_client[0].post(url, {'kind': StockMovement.KIND_ADJUSTMENT, 'quantity': -20}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = api_client[0].get(url, {'date': now().strftime('%Y-%m-%d')})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['current_stock'] == 15
+    assert response.data['stock'] == 5
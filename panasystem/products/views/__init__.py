@@ -1 +1,2 @@
-from .products import ProductViewSet, ProductCategoryViewSet, ProductBrandViewSet
\ No newline at end of file
+from .products import ProductViewSet, ProductCategoryViewSet, ProductBrandViewSet
+from .asynchronous import AsyncBarcodeView
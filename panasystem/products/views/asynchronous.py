@@ -0,0 +1,30 @@
+"""Products async views."""
+
+# Django REST Framework
+from rest_framework.exceptions import NotFound
+
+# Services
+from panasystem.products.services import aresolve_barcode
+
+# Utilities
+from panasystem.utils.views import AsyncAPIView
+
+
+class AsyncBarcodeView(AsyncAPIView):
+    """
+    Resolve a scanned barcode with the async cache and ORM.
+
+    Same query parameters and response as 'products/barcode/<barcode>/'.
+
+    Permissions:
+    - Requires the user to be authenticated.
+    """
+
+    async def get(self, request, barcode, *args, **kwargs):
+        """Resolve the barcode."""
+        product = await aresolve_barcode(barcode)
+        if product is None:
+            raise NotFound(f'No product with barcode {barcode}.')
+        is_bakery = request.query_params.get('is_bakery', '').lower() in ('true', '1', 'yes')
+        price = product['wholesale_price'] if is_bakery and product['wholesale_price'] is not None else product['public_price']
+        return {**product, 'price': price}
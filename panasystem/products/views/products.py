@@ -1,19 +1,60 @@
 """Products views."""
 
+# Django
+from django.db.models import Prefetch
+from django.utils.http import parse_etags
+
 # Django REST Framework
-from rest_framework import mixins, viewsets
+from rest_framework import mixins, viewsets, status
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 
 # Serializers
-from panasystem.products.serializers import ProductSerializer, CategorySerializer, BrandSerializer
+from panasystem.products.serializers import (
+    ProductSerializer,
+    ProductListSerializer,
+    CatalogProductSerializer,
+    PriceHistorySerializer,
+    CategorySerializer,
+    BrandSerializer,
+    StockMovementSerializer,
+    PriceAsOfSerializer,
+    ProductRepriceSerializer,
+    ProductImportSerializer
+)
 
 # Models
-from panasystem.products.models import Product, Category, Brand
+from panasystem.products.models import Product, PriceHistory, Category, Brand
+
+# Services
+from panasystem.products.services import (
+    InsufficientStock,
+    adjust_stock,
+    catalog_changes,
+    catalog_version,
+    price_as_of,
+    prices_as_of,
+    reprice_products,
+    resolve_barcode,
+    stock_as_of
+)
+
+# Utilities
+from datetime import datetime, timedelta
+import csv
+import io
+from panasystem.utils.filters import RankedSearchFilter
+from panasystem.utils.mixins import CachedListMixin, StreamingListMixin
+from panasystem.utils.pagination import OptionalPagination
 
 
-class ProductViewSet(mixins.CreateModelMixin,
+class ProductViewSet(StreamingListMixin,
+                     mixins.CreateModelMixin,
                      mixins.UpdateModelMixin,
                      mixins.RetrieveModelMixin,
                      mixins.ListModelMixin,
@@ -24,10 +65,21 @@ class ProductViewSet(mixins.CreateModelMixin,
 
     Provides the following actions:
     - Create a product
+    - Import many products from a JSON list or a CSV file
     - List products with filters by 'category', 'brand', 'supplier', ordering by 'name', and search capability by 'name' and 'barcode'
+      (words starting with the search, best matches first, at most 50)
+      (compact, with the last 3 price history entries, '?history=N' returns the last N)
+    - Paginate the list by page ('?pagination=page') or by cursor ('?pagination=cursor'), unpaginated by default
+    - Stream the whole list with '?stream=json' or '?stream=ndjson'
     - Retrieve a specific product
+    - Resolve a scanned barcode with its price and stock
+    - Get the catalog snapshot, or its changes since a version, for POS clients
     - Update a product's details
     - Delete a product
+    - Get the whole price history of a product
+    - Get the prices of a product at a date, or of many products at many dates
+    - Change the prices of many products at once
+    - Get the stock of a product, optionally as of a date, and record stock movements
 
     Permissions:
     - Requires the user to be authenticated to perform any action.
@@ -35,15 +87,280 @@ class ProductViewSet(mixins.CreateModelMixin,
 
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
-    filter_backends = (DjangoFilterBackend, SearchFilter, OrderingFilter)
+    filter_backends = (DjangoFilterBackend, RankedSearchFilter, OrderingFilter)
     filterset_fields = ('category', 'brand', 'supplier')
     search_fields = ('barcode', 'name')
     ordering_fields = ('name',)
     permission_classes = [IsAuthenticated]
-    pagination_class = None
+    pagination_class = OptionalPagination
+    cursor_ordering = ('name', 'pk')
+    price_history_limit = 3
+    max_price_history_limit = 50
+
+    def get_price_history_limit(self):
+        """Return how many price history entries to list, '?history=' overrides the default."""
+        limit = self.request.query_params.get('history')
+        if limit is None:
+            return self.price_history_limit
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = -1
+        if not 0 <= limit <= self.max_price_history_limit:
+            raise ValidationError({'history': [f'Must be a number between 0 and {self.max_price_history_limit}.']})
+        return limit
+
+    def get_queryset(self):
+        """Prefetch the latest price history entries to list, or the whole history to retrieve."""
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            recent = PriceHistory.objects.order_by('-created', '-pk')[:self.get_price_history_limit()]
+            return queryset.prefetch_related(Prefetch('price_history', queryset=recent, to_attr='recent_price_history'))
+        if self.action == 'retrieve':
+            return queryset.prefetch_related('price_history')
+        return queryset
+
+    def get_serializer_class(self):
+        """Return the compact serializer to list."""
+        if self.action == 'list':
+            return ProductListSerializer
+        return super().get_serializer_class()
+
+    @action(detail=False, methods=['get'])
+    def catalog(self, request, *args, **kwargs):
+        """
+        Get the catalog snapshot for POS clients, or its changes since a version.
+
+        Optional query parameters:
+        - since: the 'version' of the last sync, returns only the products changed
+          since then and the pks of the products deleted ('full' is false).
+          The version '0' of an empty catalog gets the full catalog.
+
+        The response carries the version as its ETag, with the 'since' of a
+        delta, a request with 'If-None-Match' set to it gets a 304 without body.
+        """
+        since = request.query_params.get('since')
+        if since == '0':
+            since = None
+        since_date = None
+        if since:
+            try:
+                since_date = datetime.fromisoformat(since)
+            except ValueError:
+                raise ValidationError({'since': ['Invalid version, use the version of the last sync.']}) from None
+
+        version = catalog_version()
+        etag = f'"{version}:{since}"' if since else f'"{version}"'
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        full, products, deleted = catalog_changes(since_date)
+        return Response({
+            'version': version,
+            'full': full,
+            'products': CatalogProductSerializer(products.order_by('pk'), many=True).data,
+            'deleted': deleted
+        }, headers={'ETag': etag})
+
+    @action(detail=False, methods=['get'], url_path=r'barcode/(?P<barcode>[^/]+)')
+    def barcode(self, request, barcode=None, *args, **kwargs):
+        """
+        Resolve a scanned barcode, exact match, served from cache.
+
+        Optional query parameters:
+        - is_bakery: 'price' is the wholesale price when the product has one (true/false)
+
+        Returns the pk, barcode, name, public and wholesale prices, the price to charge and the stock.
+        """
+        product = resolve_barcode(barcode)
+        if product is None:
+            raise NotFound(f'No product with barcode {barcode}.')
+        is_bakery = request.query_params.get('is_bakery', '').lower() in ('true', '1', 'yes')
+        price = product['wholesale_price'] if is_bakery and product['wholesale_price'] is not None else product['public_price']
+        return Response({**product, 'price': price})
+
+    @action(detail=True, methods=['get'], url_path='price-history')
+    def price_history(self, request, *args, **kwargs):
+        """Get the whole price history of a product, newest first."""
+        product = self.get_object()
+        history = product.price_history.order_by('-created', '-pk')
+        return Response(PriceHistorySerializer(history, many=True).data)
+
+    @action(detail=True, methods=['get'])
+    def price(self, request, *args, **kwargs):
+        """
+        Get the prices a product had at a date.
+
+        Required query parameters:
+        - date: YYYY-MM-DD (the prices at the end of that day) or YYYY-MM-DDTHH:MM:SS
+
+        The prices are null if the product had no price yet.
+        """
+        product = self.get_object()
+        serializer = PriceAsOfSerializer(data={'product': product.pk, 'date': request.query_params.get('date')})
+        serializer.is_valid(raise_exception=True)
+        prices = price_as_of(product, serializer.validated_data['date'])
+        return Response({
+            'pk': product.pk,
+            'date': request.query_params['date'],
+            'public_price': prices['public_price'] if prices else None,
+            'wholesale_price': prices['wholesale_price'] if prices else None
+        })
+
+    @action(detail=False, methods=['post'], url_path='prices')
+    def prices(self, request, *args, **kwargs):
+        """
+        Get the prices of many products at many dates with a single query.
+
+        Expects a list of {'product', 'date'}, dates as in the price action.
+        Returns the prices in the same order, null if the product had no price yet.
+        """
+        serializer = PriceAsOfSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        pairs = [(line['product'], line['date']) for line in serializer.validated_data]
+        prices = prices_as_of(pairs)
+        return Response([
+            {
+                'product': product,
+                'date': line['date'],
+                'public_price': prices[product, date]['public_price'] if prices[product, date] else None,
+                'wholesale_price': prices[product, date]['wholesale_price'] if prices[product, date] else None
+            }
+            for (product, date), line in zip(pairs, serializer.initial_data)
+        ])
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[JSONParser, MultiPartParser, FormParser])
+    def import_products(self, request, *args, **kwargs):
+        """
+        Import many products from a JSON list or a CSV file.
+
+        The CSV file is uploaded as 'file', with a header row and ',' or ';' as delimiter.
+
+        Columns: name, category, public_price and optionally barcode, brand, supplier,
+        wholesale_price, current_stock and description. Category, brand and supplier
+        are given by name and must exist.
+
+        Nothing is imported if any row has errors, which are returned per row.
+        """
+        upload = request.FILES.get('file')
+        rows = self.read_csv(upload) if upload else request.data
+        if not isinstance(rows, list):
+            raise ValidationError({'detail': 'Expected a list of products or a CSV file.'})
+
+        serializer = ProductImportSerializer(data=rows, many=True)
+        serializer.is_valid(raise_exception=True)
+        products = serializer.save()
+        return Response({'count': len(products), 'products': [product.pk for product in products]}, status=status.HTTP_201_CREATED)
+
+    def read_csv(self, upload):
+        """Return the rows of an uploaded CSV file, without the empty values."""
+        try:
+            content = io.TextIOWrapper(upload.file, encoding='utf-8-sig')
+            try:
+                dialect = csv.Sniffer().sniff(content.readline(), delimiters=',;')
+            except csv.Error:
+                dialect = csv.excel
+            content.seek(0)
+            return [
+                {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+                for row in csv.DictReader(content, dialect=dialect)
+            ]
+        except (UnicodeDecodeError, csv.Error):
+            raise ValidationError({'file': ['Invalid CSV file, it must be UTF-8 with a header row.']}) from None
+
+    @action(detail=False, methods=['post'])
+    def reprice(self, request, *args, **kwargs):
+        """
+        Change the prices of many products at once.
+
+        Expects one of:
+        - percentage: e.g. 10 raises the prices a 10%, -5 lowers them a 5%
+        - amount: added to the prices
+        - prices: list of {'product', 'public_price', 'wholesale_price'}, the new prices
+
+        And optionally:
+        - category, brand, supplier: the products to change (required unless prices are given)
+        - apply_to: 'public', 'wholesale' or 'both' (default) prices
+        - dry_run: return the changes without applying them
+
+        Returns the old and new prices of every product that changes.
+        """
+        serializer = ProductRepriceSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        queryset = Product.objects.filter(**{name: data[name] for name in ('category', 'brand', 'supplier') if name in data})
+        prices = None
+        if 'prices' in data:
+            prices = {line.pop('product'): line for line in data['prices']}
+            queryset = queryset.filter(pk__in=prices)
+            missing = set(prices) - set(queryset.values_list('pk', flat=True))
+            if missing:
+                raise ValidationError({'prices': [f'Products {sorted(missing)} do not exist or do not match the filters.']})
+
+        try:
+            changes = reprice_products(
+                queryset,
+                percentage=data.get('percentage'),
+                amount=data.get('amount'),
+                prices=prices,
+                apply_to=data['apply_to'],
+                dry_run=data['dry_run']
+            )
+        except ValueError as error:
+            raise ValidationError({'detail': str(error)}) from None
+        return Response({'dry_run': data['dry_run'], 'count': len(changes), 'changes': changes})
+
+    @action(detail=True, methods=['get', 'post'])
+    def stock(self, request, *args, **kwargs):
+        """
+        Get the stock of a product or record a stock movement.
+
+        GET optional query parameters:
+        - date: return also the stock at the end of that day (YYYY-MM-DD)
+
+        POST expects 'kind', 'quantity' (positive adds stock, negative removes it)
+        and an optional 'description'.
+
+        List of kinds:
+        - sal ('Venta' -> Sale in English)
+        - adj ('Ajuste' -> Adjustment in English)
+        - ret ('Devolución' -> Return in English)
+        - dlv ('Entrega de proveedor' -> Supplier delivery in English)
+        """
+        product = self.get_object()
+
+        if request.method == 'POST':
+            serializer = StockMovementSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            if product.current_stock is None:
+                raise ValidationError({'detail': 'The product does not track stock.'})
+            try:
+                adjust_stock(
+                    {product.pk: serializer.validated_data['quantity']},
+                    kind=serializer.validated_data['kind'],
+                    description=serializer.validated_data.get('description')
+                )
+            except InsufficientStock as error:
+                raise ValidationError({'quantity': [str(error)]}) from None
+            product.refresh_from_db(fields=['current_stock', 'modified'])
+            return Response({'pk': product.pk, 'current_stock': product.current_stock}, status=status.HTTP_201_CREATED)
+
+        data = {'pk': product.pk, 'current_stock': product.current_stock}
+        date = request.query_params.get('date')
+        if date:
+            try:
+                end_date = datetime.strptime(date, '%Y-%m-%d') + timedelta(days=1)
+            except ValueError:
+                return Response({"error": "Invalid date format. Use YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+            data['date'] = date
+            data['stock'] = stock_as_of(product, end_date)
+        return Response(data)
 
 
-class ProductCategoryViewSet(mixins.CreateModelMixin,
+class ProductCategoryViewSet(CachedListMixin,
+                             StreamingListMixin,
+                             mixins.CreateModelMixin,
                              mixins.UpdateModelMixin,
                              mixins.RetrieveModelMixin,
                              mixins.ListModelMixin,
@@ -55,6 +372,9 @@ class ProductCategoryViewSet(mixins.CreateModelMixin,
     Provides the following actions:
     - Create a category
     - List categories with search capability by 'name'
+    - Paginate the list by page ('?pagination=page') or by cursor ('?pagination=cursor'), unpaginated by default
+    - Stream the whole list with '?stream=json' or '?stream=ndjson'
+    - Cache the list until the table changes, a matching 'If-None-Match' or 'If-Modified-Since' gets a 304
     - Retrieve a specific category
     - Update a category's details
     - Delete a category
@@ -68,10 +388,13 @@ class ProductCategoryViewSet(mixins.CreateModelMixin,
     filter_backends = (SearchFilter,)
     search_fields = ('name',)
     permission_classes = [IsAuthenticated]
-    pagination_class = None
+    pagination_class = OptionalPagination
+    cursor_ordering = ('name', 'pk')
 
 
-class ProductBrandViewSet(mixins.CreateModelMixin,
+class ProductBrandViewSet(CachedListMixin,
+                          StreamingListMixin,
+                          mixins.CreateModelMixin,
                           mixins.UpdateModelMixin,
                           mixins.RetrieveModelMixin,
                           mixins.ListModelMixin,
@@ -83,6 +406,9 @@ class ProductBrandViewSet(mixins.CreateModelMixin,
     Provides the following actions:
     - Create a brand
     - List brands with search capability by 'name'
+    - Paginate the list by page ('?pagination=page') or by cursor ('?pagination=cursor'), unpaginated by default
+    - Stream the whole list with '?stream=json' or '?stream=ndjson'
+    - Cache the list until the table changes, a matching 'If-None-Match' or 'If-Modified-Since' gets a 304
     - Retrieve a specific brand
     - Update a brand's details
     - Delete a brand
@@ -96,4 +422,5 @@ class ProductBrandViewSet(mixins.CreateModelMixin,
     filter_backends = (SearchFilter,)
     search_fields = ('name',)
     permission_classes = [IsAuthenticated]
-    pagination_class = None
\ No newline at end of file
+    pagination_class = OptionalPagination
+    cursor_ordering = ('name', 'pk')
\ No newline at end of file
@@ -4,7 +4,7 @@
 from django.contrib import admin
 
 # Models
-from panasystem.sales.models import Sale, SaleDetail
+from panasystem.sales.models import Sale, SaleDetail, DailySalesRollup
 
 
 @admin.register(Sale)
@@ -17,4 +17,15 @@ class SaleAdmin(admin.ModelAdmin):
         'total', 'delivered', 'created'
     )
 
+
+@admin.register(DailySalesRollup)
+class DailySalesRollupAdmin(admin.ModelAdmin):
+    """Daily sales rollup admin."""
+
+    list_display = (
+        'date', 'payment_method', 'is_bakery',
+        'count', 'sum_total', 'sum_charged'
+    )
+    list_filter = ('payment_method', 'is_bakery')
+
 admin.site.register(SaleDetail)
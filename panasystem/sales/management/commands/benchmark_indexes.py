@@ -0,0 +1,123 @@
+"""Benchmark sales and expenses indexes command."""
+
+# Django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import F
+
+# Models
+from panasystem.sales.models import Sale
+from panasystem.expenses.models import Expense, ExpenseCategory
+from panasystem.customers.models import Customer
+from panasystem.employees.models import Employee
+from panasystem.suppliers.models import Supplier
+
+# Utilities
+from datetime import datetime, timedelta
+
+
+class Command(BaseCommand):
+    """Print the query plans of the sales and expenses filters with and without their indexes.
+
+    The synthetic rows are seeded inside a transaction that is rolled back
+    at the end, and the indexes are dropped inside a savepoint, so nothing
+    is left behind. Dropping an index locks its table, run it against a
+    copy of the database.
+    """
+
+    help = 'Seed synthetic sales and expenses and print the query plans with and without the indexes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000, help='Number of sales and of expenses to seed.')
+        parser.add_argument('--analyze', action='store_true', help='Run the queries (EXPLAIN ANALYZE).')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('The benchmark requires PostgreSQL.')
+
+        with transaction.atomic():
+            self.seed(options['rows'])
+            for label, queryset, model in self.get_queries():
+                indexes = [index.name for index in model._meta.indexes]
+
+                savepoint = transaction.savepoint()
+                with connection.cursor() as cursor:
+                    for name in indexes:
+                        cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+                before = queryset.explain(analyze=options['analyze'])
+                transaction.savepoint_rollback(savepoint)
+                after = queryset.explain(analyze=options['analyze'])
+
+                self.stdout.write(self.style.MIGRATE_HEADING(label))
+                self.stdout.write('Without indexes:')
+                self.stdout.write(before)
+                self.stdout.write('With indexes:')
+                self.stdout.write(after + '\n')
+            transaction.set_rollback(True)
+
+    def seed(self, rows):
+        """Insert the synthetic rows spread over the last three years."""
+        customers = Customer.objects.bulk_create(Customer(name=f'Cliente {i}') for i in range(1000))
+        categories = ExpenseCategory.objects.bulk_create(ExpenseCategory(name=f'Categoría {i}') for i in range(20))
+        employees = Employee.objects.bulk_create(Employee(name=f'Empleado {i}') for i in range(20))
+        suppliers = Supplier.objects.bulk_create(Supplier(name=f'Proveedor {i}') for i in range(50))
+        self.customer = customers[0]
+        self.category = categories[0]
+        self.employee = employees[0]
+        self.supplier = suppliers[0]
+
+        self.stdout.write(f'Seeding {rows} sales and {rows} expenses...')
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                INSERT INTO {Sale._meta.db_table}
+                    (created, modified, date, customer_id, is_bakery, payment_method, total, total_charged, delivered)
+                SELECT d, d, d,
+                    CASE WHEN i %% 3 = 0 THEN (%s::bigint[])[1 + i %% %s] END,
+                    i %% 5 = 0,
+                    (ARRAY['efv', 'trf', 'crd', 'qr'])[1 + i %% 4],
+                    t,
+                    CASE WHEN i %% 50 = 0 THEN 0 ELSE t END,
+                    i %% 100 <> 0
+                FROM (
+                    SELECT i, LOCALTIMESTAMP - random() * INTERVAL '1095 days' AS d,
+                        round((random() * 10000 + 1)::numeric, 2) AS t
+                    FROM generate_series(1, %s) AS i
+                ) AS seed
+            """, [[customer.pk for customer in customers], len(customers), rows])
+            cursor.execute(f"""
+                INSERT INTO {Expense._meta.db_table}
+                    (created, modified, date, total, category_id, employee_id, supplier_id)
+                SELECT d, d, d,
+                    (random() * 50000)::integer,
+                    (%s::bigint[])[1 + i %% %s],
+                    (%s::bigint[])[1 + i %% %s],
+                    CASE WHEN i %% 2 = 0 THEN (%s::bigint[])[1 + i %% %s] END
+                FROM (
+                    SELECT i, LOCALTIMESTAMP - random() * INTERVAL '1095 days' AS d
+                    FROM generate_series(1, %s) AS i
+                ) AS seed
+            """, [
+                [category.pk for category in categories], len(categories),
+                [employee.pk for employee in employees], len(employees),
+                [supplier.pk for supplier in suppliers], len(suppliers),
+                rows
+            ])
+            cursor.execute(f'ANALYZE {Sale._meta.db_table}')
+            cursor.execute(f'ANALYZE {Expense._meta.db_table}')
+
+    def get_queries(self):
+        """Return the label, queryset and model of the filters used by the lists and totals."""
+        month_ago = datetime.now() - timedelta(days=30)
+        return [
+            ('Sales of a month by payment method and kind', Sale.objects.filter(
+                date__gte=month_ago, payment_method=Sale.PAYMENT_METHOD_TRANSFER, is_bakery=True
+            ), Sale),
+            ('Sales of a customer in a month', Sale.objects.filter(customer=self.customer, date__gte=month_ago), Sale),
+            ('Uncharged sales', Sale.objects.filter(total_charged__lt=F('total')).order_by('-date'), Sale),
+            ('Undelivered sales of a month', Sale.objects.filter(delivered=False, date__gte=month_ago), Sale),
+            ('First page of sales', Sale.objects.all()[:20], Sale),
+            ('Expenses of a category in a month', Expense.objects.filter(category=self.category, date__gte=month_ago), Expense),
+            ('Expenses of an employee in a month', Expense.objects.filter(employee=self.employee, date__gte=month_ago), Expense),
+            ('Expenses of a supplier in a month', Expense.objects.filter(supplier=self.supplier, date__gte=month_ago), Expense),
+            ('First page of expenses', Expense.objects.all()[:20], Expense),
+        ]
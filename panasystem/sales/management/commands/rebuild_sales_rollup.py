@@ -0,0 +1,30 @@
+"""Rebuild daily sales rollup command."""
+
+# Django
+from django.core.management.base import BaseCommand, CommandError
+
+# Models
+from panasystem.sales.models import DailySalesRollup
+
+# Utilities
+from datetime import datetime
+
+
+class Command(BaseCommand):
+    """Rebuild the daily sales rollup from the sales table."""
+
+    help = 'Recompute the daily sales rollup, optionally only between two dates.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date-from', help='First day to rebuild (YYYY-MM-DD).')
+        parser.add_argument('--date-to', help='Last day to rebuild (YYYY-MM-DD).')
+
+    def handle(self, *args, **options):
+        try:
+            date_from = datetime.strptime(options['date_from'], '%Y-%m-%d').date() if options['date_from'] else None
+            date_to = datetime.strptime(options['date_to'], '%Y-%m-%d').date() if options['date_to'] else None
+        except ValueError:
+            raise CommandError('Invalid date format. Use YYYY-MM-DD.') from None
+
+        rows = DailySalesRollup.rebuild(date_from, date_to)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} daily sales rollup rows.'))
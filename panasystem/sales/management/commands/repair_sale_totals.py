@@ -0,0 +1,74 @@
+"""Repair sale totals command."""
+
+# Django
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Sum
+
+# Models
+from panasystem.sales.models import Sale, DailySalesRollup
+
+
+class Command(BaseCommand):
+    """Verify and repair sale totals that drifted from their details.
+
+    Sales are scanned in primary key order, one chunk at a time, and the
+    sum of the details is computed by the database. Sales without details
+    keep their manual total.
+    """
+
+    help = 'Verify that each sale total matches the sum of its details and repair drifted ones.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of sales checked per query (default: 1000).'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report drifted sales, do not repair them.'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        last_pk = 0
+        checked = 0
+        drifted = 0
+
+        while True:
+            pks = list(
+                Sale.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:chunk_size]
+            )
+            if not pks:
+                break
+            last_pk = pks[-1]
+            checked += len(pks)
+
+            sales = list(
+                Sale.objects.filter(pk__in=pks)
+                .annotate(details_total=Sum('sale_details__subtotal'))
+                .filter(details_total__isnull=False)
+                .exclude(total=F('details_total'))
+                .only('pk', 'date', 'payment_method', 'is_bakery', 'total')
+            )
+            if not sales:
+                continue
+            drifted += len(sales)
+
+            changes = {}
+            for sale in sales:
+                self.stdout.write(f'Sale #{sale.pk}: total {sale.total}, details {sale.details_total}')
+                key = sale.get_rollup_key()
+                count, total, charged = changes.get(key, (0, 0, 0))
+                changes[key] = (count, total + sale.details_total - (sale.total or 0), charged)
+                sale.total = sale.details_total
+            if not options['dry_run']:
+                with transaction.atomic():
+                    Sale.objects.bulk_update(sales, ['total'])
+                    DailySalesRollup.apply(changes)
+
+        action = 'Found' if options['dry_run'] else 'Repaired'
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} sales. {action} {drifted} drifted totals.'))
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.11 on 2026-10-17 22:28
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def build_rollup(apps, schema_editor):
+    Sale = apps.get_model('sales', 'Sale')
+    DailySalesRollup = apps.get_model('sales', 'DailySalesRollup')
+
+    totals = (
+        Sale.objects.annotate(day=TruncDate('date'))
+        .values('day', 'payment_method', 'is_bakery')
+        .annotate(count=Count('pk'), sum_total=Sum('total'), sum_charged=Sum('total_charged'))
+        .order_by()
+    )
+    DailySalesRollup.objects.bulk_create([
+        DailySalesRollup(
+            date=row['day'],
+            payment_method=row['payment_method'],
+            is_bakery=row['is_bakery'],
+            count=row['count'],
+            sum_total=row['sum_total'] or 0,
+            sum_charged=row['sum_charged'] or 0,
+        )
+        for row in totals
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0016_alter_sale_payment_method'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, help_text='Date time on which the object was created.', verbose_name='created at')),
+                ('modified', models.DateTimeField(auto_now=True, help_text='Date time on which the object was last modified.', verbose_name='modified at')),
+                ('date', models.DateField(verbose_name='Fecha')),
+                ('payment_method', models.CharField(choices=[('efv', 'Efectivo'), ('trf', 'Transferencia'), ('crd', 'Tarjeta de Débito/Crédito'), ('qr', 'QR')], max_length=3, verbose_name='Método de pago')),
+                ('is_bakery', models.BooleanField(verbose_name='Venta de panadería')),
+                ('count', models.IntegerField(default=0, verbose_name='Cantidad de ventas')),
+                ('sum_total', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Total')),
+                ('sum_charged', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Total cobrado')),
+            ],
+            options={
+                'ordering': ['date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailysalesrollup',
+            constraint=models.UniqueConstraint(fields=('date', 'payment_method', 'is_bakery'), name='dailysalesrollup_unique_day'),
+        ),
+        migrations.RunPython(build_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.11 on 2026-10-17 22:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from panasystem.utils.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    # Build the indexes without locking the table against writes, on PostgreSQL.
+    atomic = False
+
+    dependencies = [
+        ('sales', '0017_dailysalesrollup'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='sale',
+            index=models.Index(fields=['date', 'payment_method', 'is_bakery'], name='sale_date_method_bakery'),
+        ),
+        AddIndexConcurrently(
+            model_name='sale',
+            index=models.Index(fields=['customer', 'date'], name='sale_customer_date'),
+        ),
+        AddIndexConcurrently(
+            model_name='sale',
+            index=models.Index(condition=models.Q(('total_charged__lt', models.F('total'))), fields=['date'], name='sale_uncharged_date'),
+        ),
+        AddIndexConcurrently(
+            model_name='sale',
+            index=models.Index(condition=models.Q(('delivered', False)), fields=['date'], name='sale_undelivered_date'),
+        ),
+        AddIndexConcurrently(
+            model_name='sale',
+            index=models.Index(fields=['-created', '-modified'], name='sale_created_modified'),
+        ),
+        # The (customer, date) index covers the lookups by customer.
+        migrations.AlterField(
+            model_name='sale',
+            name='customer',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='sales', to='customers.customer', verbose_name='Cliente'),
+        ),
+    ]
@@ -1 +1 @@
-from .sales import Sale, SaleDetail
\ No newline at end of file
+from .sales import Sale, SaleDetail, DailySalesRollup
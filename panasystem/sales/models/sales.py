@@ -1,12 +1,17 @@
 """Sales models."""
 
 # Django
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Coalesce, Now, TruncDate
 from django.core.exceptions import ValidationError
 
 # Utilities
 from panasystem.utils.models import PanaderiaModel
 from django.utils.timezone import now
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
 
 
 class Sale(PanaderiaModel):
@@ -32,7 +37,9 @@ class Sale(PanaderiaModel):
         null=True,
         blank=True,
         verbose_name='Cliente',
-        related_name='sales'
+        related_name='sales',
+        # Covered by the (customer, date) index.
+        db_index=False
     )
 
     is_bakery = models.BooleanField(
@@ -70,6 +77,23 @@ class Sale(PanaderiaModel):
         default=True
     )
 
+    class Meta(PanaderiaModel.Meta):
+        """Meta options.
+
+        The indexes follow the filters of the sales list and totals: date
+        ranges combined with the payment method, the kind of sale or the
+        customer, and the uncharged and undelivered sales, which are few
+        so they get partial indexes. The customer is looked up through the
+        (customer, date) index, it has no index of its own.
+        """
+        indexes = [
+            models.Index(fields=['date', 'payment_method', 'is_bakery'], name='sale_date_method_bakery'),
+            models.Index(fields=['customer', 'date'], name='sale_customer_date'),
+            models.Index(fields=['date'], condition=models.Q(total_charged__lt=F('total')), name='sale_uncharged_date'),
+            models.Index(fields=['date'], condition=models.Q(delivered=False), name='sale_undelivered_date'),
+            models.Index(fields=['-created', '-modified'], name='sale_created_modified'),
+        ]
+
     def clean(self):
         """Verify total and total_charged data."""
         if self.total is not None and self.total <= 0:
@@ -77,12 +101,57 @@ class Sale(PanaderiaModel):
         if self.total_charged is not None and self.total_charged < 0:
             raise ValidationError({'total_charged': 'Total charged must be equal to o greater than 0.'})
 
+    def get_unit_price(self, product, prices=None):
+        """Return the price of a product for this sale.
+
+        Bakery sales use the wholesale price when the product has one.
+        ``prices`` overrides the current prices of the product, e.g. with
+        the prices it had at the date of a backdated sale.
+        """
+        if prices is None:
+            prices = {'public_price': product.public_price, 'wholesale_price': product.wholesale_price}
+        if self.is_bakery and prices['wholesale_price'] is not None:
+            return prices['wholesale_price']
+        return prices['public_price']
+
     def calculate_total(self):
-        """Calculate the total from sale details if details exist."""
-        if self.sale_details.exists():
-            self.total = sum(detail.subtotal for detail in self.sale_details.all())
+        """Calculate the total from sale details if details exist.
+
+        The sum is computed by the database, the details are not loaded.
+        """
+        total = self.sale_details.aggregate(total=Sum('subtotal'))['total']
+        if total is not None:
+            self.total = total
         self.save()
 
+    def apply_total_delta(self, delta):
+        """Add ``delta`` to the total with a single UPDATE."""
+        if not delta:
+            return
+        Sale.objects.filter(pk=self.pk).update(
+            total=Coalesce(F('total'), Value(0), output_field=models.DecimalField()) + delta,
+            modified=Now()
+        )
+        self.total = (self.total or 0) + delta
+        DailySalesRollup.apply({self.get_rollup_key(): (0, delta, 0)})
+        self._rollup_state = self.get_rollup_state()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the stored values the daily rollup was computed from."""
+        instance = super().from_db(db, field_names, values)
+        if all(name in instance.__dict__ for name in ('date', 'payment_method', 'is_bakery', 'total', 'total_charged')):
+            instance._rollup_state = instance.get_rollup_state()
+        return instance
+
+    def get_rollup_key(self):
+        """Return the daily rollup row this sale is counted in."""
+        return (self.date.date(), self.payment_method, self.is_bakery)
+
+    def get_rollup_state(self):
+        """Return the rollup key and the amounts this sale contributes."""
+        return (self.get_rollup_key(), self.total or 0, self.total_charged or 0)
+
     def save(self, *args, **kwargs):
         """Save total charged if it's null."""
         self.full_clean()
@@ -135,12 +204,159 @@ class SaleDetail(PanaderiaModel):
             if self.subtotal <= 0:
                 raise ValidationError({'subtotal': 'Subtotal must be greater than 0.'})
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the stored subtotal to update the sale total by difference."""
+        instance = super().from_db(db, field_names, values)
+        instance._stored_subtotal = instance.__dict__.get('subtotal')
+        return instance
+
     def save(self, *args, **kwargs):
-        """Save unit price and subtotal."""
+        """Save unit price and subtotal and update the sale total."""
         self.full_clean()
         self.subtotal = self.quantity * self.unit_price
+        stored_subtotal = 0 if self._state.adding else getattr(self, '_stored_subtotal', None)
         super().save(*args, **kwargs)
+        if stored_subtotal is None:
+            self.sale.calculate_total()
+        else:
+            self.sale.apply_total_delta(self.subtotal - stored_subtotal)
+        self._stored_subtotal = self.subtotal
+
+    def delete(self, *args, **kwargs):
+        """Delete the detail and subtract its subtotal from the sale total."""
+        result = super().delete(*args, **kwargs)
+        self.sale.apply_total_delta(-self.subtotal)
+        return result
 
     def __str__(self):
         """Return product name and quantity."""
         return f'{self.product.name} - {self.quantity}'
+
+
+class DailySalesRollup(PanaderiaModel):
+    """Daily sales rollup model.
+
+    Pre-aggregated count and sums of the sales of a day, per payment method
+    and kind of sale. It is kept up to date when sales are created, updated
+    or deleted and can be rebuilt with the rebuild_sales_rollup command.
+    """
+
+    date = models.DateField('Fecha')
+
+    payment_method = models.CharField(
+        'Método de pago',
+        choices=Sale.PAYMENT_METHODS,
+        max_length=3
+    )
+
+    is_bakery = models.BooleanField('Venta de panadería')
+
+    count = models.IntegerField(
+        'Cantidad de ventas',
+        default=0
+    )
+
+    sum_total = models.DecimalField(
+        'Total',
+        max_digits=14,
+        decimal_places=2,
+        default=0
+    )
+
+    sum_charged = models.DecimalField(
+        'Total cobrado',
+        max_digits=14,
+        decimal_places=2,
+        default=0
+    )
+
+    class Meta:
+        """Meta options."""
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'payment_method', 'is_bakery'], name='dailysalesrollup_unique_day'),
+        ]
+
+    @classmethod
+    def apply(cls, changes):
+        """Apply count and sums deltas.
+
+        ``changes`` maps (date, payment_method, is_bakery) keys to
+        (count, total, charged) deltas.
+        """
+        for (date, payment_method, is_bakery), (count, total, charged) in changes.items():
+            if not (count or total or charged):
+                continue
+            rows = cls.objects.filter(date=date, payment_method=payment_method, is_bakery=is_bakery)
+            values = {
+                'count': F('count') + count,
+                'sum_total': F('sum_total') + total,
+                'sum_charged': F('sum_charged') + charged,
+                'modified': Now()
+            }
+            if rows.update(**values):
+                continue
+            try:
+                with transaction.atomic():
+                    cls.objects.create(
+                        date=date,
+                        payment_method=payment_method,
+                        is_bakery=is_bakery,
+                        count=count,
+                        sum_total=total,
+                        sum_charged=charged
+                    )
+            except IntegrityError:
+                rows.update(**values)
+
+    @classmethod
+    def add_sales(cls, sales, sign=1):
+        """Add (or with ``sign=-1`` subtract) sales to their daily rows."""
+        changes = defaultdict(lambda: [0, Decimal(0), Decimal(0)])
+        for sale in sales:
+            key, total, charged = sale.get_rollup_state()
+            changes[key][0] += sign
+            changes[key][1] += sign * total
+            changes[key][2] += sign * charged
+        cls.apply(changes)
+
+    @classmethod
+    def rebuild(cls, date_from=None, date_to=None):
+        """Recompute the rows between two dates (both included) from the sales.
+
+        Returns the number of rows created.
+        """
+        sales = Sale.objects.all()
+        rows = cls.objects.all()
+        if date_from is not None:
+            sales = sales.filter(date__gte=date_from)
+            rows = rows.filter(date__gte=date_from)
+        if date_to is not None:
+            sales = sales.filter(date__lt=date_to + timedelta(days=1))
+            rows = rows.filter(date__lte=date_to)
+
+        totals = (
+            sales.annotate(day=TruncDate('date'))
+            .values('day', 'payment_method', 'is_bakery')
+            .annotate(count=Count('pk'), sum_total=Sum('total'), sum_charged=Sum('total_charged'))
+            .order_by()
+        )
+        with transaction.atomic():
+            rows.delete()
+            created = cls.objects.bulk_create([
+                cls(
+                    date=row['day'],
+                    payment_method=row['payment_method'],
+                    is_bakery=row['is_bakery'],
+                    count=row['count'],
+                    sum_total=row['sum_total'] or 0,
+                    sum_charged=row['sum_charged'] or 0
+                )
+                for row in totals
+            ], batch_size=1000)
+        return len(created)
+
+    def __str__(self):
+        """Return date, payment method and kind of sale."""
+        return f'{self.date} - {self.payment_method} - {"Panadería" if self.is_bakery else "Público"}'
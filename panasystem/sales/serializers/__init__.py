@@ -1 +1 @@
-from .sales import SaleSerializer, SaleDetailSerializer
\ No newline at end of file
+from .sales import SaleSerializer, SaleDetailSerializer, SaleCreateSerializer
\ No newline at end of file
@@ -1,11 +1,28 @@
 """Sales serializers."""
 
+# Django
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils.timezone import now
+
 # Django REST Framework
 from rest_framework import serializers
 
 # Models
-from panasystem.sales.models import Sale, SaleDetail
-from panasystem.products.models import Product
+from panasystem.sales.models import Sale, SaleDetail, DailySalesRollup
+from panasystem.products.models import Product, StockMovement
+from panasystem.customers.models import Customer
+
+# Services
+from panasystem.products.services import InsufficientStock, adjust_stock, decrement_stock, prices_as_of
+
+# Utilities
+from collections import defaultdict
+from decimal import Decimal
+
+
+def _start_of_today():
+    """Return the start of the current day, sales dated before it are backdated."""
+    return now().replace(hour=0, minute=0, second=0, microsecond=0)
 
 
 class ProductSerializer(serializers.ModelSerializer):
@@ -27,17 +44,19 @@ class SaleDetailSerializer(serializers.ModelSerializer):
         model = SaleDetail
         fields = ('product', 'quantity', 'unit_price', 'subtotal')
         read_only_fields = ('sale', 'subtotal')
+        extra_kwargs = {'unit_price': {'required': False}}
 
     def validate(self, data):
-        """Ensure subtotal is calculated."""
-        data['subtotal'] = round(data['quantity'] * data['unit_price'], 2)
+        """Ensure subtotal is calculated when the unit price is given."""
+        if data.get('unit_price') is not None:
+            data['subtotal'] = round(data['quantity'] * data['unit_price'], 2)
         return data
 
 
 class SaleSerializer(serializers.ModelSerializer):
     """Sale serializer."""
 
-    sale_details = SaleDetailSerializer(many=True, read_only=True)
+    sale_details = SaleDetailSerializer(many=True, required=False)
 
     class Meta:
         """Meta options."""
@@ -53,16 +72,10 @@ class SaleSerializer(serializers.ModelSerializer):
         """Create sale."""
         sale_details_data = validated_data.pop('sale_details', [])
         sale = Sale.objects.create(**validated_data)
-        sale.save()
-
-        for detail_data in sale_details_data:
-            detail_data['sale'] = sale
-            detail_serializer = SaleDetailSerializer(data=detail_data, context={'sale': sale})
-            if not detail_serializer.is_valid():
-                print("Detail Serializer Errors: ", detail_serializer.errors)
-            detail_serializer.save()
 
-        sale.calculate_total()
+        if sale_details_data:
+            self.update_details(sale, sale_details_data)
+            sale.save()
         return sale
 
     def update(self, instance, validated_data):
@@ -77,15 +90,209 @@ class SaleSerializer(serializers.ModelSerializer):
         instance.delivered = validated_data.get('delivered', instance.delivered)
 
         if sale_details_data:
-            instance.sale_details.all().delete()
-            for detail_data in sale_details_data:
-                detail_data['sale'] = instance
-                detail_serializer = SaleDetailSerializer(data=detail_data, context={'sale': instance})
-                if not detail_serializer.is_valid():
-                    print("Detail Serializer Errors: ", detail_serializer.errors)
-                detail_serializer.save()
-
-            instance.calculate_total()
+            self.update_details(instance, sale_details_data)
 
         instance.save()
         return instance
+
+    def update_details(self, sale, details_data):
+        """Replace the details of a sale by diffing them against the stored ones.
+
+        Details are matched by product: changed lines are written with one
+        bulk_update, new lines with one bulk_create and removed lines with a
+        single delete. The stock is corrected by the net quantity delta of
+        each product and the total is computed in memory. Lines without a
+        unit price of a backdated sale are priced as of the sale date.
+        """
+        stored = {}
+        removed = []
+        for detail in sale.sale_details.all():
+            if detail.product_id in stored:
+                removed.append(detail)
+            else:
+                stored[detail.product_id] = detail
+
+        lines = {}
+        for data in details_data:
+            line = lines.setdefault(data['product'].pk, {'product': data['product'], 'quantity': 0, 'unit_price': None})
+            line['quantity'] += data['quantity']
+            if data.get('unit_price') is not None:
+                line['unit_price'] = data['unit_price']
+
+        prices = {}
+        if sale.date is not None and sale.date < _start_of_today():
+            prices = prices_as_of({(product_id, sale.date) for product_id, line in lines.items() if line['unit_price'] is None})
+
+        created = []
+        updated = []
+        details = []
+        quantities = defaultdict(Decimal)
+        for product_id, line in lines.items():
+            detail = stored.pop(product_id, None)
+            if detail is None:
+                detail = SaleDetail(sale=sale, product=line['product'], quantity=0)
+                created.append(detail)
+            elif detail.quantity != line['quantity'] or line['unit_price'] not in (None, detail.unit_price):
+                detail.modified = now()
+                updated.append(detail)
+            else:
+                details.append(detail)
+                continue
+
+            quantities[product_id] += line['quantity'] - detail.quantity
+            detail.quantity = line['quantity']
+            detail.unit_price = (
+                line['unit_price']
+                or detail.unit_price
+                or sale.get_unit_price(line['product'], prices.get((product_id, sale.date)))
+            )
+            detail.subtotal = round(detail.quantity * detail.unit_price, 2)
+            details.append(detail)
+        removed.extend(stored.values())
+        for detail in removed:
+            quantities[detail.product_id] -= detail.quantity
+
+        try:
+            for detail in created + updated:
+                detail.clean()
+        except DjangoValidationError as error:
+            raise serializers.ValidationError({'sale_details': error.messages}) from None
+        try:
+            decrement_stock({pk: quantity for pk, quantity in quantities.items() if quantity > 0})
+            adjust_stock(
+                {pk: -quantity for pk, quantity in quantities.items() if quantity < 0},
+                kind=StockMovement.KIND_RETURN
+            )
+        except InsufficientStock as error:
+            raise serializers.ValidationError({
+                'sale_details': [f"Stock insuficiente para el producto {failure['product']}." for failure in error.failures]
+            }) from None
+
+        if removed:
+            SaleDetail.objects.filter(pk__in=[detail.pk for detail in removed]).delete()
+        if updated:
+            SaleDetail.objects.bulk_update(updated, ['quantity', 'unit_price', 'subtotal', 'modified'])
+        if created:
+            SaleDetail.objects.bulk_create(created)
+
+        sale.total = sum(detail.subtotal for detail in details)
+
+
+class SaleDetailCreateSerializer(serializers.Serializer):
+    """Sale detail line received when creating sales.
+
+    The unit price is always taken from the product, so only the product
+    and the quantity are read from the request.
+    """
+
+    product = serializers.IntegerField()
+    quantity = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+
+
+class SaleBulkCreateSerializer(serializers.ListSerializer):
+    """Create many sales with a fixed number of queries.
+
+    Customers and products referenced by the whole batch are loaded once,
+    as are the past prices of the products of backdated sales. The stock of
+    every product is decremented with a single conditional UPDATE, sales
+    and details are inserted with bulk_create and the daily rollup is
+    updated once per day touched.
+    """
+
+    def create(self, validated_data):
+        """Create sales and sale details in bulk."""
+        customer_ids = {data['customer'] for data in validated_data if data.get('customer') is not None}
+        product_ids = {line['product'] for data in validated_data for line in data.get('sale_details', [])}
+        customers = Customer.objects.in_bulk(customer_ids)
+        products = Product.objects.in_bulk(product_ids)
+
+        # Backdated sales are priced with the prices of their date.
+        today = _start_of_today()
+        prices = prices_as_of({
+            (line['product'], data['date'])
+            for data in validated_data if data.get('date') is not None and data['date'] < today
+            for line in data.get('sale_details', [])
+        })
+
+        errors = [{} for _ in validated_data]
+        line_errors = [[{} for _ in data.get('sale_details', [])] for data in validated_data]
+        product_lines = defaultdict(list)
+        quantities = defaultdict(Decimal)
+        sales = []
+        sale_details = []
+
+        for index, data in enumerate(validated_data):
+            lines = data.pop('sale_details', [])
+            customer_id = data.pop('customer', None)
+            if customer_id is not None and customer_id not in customers:
+                errors[index]['customer'] = [f'Customer with id {customer_id} does not exist.']
+
+            sale = Sale(customer_id=customer_id, **data)
+            details = []
+            for position, line in enumerate(lines):
+                product = products.get(line['product'])
+                if product is None:
+                    line_errors[index][position]['product'] = [f"Product with id {line['product']} does not exist."]
+                    continue
+                unit_price = sale.get_unit_price(product, prices.get((product.pk, sale.date)))
+                details.append(SaleDetail(
+                    sale=sale,
+                    product=product,
+                    quantity=line['quantity'],
+                    unit_price=unit_price,
+                    subtotal=round(line['quantity'] * unit_price, 2)
+                ))
+                quantities[product.pk] += line['quantity']
+                product_lines[product.pk].append((index, position))
+
+            if details:
+                sale.total = sum(detail.subtotal for detail in details)
+            if sale.total_charged is None:
+                sale.total_charged = sale.total
+            try:
+                sale.clean()
+                for detail in details:
+                    detail.clean()
+            except DjangoValidationError as error:
+                errors[index].update(error.message_dict)
+
+            sales.append(sale)
+            sale_details.extend(details)
+
+        try:
+            decrement_stock(quantities)
+        except InsufficientStock as error:
+            for failure in error.failures:
+                for index, position in product_lines[failure['product']]:
+                    line_errors[index][position]['quantity'] = ['Stock insuficiente para actualizar.']
+
+        for index, lines in enumerate(line_errors):
+            if any(lines):
+                errors[index]['sale_details'] = lines
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+        Sale.objects.bulk_create(sales)
+        SaleDetail.objects.bulk_create(sale_details)
+        DailySalesRollup.add_sales(sales)
+        for sale in sales:
+            sale._rollup_state = sale.get_rollup_state()
+
+        return sales
+
+
+class SaleCreateSerializer(serializers.ModelSerializer):
+    """Sale serializer used to create one or many sales."""
+
+    customer = serializers.IntegerField(required=False, allow_null=True)
+    sale_details = SaleDetailCreateSerializer(many=True, required=False)
+
+    class Meta:
+        """Meta options."""
+
+        model = Sale
+        fields = (
+            'date', 'customer', 'is_bakery', 'payment_method',
+            'total', 'total_charged', 'delivered', 'sale_details'
+        )
+        list_serializer_class = SaleBulkCreateSerializer
@@ -0,0 +1,40 @@
+"""Sales signals."""
+
+# Django
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+# Models
+from panasystem.sales.models import Sale, DailySalesRollup
+
+
+@receiver(post_save, sender=Sale)
+def update_daily_rollup(sender, instance, created, raw=False, **kwargs):
+    """Move the sale contribution in the daily rollup to its new values."""
+    if raw:
+        return
+    stored = None if created else getattr(instance, '_rollup_state', None)
+    current = instance.get_rollup_state()
+    if stored == current:
+        return
+
+    changes = {}
+    if stored is not None:
+        key, total, charged = stored
+        changes[key] = (-1, -total, -charged)
+    key, total, charged = current
+    count, stored_total, stored_charged = changes.get(key, (0, 0, 0))
+    changes[key] = (count + 1, stored_total + total, stored_charged + charged)
+    if stored is None and not created:
+        # The previous values are unknown, recompute the day from the sales.
+        DailySalesRollup.rebuild(key[0], key[0])
+    else:
+        DailySalesRollup.apply(changes)
+    instance._rollup_state = current
+
+
+@receiver(post_delete, sender=Sale)
+def remove_from_daily_rollup(sender, instance, **kwargs):
+    """Subtract the deleted sale from the daily rollup."""
+    key, total, charged = getattr(instance, '_rollup_state', None) or instance.get_rollup_state()
+    DailySalesRollup.apply({key: (-1, -total, -charged)})
@@ -4,13 +4,16 @@
 import pytest
 
 # Django
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils.timezone import now
 
 # Django REST Framework
 from rest_framework import status
 
 # Models
-from panasystem.sales.models import Sale, SaleDetail
+from panasystem.sales.models import Sale, SaleDetail, DailySalesRollup
 from panasystem.products.models import Product, Category, Brand
 from panasystem.customers.models import Customer
 from panasystem.suppliers.models import Supplier
@@ -20,6 +23,7 @@ from panasystem.sales.serializers import SaleSerializer
 
 # Utilities
 from datetime import datetime
+from io import StringIO
 
 # Utils
 from panasystem.utils.connect_api_tests import api_client
@@ -429,4 +433,331 @@ def test_get_sale_totals(api_client):
     response = api_client[0].get(url, format='json')
     assert response.status_code == status.HTTP_200_OK
     assert response.data['total_sales'] == 2
-    assert response.data['sum_total'] == 250.0
\ No newline at end of file
+    assert response.data['sum_total'] == 250.0
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != 'postgresql', reason='Other databases split bulk inserts by their parameter limit.')
+def test_create_sales_batch_query_count(api_client):
+    """
+    Test creating a large batch of sales via the API.
+
+    Ensures that a batch of 200 sales makes as many queries as a batch of
+    10, once the day's rollup exists, and that the stock is decremented
+    once per product.
+    """
+    customer = Customer.objects.create(name="John Doe")
+    category = Category.objects.create(name="Bakery")
+    bread = Product.objects.create(name="Bread", category=category, public_price=2, current_stock=1000)
+    milk = Product.objects.create(name="Milk", category=category, public_price=1, wholesale_price=0.5)
+
+    def sales_data(count):
+        return [
+            {
+                'customer': customer.id,
+                'sale_details': [
+                    {'product': bread.id, 'quantity': 2},
+                    {'product': milk.id, 'quantity': 1}
+                ]
+            }
+            for _ in range(count)
+        ]
+
+    response = api_client[0].post('/api/v1/sales/', sales_data(1), format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    with CaptureQueriesContext(connection) as small:
+        response = api_client[0].post('/api/v1/sales/', sales_data(10), format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    with CaptureQueriesContext(connection) as large:
+        response = api_client[0].post('/api/v1/sales/', sales_data(200), format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    assert len(large) == len(small)
+    assert len(response.data) == 200
+    assert response.data[0]['total'] == '5.00'
+    assert len(response.data[0]['sale_details']) == 2
+    assert Sale.objects.count() == 211
+    assert SaleDetail.objects.count() == 422
+    bread.refresh_from_db()
+    milk.refresh_from_db()
+    assert bread.current_stock == 578
+    assert milk.current_stock is None
+
+
+@pytest.mark.django_db
+def test_create_sales_insufficient_stock(api_client):
+    """
+    Test creating sales that exceed the available stock.
+
+    Ensures that nothing is created and the failing lines are reported.
+    """
+    category = Category.objects.create(name="Bakery")
+    bread = Product.objects.create(name="Bread", category=category, public_price=2, current_stock=3)
+    sales_data = [
+        {'sale_details': [{'product': bread.id, 'quantity': 2}]},
+        {'sale_details': [{'product': bread.id, 'quantity': 2}]}
+    ]
+    response = api_client[0].post('/api/v1/sales/', sales_data, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'quantity' in response.data[1]['sale_details'][0]
+    assert Sale.objects.count() == 0
+    bread.refresh_from_db()
+    assert bread.current_stock == 3
+
+
+@pytest.mark.django_db
+def test_sale_detail_updates_total_incrementally(django_assert_num_queries):
+    """
+    Test that editing a sale detail updates the sale total by difference.
+
+    Ensures that the other details of the sale are not reloaded.
+    """
+    category = Category.objects.create(name="Bakery")
+    product = Product.objects.create(name="Bread", category=category, public_price=2)
+    sale = Sale.objects.create(total=1)
+    for _ in range(40):
+        SaleDetail.objects.create(sale=sale, product=product, quantity=1, unit_price=2, subtotal=2)
+    sale.calculate_total()
+    sale.refresh_from_db()
+    assert sale.total == 80
+
+    detail = SaleDetail.objects.select_related('sale').first()
+    detail.quantity = 3
+    with django_assert_num_queries(5):
+        detail.save()
+    sale.refresh_from_db()
+    assert sale.total == 84
+
+    detail.delete()
+    sale.refresh_from_db()
+    assert sale.total == 78
+
+
+@pytest.mark.django_db
+def test_repair_sale_totals_command():
+    """
+    Test the command that repairs drifted sale totals.
+
+    Ensures that drifted totals are fixed and sales without details are kept.
+    """
+    category = Category.objects.create(name="Bakery")
+    product = Product.objects.create(name="Bread", category=category, public_price=2)
+    sale = Sale.objects.create(total=1)
+    SaleDetail.objects.create(sale=sale, product=product, quantity=5, unit_price=2, subtotal=10)
+    fast_sale = Sale.objects.create(total=500)
+    Sale.objects.filter(pk=sale.pk).update(total=999)
+
+    call_command('repair_sale_totals', '--chunk-size', '1', stdout=StringIO())
+    sale.refresh_from_db()
+    fast_sale.refresh_from_db()
+    assert sale.total == 10
+    assert fast_sale.total == 500
+
+
+@pytest.mark.django_db
+def test_update_sale_details_diff(api_client):
+    """
+    Test updating the details of a sale via the API.
+
+    Ensures that unchanged products keep their rows, removed products are
+    deleted, new products are created and the stock follows the net change.
+    """
+    category = Category.objects.create(name="Bakery")
+    bread = Product.objects.create(name="Bread", category=category, public_price=2, current_stock=50)
+    milk = Product.objects.create(name="Milk", category=category, public_price=1, current_stock=50)
+    cake = Product.objects.create(name="Cake", category=category, public_price=10, current_stock=50)
+    response = api_client[0].post('/api/v1/sales/', {
+        'sale_details': [
+            {'product': bread.id, 'quantity': 2},
+            {'product': milk.id, 'quantity': 3}
+        ]
+    }, format='json')
+    sale = Sale.objects.get(pk=response.data[0]['pk'])
+    bread_detail = sale.sale_details.get(product=bread)
+
+    response = api_client[0].patch(f'/api/v1/sales/{sale.id}/', {
+        'sale_details': [
+            {'product': bread.id, 'quantity': 5},
+            {'product': cake.id, 'quantity': 1}
+        ]
+    }, format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['total'] == '20.00'
+    assert len(response.data['sale_details']) == 2
+    assert sale.sale_details.get(product=bread).pk == bread_detail.pk
+    assert not sale.sale_details.filter(product=milk).exists()
+    for product, stock in ((bread, 45), (milk, 50), (cake, 49)):
+        product.refresh_from_db()
+        assert product.current_stock == stock
+
+
+@pytest.mark.django_db
+def test_daily_sales_rollup_maintained():
+    """
+    Test that the daily sales rollup follows sale creation, update and deletion.
+
+    Ensures that the maintained rows match a rebuild from the sales table.
+    """
+    def rollup():
+        return sorted(DailySalesRollup.objects.values_list('date', 'payment_method', 'is_bakery', 'count', 'sum_total', 'sum_charged'))
+
+    sale = Sale.objects.create(total=100, date=datetime(2024, 1, 1, 10))
+    Sale.objects.create(total=50, total_charged=20, date=datetime(2024, 1, 1, 12))
+    other = Sale.objects.create(total=30, payment_method=Sale.PAYMENT_METHOD_QR, date=datetime(2024, 1, 2, 9))
+    sale = Sale.objects.get(pk=sale.pk)
+    sale.payment_method = Sale.PAYMENT_METHOD_CARD
+    sale.total = 120
+    sale.save()
+    other.delete()
+
+    maintained = rollup()
+    assert len(maintained) == 3
+    DailySalesRollup.rebuild()
+    assert [row for row in rollup() if row[3]] == [row for row in maintained if row[3]]
+
+
+@pytest.mark.django_db
+def test_get_sale_totals_partial_days(api_client):
+    """
+    Test retrieving totals for a range that starts and ends in the middle of a day.
+
+    Ensures that full days come from the rollup and edge days from the sales.
+    """
+    for day, hour, total in ((1, 8, 10), (1, 20, 20), (2, 12, 40), (3, 8, 80), (3, 20, 160)):
+        Sale.objects.create(total=total, date=datetime(2024, 1, day, hour))
+    url = '/api/v1/sales/totals/?date_from=2024-01-01T12:00:00&date_to=2024-01-03T12:00:00'
+    response = api_client[0].get(url, format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['total_sales'] == 3
+    assert response.data['sum_total'] == 140
+
+
+@pytest.mark.django_db
+def test_get_sale_totals_breakdowns(api_client):
+    """
+    Test retrieving totals with the breakdowns and the outstanding balance.
+
+    Ensures that the amounts by payment method and kind of sale add up and
+    that the groups merge the rollup and the partial days.
+    """
+    customer = Customer.objects.create(name="John Doe")
+    Sale.objects.create(total=100, total_charged=100, payment_method='efv', date=datetime(2024, 1, 1, 10))
+    Sale.objects.create(total=50, total_charged=20, payment_method='trf', is_bakery=True, customer=customer, date=datetime(2024, 1, 1, 18))
+    Sale.objects.create(total=30, total_charged=0, payment_method='efv', customer=customer, date=datetime(2024, 2, 3, 9))
+    Sale.objects.create(total=70, total_charged=70, payment_method='efv', date=datetime(2024, 2, 3, 20))
+
+    url = '/api/v1/sales/totals/?date_from=2024-01-01&date_to=2024-02-03T12:00:00&group_by=month,payment_method'
+    response = api_client[0].get(url, format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['total_sales'] == 3
+    assert response.data['sum_total'] == 180
+    assert response.data['outstanding'] == 60
+    assert response.data['by_payment_method']['efv']['sum_total'] == 130
+    assert response.data['by_payment_method']['trf']['outstanding'] == 30
+    assert response.data['by_is_bakery']['true']['total_sales'] == 1
+    assert [(group['month'].month, group['payment_method'], group['sum_total']) for group in response.data['groups']] == [
+        (1, 'efv', 100), (1, 'trf', 50), (2, 'efv', 30)
+    ]
+
+    response = api_client[0].get('/api/v1/sales/totals/?date_from=2024-01-01&date_to=2024-02-28&group_by=customer', format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert [(group['customer'], group['outstanding']) for group in response.data['groups']] == [(customer.pk, 60), (None, 0)]
+
+    response = api_client[0].get('/api/v1/sales/totals/?date_from=2024-01-01&date_to=2024-02-28&group_by=year', format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != 'postgresql', reason='The query plans are read from PostgreSQL.')
+def test_benchmark_indexes_command():
+    """
+    Test the indexes benchmark command.
+
+    Ensures that the plans are printed and the seeded rows are rolled back.
+    """
+    out = StringIO()
+    call_command('benchmark_indexes', rows=100, stdout=out)
+    assert 'Uncharged sales' in out.getvalue()
+    assert 'Without indexes:' in out.getvalue()
+    assert not Sale.objects.exists()
+    assert not Customer.objects.exists()
+
+
+@pytest.mark.django_db
+def test_list_sales_cursor_pagination(api_client):
+    """
+    Test listing sales with the date cursor.
+
+    Ensures that the cursor is the default, that following the next links
+    walks every sale newest first, also among sales of the same date, that
+    the previous links walk back, and that the count is only returned when
+    asked.
+    """
+    for day in range(1, 26):
+        Sale.objects.create(total=day, date=datetime(2024, 1, day))
+    for _ in range(5):
+        Sale.objects.create(total=1, date=datetime(2024, 1, 5))
+
+    response = api_client[0].get('/api/v1/sales/?page_size=4', format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert 'count' not in response.data
+    assert response.data['previous'] is None
+    pages = [response.data['results']]
+    while response.data['next']:
+        response = api_client[0].get(response.data['next'], format='json')
+        pages.append(response.data['results'])
+    sales = [(sale['date'], sale['pk']) for page in pages for sale in page]
+    assert len(sales) == 30
+    assert sales == sorted(sales, reverse=True)
+
+    for page in reversed(pages[:-1]):
+        response = api_client[0].get(response.data['previous'], format='json')
+        assert response.data['results'] == page
+    assert response.data['previous'] is None
+
+    response = api_client[0].get('/api/v1/sales/?pagination=cursor&count=true&date_range_after=2024-01-10', format='json')
+    assert response.data['count'] == 16
+
+    response = api_client[0].get('/api/v1/sales/?count=false&page=2', format='json')
+    assert 'count' not in response.data
+    assert len(response.data['results']) == 10
+    assert response.data['next'] is None
+
+    response = api_client[0].get('/api/v1/sales/?pagination=offset', format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_async_sales_list_and_totals(api_client):
+    """
+    Test the async sales list and totals.
+
+    Ensures that they answer like the sales list and totals, and that they
+    require authentication.
+    """
+    customer = Customer.objects.create(name="John Doe")
+    for day in range(1, 26):
+        Sale.objects.create(total=day, total_charged=0, customer=customer if day % 2 else None, date=datetime(2024, 1, day))
+
+    url = '/api/v1/async/sales/?page_size=10&page=2&customer=' + str(customer.pk)
+    response = api_client[0].get(url)
+    expected = api_client[0].get(url.replace('/async', '')).json()
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['results'] == expected['results']
+    assert response.json()['count'] == expected['count'] == 13
+    assert response.json()['next'] is None
+
+    url = '/api/v1/async/sales/totals/?date_from=2024-01-01&date_to=2024-01-20T12:00:00&group_by=customer'
+    response = api_client[0].get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == api_client[0].get(url.replace('/async', '')).json()
+    assert response.json()['total_sales'] == 20
+
+    response = api_client[0].get('/api/v1/async/sales/totals/?date_from=2024-01-01')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'error' in response.json()
+    response = api_client[0].get('/api/v1/async/sales/?customer=nobody')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    api_client[0].credentials()
+    response = api_client[0].get('/api/v1/async/sales/')
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
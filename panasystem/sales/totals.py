@@ -0,0 +1,168 @@
+"""Sales totals."""
+
+# Django
+from django.db.models import Count, DateField, F, Q, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+
+# Models
+from panasystem.sales.models import Sale, DailySalesRollup
+
+# Utilities
+from datetime import datetime, time, timedelta
+
+AMOUNTS = ('total_sales', 'sum_total', 'sum_charged')
+
+
+class SalesTotals:
+    """Totals of the sales between two datetimes.
+
+    Full days are read from the daily rollup and only the partial days at
+    the edges of the range are aggregated from the sales table, so the
+    cost does not grow with the length of the range. Breakdowns by
+    customer are not in the rollup and always come from the sales table.
+    """
+
+    GROUPS = ('payment_method', 'is_bakery', 'customer', 'day', 'week', 'month')
+
+    def __init__(self, start, end, is_bakery=None, payment_method=None):
+        """Set the range [start, end) and the optional filters."""
+        self.start = start
+        self.end = end
+        self.filters = {}
+        if is_bakery is not None:
+            self.filters['is_bakery'] = is_bakery
+        if payment_method:
+            self.filters['payment_method'] = payment_method
+
+    def split(self):
+        """Return the full days (first, last excluded) and the partial edge ranges."""
+        first_day = self.start.date() if self.start.time() == time.min else self.start.date() + timedelta(days=1)
+        last_day = self.end.date()
+        if first_day >= last_day:
+            return None, [(self.start, self.end)]
+
+        edges = []
+        if self.start < datetime.combine(first_day, time.min):
+            edges.append((self.start, datetime.combine(first_day, time.min)))
+        if self.end > datetime.combine(last_day, time.min):
+            edges.append((datetime.combine(last_day, time.min), self.end))
+        return (first_day, last_day), edges
+
+    def get_rollup_queryset(self, days):
+        """Return the rollup rows of the full days."""
+        return DailySalesRollup.objects.filter(date__gte=days[0], date__lt=days[1], **self.filters)
+
+    def get_sales_queryset(self, edges):
+        """Return the sales of the partial edge ranges."""
+        ranges = Q()
+        for start, end in edges:
+            ranges |= Q(date__gte=start, date__lt=end)
+        return Sale.objects.filter(ranges, **self.filters)
+
+    def get_sources(self, rollup=True):
+        """Return the querysets to aggregate and how to aggregate each of them."""
+        days, edges = self.split()
+        if not rollup:
+            days, edges = None, [(self.start, self.end)]
+
+        sources = []
+        if days:
+            sources.append((self.get_rollup_queryset(days), {
+                'total_sales': lambda **kwargs: Sum('count', **kwargs),
+                'sum_total': lambda **kwargs: Sum('sum_total', **kwargs),
+                'sum_charged': lambda **kwargs: Sum('sum_charged', **kwargs),
+                'day': F('date'),
+                'week': TruncWeek('date'),
+                'month': TruncMonth('date')
+            }))
+        if edges:
+            sources.append((self.get_sales_queryset(edges), {
+                'total_sales': lambda **kwargs: Count('pk', **kwargs),
+                'sum_total': lambda **kwargs: Sum('total', **kwargs),
+                'sum_charged': lambda **kwargs: Sum('total_charged', **kwargs),
+                'day': TruncDate('date'),
+                'week': TruncWeek('date', output_field=DateField()),
+                'month': TruncMonth('date', output_field=DateField())
+            }))
+        return sources
+
+    def get_summary_queries(self):
+        """Return one (queryset, aggregates) pair per source.
+
+        Besides the overall amounts, the breakdowns by payment method and
+        kind of sale are computed in the same query with conditional
+        aggregation.
+        """
+        breakdowns = {
+            f'{method}__': Q(payment_method=method) for method, _ in Sale.PAYMENT_METHODS
+        }
+        breakdowns['bakery__'] = Q(is_bakery=True)
+        breakdowns['retail__'] = Q(is_bakery=False)
+
+        queries = []
+        for queryset, expressions in self.get_sources():
+            aggregates = {f'all__{amount}': expressions[amount]() for amount in AMOUNTS}
+            for prefix, condition in breakdowns.items():
+                for amount in AMOUNTS:
+                    aggregates[prefix + amount] = expressions[amount](filter=condition)
+            queries.append((queryset, aggregates))
+        return queries
+
+    def combine_summary(self, rows):
+        """Merge the aggregated rows of every source into the summary."""
+        def amounts(prefix='all__'):
+            values = {amount: sum(row[prefix + amount] or 0 for row in rows) for amount in AMOUNTS}
+            values['outstanding'] = values['sum_total'] - values['sum_charged']
+            return values
+
+        summary = amounts()
+        summary['by_payment_method'] = {method: amounts(f'{method}__') for method, _ in Sale.PAYMENT_METHODS}
+        summary['by_is_bakery'] = {'true': amounts('bakery__'), 'false': amounts('retail__')}
+        return summary
+
+    def get(self):
+        """Return the number of sales, the sums of totals and charged and the outstanding balance."""
+        return self.combine_summary([
+            queryset.aggregate(**aggregates) for queryset, aggregates in self.get_summary_queries()
+        ])
+
+    async def aget(self):
+        """Return the summary with the async ORM."""
+        return self.combine_summary([
+            await queryset.aaggregate(**aggregates) for queryset, aggregates in self.get_summary_queries()
+        ])
+
+    def get_group_queries(self, group_by):
+        """Return one grouped queryset per source."""
+        queries = []
+        for queryset, expressions in self.get_sources(rollup='customer' not in group_by):
+            dimensions = {name: expressions[name] for name in group_by if name in ('day', 'week', 'month')}
+            queries.append(
+                queryset.annotate(**dimensions)
+                .values(*group_by)
+                .annotate(**{f'all__{amount}': expressions[amount]() for amount in AMOUNTS})
+                .order_by()
+            )
+        return queries
+
+    def combine_groups(self, group_by, rows):
+        """Merge the grouped rows of every source, sorted by group."""
+        groups = {}
+        for row in rows:
+            key = tuple(row[name] for name in group_by)
+            group = groups.setdefault(key, dict(zip(group_by, key), **{amount: 0 for amount in AMOUNTS}))
+            for amount in AMOUNTS:
+                group[amount] += row[f'all__{amount}'] or 0
+        for group in groups.values():
+            group['outstanding'] = group['sum_total'] - group['sum_charged']
+        return [groups[key] for key in sorted(groups, key=lambda key: tuple((value is None, value) for value in key))]
+
+    def get_groups(self, group_by):
+        """Return the amounts grouped by the given dimensions."""
+        return self.combine_groups(group_by, [row for queryset in self.get_group_queries(group_by) for row in queryset])
+
+    async def aget_groups(self, group_by):
+        """Return the grouped amounts with the async ORM."""
+        return self.combine_groups(group_by, [
+            row for queryset in self.get_group_queries(group_by) async for row in queryset
+        ])
@@ -1 +1,2 @@
-from .sales import SaleViewSet
\ No newline at end of file
+from .sales import SaleViewSet
+from .asynchronous import AsyncSaleListView, AsyncSaleTotalsView
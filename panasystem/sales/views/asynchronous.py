@@ -0,0 +1,58 @@
+"""Sales async views."""
+
+# Django
+from django.http import JsonResponse
+
+# Serializers
+from panasystem.sales.serializers import SaleSerializer
+
+# Views
+from panasystem.sales.views.sales import SaleFilter, SaleViewSet, get_sales_totals
+
+# Utilities
+from panasystem.utils.views import AsyncAPIView
+
+
+class AsyncSaleListView(AsyncAPIView):
+    """
+    List sales with the async ORM.
+
+    Same filters, search and ordering as the sales list, paginated by
+    page ('?page', '?page_size').
+
+    Permissions:
+    - Requires the user to be authenticated.
+    """
+
+    filter_backends = SaleViewSet.filter_backends
+    filterset_class = SaleFilter
+    search_fields = SaleViewSet.search_fields
+    ordering_fields = SaleViewSet.ordering_fields
+
+    async def get(self, request, *args, **kwargs):
+        """List the sales."""
+        queryset = await self.afilter_queryset(SaleViewSet.queryset.all())
+        return await self.apaginate(queryset, lambda sales: SaleSerializer(sales, many=True).data)
+
+
+class AsyncSaleTotalsView(AsyncAPIView):
+    """
+    Get the sales totals with the async ORM.
+
+    Same query parameters and response as 'sales/totals/'.
+
+    Permissions:
+    - Requires the user to be authenticated.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        """Get the totals."""
+        try:
+            sales_totals, group_by = get_sales_totals(request.query_params)
+        except ValueError as error:
+            return JsonResponse({"error": str(error)}, status=400)
+
+        totals = await sales_totals.aget()
+        if group_by:
+            totals['groups'] = await sales_totals.aget_groups(group_by)
+        return totals
@@ -1,7 +1,7 @@
 """Sales views."""
 
 # Django
-from django.db.models import F
+from django.db.models import F, prefetch_related_objects
 
 # Django REST Framework
 from rest_framework import mixins, viewsets, status
@@ -10,21 +10,70 @@ from django_filters import rest_framework as filters
 from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.pagination import PageNumberPagination
-from rest_framework.exceptions import ValidationError
 from rest_framework.decorators import action
 
 # Serializers
-from panasystem.sales.serializers import SaleSerializer, SaleDetailSerializer
+from panasystem.sales.serializers import SaleSerializer, SaleCreateSerializer
 
 # Models
 from panasystem.sales.models import Sale
-from panasystem.products.models import Product
 
 # Utilities
 from datetime import datetime, timedelta
 from django.db import transaction
-from django.db.models import Sum
+from panasystem.sales.totals import SalesTotals
+from panasystem.utils.pagination import SelectablePagination
+
+
+def parse_date_bound(value, end=False):
+    """Parse a date (YYYY-MM-DD) or a datetime (ISO 8601) range bound.
+
+    A date used as the end of a range includes the whole day.
+    """
+    try:
+        date = datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        return datetime.fromisoformat(value)
+    return date + timedelta(days=1) if end else date
+
+
+def get_sales_totals(query_params):
+    """Return the SalesTotals and the grouping asked by the totals query parameters.
+
+    Raises ValueError with the message for the client when they are invalid.
+    """
+    date_from = query_params.get('date_from')
+    date_to = query_params.get('date_to')
+    payment_method = query_params.get('payment_method')
+    is_bakery = query_params.get('is_bakery')
+    group_by = [name for name in query_params.get('group_by', '').split(',') if name]
+
+    # Verify the existence of parameters.
+    if not date_from or not date_to:
+        raise ValueError("date_from and date_to parameters are required (is_bakery and payment_method are optional).")
+
+    # Convert dates to a valid format.
+    try:
+        start_date = parse_date_bound(date_from)
+        end_date = parse_date_bound(date_to, end=True)
+    except ValueError:
+        raise ValueError("Invalid date format. Use YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS.") from None
+
+    # Convert 'is_bakery' to boolean.
+    if is_bakery is not None:
+        if is_bakery.lower() in ['true', '1', 'yes']:
+            is_bakery = True
+        elif is_bakery.lower() in ['false', '0', 'no']:
+            is_bakery = False
+        else:
+            raise ValueError("Invalid value for is_bakery. Use 'true' or 'false'.")
+
+    # Verify the grouping.
+    invalid = [name for name in group_by if name not in SalesTotals.GROUPS]
+    if invalid or len(set(group_by)) != len(group_by):
+        raise ValueError(f"Invalid group_by. Use a comma separated list of {', '.join(SalesTotals.GROUPS)}.")
+
+    return SalesTotals(start_date, end_date, is_bakery=is_bakery, payment_method=payment_method), group_by
 
 
 class DateFilter(filters.Filter):
@@ -72,6 +121,9 @@ class SaleViewSet(mixins.CreateModelMixin,
     - List sales with filters by 'customer', 'is_bakery', 'payment_method', 'delivered', 'date', 'date_range', 'total_charged'
     - Search sales by 'customer name'
     - Order sales by 'date' or 'total'
+    - Paginate by (date, pk) cursor (default, newest first, '?count=true' adds the total count),
+      by page ('?pagination=page', or a 'page' or 'ordering' given, '?count=false' skips the total count)
+      or not at all ('?pagination=none')
     - Retrieve a specific sale
     - Update a sale's details
     - Delete a sale
@@ -87,7 +139,7 @@ class SaleViewSet(mixins.CreateModelMixin,
     search_fields = ('customer__name',)
     ordering_fields = ('date', 'total')
     permission_classes = [IsAuthenticated]
-    pagination_class = PageNumberPagination
+    pagination_class = SelectablePagination
 
     def create(self, request, *args, **kwargs):
         """Create one or multiple sales in a single request."""
@@ -96,57 +148,38 @@ class SaleViewSet(mixins.CreateModelMixin,
         if not isinstance(sales_data, list):
             sales_data = [sales_data]
 
-        created_sales = []
+        serializer = SaleCreateSerializer(data=sales_data, many=True)
+        serializer.is_valid(raise_exception=True)
 
         with transaction.atomic():
-            for sale_data in sales_data:
-                details_data = sale_data.pop('sale_details', [])
-                serializer = self.get_serializer(data=sale_data)
-                serializer.is_valid(raise_exception=True)
-                self.perform_create(serializer)
-                sale_instance = serializer.instance
-
-                is_bakery = sale_instance.is_bakery
-
-                for detail_data in details_data:
-                    product_id = detail_data['product']
-                    try:
-                        product = Product.objects.get(pk=product_id)
-                    except Product.DoesNotExist:
-                        raise ValidationError(f"Product with id {product_id} does not exist.")
-
-                    if is_bakery and product.wholesale_price is not None:
-                        unit_price = product.wholesale_price
-                    else:
-                        unit_price = product.public_price
-
-                    detail_data['unit_price'] = unit_price
-                    product.update_stock(detail_data['quantity'])
-
-                sale_details_serializer = SaleDetailSerializer(data=details_data, many=True)
-                sale_details_serializer.is_valid(raise_exception=True)
-                sale_details_serializer.save(sale=sale_instance)
-
-                sale_instance.calculate_total()
-                created_sales.append(serializer.data)
+            sales = serializer.save()
+            prefetch_related_objects(sales, 'sale_details')
 
+        created_sales = SaleSerializer(sales, many=True).data
         headers = self.get_success_headers(created_sales)
         return Response(created_sales, status=status.HTTP_201_CREATED, headers=headers)
 
     @action(detail=False, methods=['get'])
     def totals(self, request, *args, **kwargs):
         """
-        Get total sales and sum of totals.
+        Get total sales, sum of totals, sum charged and outstanding balance.
+
+        Full days are read from the daily sales rollup, only partial days are
+        aggregated from the sales. The breakdowns by payment method and by
+        kind of sale are computed in the same query.
 
         Required query parameters:
-        - date_from: start date for the range (YYYY-MM-DD)
-        - date_to: end date for the range (YYYY-MM-DD)
+        - date_from: start date for the range (YYYY-MM-DD, or YYYY-MM-DDTHH:MM:SS for a partial day)
+        - date_to: end date for the range (YYYY-MM-DD included, or YYYY-MM-DDTHH:MM:SS excluded)
 
         Optional query parameters:
         - is_bakery: filter by whether the sale is bakery-related (true/false)
         - payment_method: filter by payment method
+        - group_by: comma separated list of payment_method, is_bakery, customer, day, week or month,
+          returns the amounts of each group in 'groups'
 
         Example: api/v1/sales/totals/?date_from=2024-01-01&date_to=2024-12-31&is_bakery=false&payment_method=efv
+        Example: api/v1/sales/totals/?date_from=2024-01-01&date_to=2024-12-31&group_by=month,payment_method
 
         List of payment methods:
         - efv ('Efectivo' -> Cash in English)
@@ -154,43 +187,13 @@ class SaleViewSet(mixins.CreateModelMixin,
         - crd ('Tarjeta de Crédito/Débito' -> Credit/Debit card in English)
         - qr ('QR')
         """
-        date_from = request.query_params.get('date_from')
-        date_to = request.query_params.get('date_to')
-        payment_method = request.query_params.get('payment_method')
-        is_bakery = request.query_params.get('is_bakery')
+        try:
+            sales_totals, group_by = get_sales_totals(request.query_params)
+        except ValueError as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Verify the existence of parameters.
-        if not date_from or not date_to:
-            return Response({"error": "date_from and date_to parameters are required (is_bakery and payment_method are optional)."}, status=status.HTTP_400_BAD_REQUEST)
+        totals = sales_totals.get()
+        if group_by:
+            totals['groups'] = sales_totals.get_groups(group_by)
 
-        # Convert dates to a valid format.
-        try:
-            start_date = datetime.strptime(date_from, '%Y-%m-%d').date()
-            end_date = datetime.strptime(date_to, '%Y-%m-%d').date() + timedelta(days=1)
-        except ValueError:
-            return Response({"error": "Invalid date format. Use YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
-        
-        queryset = Sale.objects.filter(date__gte=start_date, date__lt=end_date)
-        
-        # Convert 'is_bakery' to boolean.
-        if is_bakery is not None:
-            if isinstance(is_bakery, bool):
-                is_bakery = is_bakery
-            elif is_bakery.lower() in ['true', '1', 'yes']:
-                is_bakery = True
-            elif is_bakery.lower() in ['false', '0', 'no']:
-                is_bakery = False
-            else:
-                return Response({"error": "Invalid value for is_bakery. Use 'true' or 'false'."}, status=status.HTTP_400_BAD_REQUEST)
-            queryset = queryset.filter(is_bakery=is_bakery)
-
-        if payment_method:
-            queryset = queryset.filter(payment_method=payment_method)
-
-        total_sales = queryset.count()
-        sum_total = queryset.aggregate(Sum('total'))['total__sum'] or 0
-
-        return Response({
-            "total_sales": total_sales,
-            "sum_total": sum_total
-        })
\ No newline at end of file
+        return Response(totals)
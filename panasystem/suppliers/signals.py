@@ -0,0 +1,18 @@
+"""Suppliers signals."""
+
+# Django
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+# Models
+from panasystem.suppliers.models import Supplier
+
+# Utilities
+from panasystem.utils.versions import bump_version
+
+
+@receiver(post_save, sender=Supplier)
+@receiver(post_delete, sender=Supplier)
+def bump_suppliers_version(sender, **kwargs):
+    """Invalidate the cached suppliers lists."""
+    bump_version(sender)
@@ -11,8 +11,14 @@ from panasystem.suppliers.serializers import SupplierSerializer
 # Models
 from panasystem.suppliers.models import Supplier
 
+# Utilities
+from panasystem.utils.mixins import CachedListMixin, StreamingListMixin
+from panasystem.utils.pagination import OptionalPagination
 
-class SuppliersViewSet(mixins.CreateModelMixin,
+
+class SuppliersViewSet(CachedListMixin,
+                       StreamingListMixin,
+                       mixins.CreateModelMixin,
                        mixins.UpdateModelMixin,
                        mixins.RetrieveModelMixin,
                        mixins.ListModelMixin,
@@ -24,6 +30,9 @@ class SuppliersViewSet(mixins.CreateModelMixin,
     Provides the following actions:
     - Create a supplier
     - List suppliers with optional search by 'name' and 'celular'
+    - Paginate the list by page ('?pagination=page') or by cursor ('?pagination=cursor'), unpaginated by default
+    - Stream the whole list with '?stream=json' or '?stream=ndjson'
+    - Cache the list until the table changes, a matching 'If-None-Match' or 'If-Modified-Since' gets a 304
     - Retrieve a specific supplier
     - Update a supplier's details
     - Delete a supplier
@@ -37,4 +46,5 @@ class SuppliersViewSet(mixins.CreateModelMixin,
     filter_backends = (SearchFilter,)
     search_fields = ('name', 'celular')
     permission_classes = [IsAuthenticated]
-    pagination_class = None
\ No newline at end of file
+    pagination_class = OptionalPagination
+    cursor_ordering = ('name', 'pk')
\ No newline at end of file
@@ -0,0 +1,2 @@
+from .tokens import BlacklistJWTAuthentication
+from .users import ClaimsUser
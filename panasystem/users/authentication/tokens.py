@@ -0,0 +1,35 @@
+"""Tokens authentication."""
+
+# Django REST Framework
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+# Services
+from panasystem.users.services import is_access_token_blacklisted
+
+# Utilities
+from panasystem.users.authentication.users import ClaimsUser
+
+
+class BlacklistJWTAuthentication(JWTAuthentication):
+    """JWT authentication that rejects blacklisted access tokens.
+
+    The token is decoded once, by the authentication, and its jti is
+    checked against the blacklist cached in memory. The user is a
+    ClaimsUser built from the signed claims, so no query is made unless
+    the view reads something the claims do not carry. Tokens issued before
+    the claims existed load the user row.
+    """
+
+    def get_validated_token(self, raw_token):
+        """Validate the token and check it was not blacklisted."""
+        token = super().get_validated_token(raw_token)
+        if is_access_token_blacklisted(token):
+            raise AuthenticationFailed('Access token has been blacklisted', code='token_blacklisted')
+        return token
+
+    def get_user(self, validated_token):
+        """Return the user of the token, built from its claims when it has them."""
+        if 'username' in validated_token:
+            return ClaimsUser(validated_token)
+        return super().get_user(validated_token)
@@ -0,0 +1,60 @@
+"""Users authentication."""
+
+# Django
+from django.contrib.auth import get_user_model
+
+# Django REST Framework
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+
+class ClaimsUser:
+    """User built from the signed claims of an access token.
+
+    The id, username, staff flag and group names are read from the token.
+    Deleting a user, deactivating it, or changing its staff flag or its
+    groups revokes its tokens.
+    Any other attribute (name, email, permissions, save()...) loads the
+    user row once, the first time it is touched, and is read from it.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+    # The tokens of deactivated users are revoked, see revoke_user_tokens.
+    is_active = True
+
+    def __init__(self, token):
+        self._user = None
+        self.id = self.pk = token[api_settings.USER_ID_CLAIM]
+        self.username = token['username']
+        self.is_staff = token.get('is_staff', False)
+        self.group_names = token.get('groups')
+
+    @property
+    def user(self):
+        """Return the user row, loading it the first time."""
+        if self._user is None:
+            User = get_user_model()
+            try:
+                self._user = User._default_manager.get(**{api_settings.USER_ID_FIELD: self.pk})
+            except User.DoesNotExist:
+                raise AuthenticationFailed('User not found', code='user_not_found') from None
+        return self._user
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self.user, name)
+
+    def __eq__(self, other):
+        return getattr(other, 'pk', None) == self.pk
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def __str__(self):
+        return self.username
+
+    def get_username(self):
+        """Return the username of the claims."""
+        return self.username
@@ -0,0 +1,20 @@
+"""Users password hashers."""
+
+# Django
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2 with a bounded cost per login.
+
+    Django's defaults (100 MiB, 8 lanes) take every core of the server for
+    each login. These parameters (19 MiB, 2 passes, 1 lane, the OWASP
+    minimum) cost a few milliseconds of a single core, so concurrent logins
+    share the CPU instead of stalling it. Hashes made with other parameters
+    are rehashed on the next successful login.
+    """
+
+    time_cost = getattr(settings, 'ARGON2_TIME_COST', 2)
+    memory_cost = getattr(settings, 'ARGON2_MEMORY_COST', 19 * 1024)
+    parallelism = getattr(settings, 'ARGON2_PARALLELISM', 1)
@@ -0,0 +1,91 @@
+"""Benchmark login command."""
+
+# Django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+# Django REST Framework
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+# Views
+from panasystem.users.views import UsersViewSet
+
+# Utilities
+from threading import Lock, Thread
+import math
+import time
+
+User = get_user_model()
+
+
+def percentile(ordered, percent):
+    """Return the nearest-rank percentile of sorted values."""
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+class Command(BaseCommand):
+    """Measure the latency of /users/login/ under concurrent logins.
+
+    Creates temporary users (committed, the logins run on their own
+    threads and connections), logs them in from ``--concurrency`` threads
+    with the configured password hasher, reports the latency percentiles
+    and deletes the users and their tokens.
+    """
+
+    help = 'Measure the login latency (p50, p95, p99) under concurrent logins.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=200, help='Logins to make (200 by default).')
+        parser.add_argument('--concurrency', type=int, default=20, help='Logins at once (20 by default).')
+
+    def handle(self, *args, **options):
+        logins, concurrency = options['logins'], options['concurrency']
+        password = 'benchmark-login-password'
+        prefix = f'benchmark-login-{int(time.time())}-'
+        encoded = make_password(password)
+        User.objects.bulk_create([User(username=f'{prefix}{number}', password=encoded) for number in range(concurrency)])
+
+        view = UsersViewSet.as_view({'post': 'login'})
+        factory = APIRequestFactory()
+        latencies, statuses = [], {}
+        lock = Lock()
+
+        def worker(number):
+            data = {'username': f'{prefix}{number}', 'password': password}
+            try:
+                for _ in range(number, logins, concurrency):
+                    request = factory.post('/api/v1/users/login/', data, format='json')
+                    start = time.perf_counter()
+                    response = view(request)
+                    elapsed = time.perf_counter() - start
+                    with lock:
+                        latencies.append(elapsed)
+                        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            finally:
+                connection.close()
+
+        try:
+            threads = [Thread(target=worker, args=(number,)) for number in range(concurrency)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+        finally:
+            users = User.objects.filter(username__startswith=prefix)
+            OutstandingToken.objects.filter(user__in=users).delete()
+            users.delete()
+
+        if not latencies:
+            self.stdout.write(self.style.WARNING('No logins made.'))
+            return
+        latencies.sort()
+        self.stdout.write(f'{len(latencies)} logins, {concurrency} at once, in {elapsed:.2f}s ({len(latencies) / elapsed:.1f}/s)')
+        self.stdout.write('Responses: ' + ', '.join(f'{code}: {count}' for code, count in sorted(statuses.items())))
+        for percent in (50, 95, 99):
+            self.stdout.write(f'p{percent}: {percentile(latencies, percent) * 1000:.1f} ms')
+        self.stdout.write(f'max: {latencies[-1] * 1000:.1f} ms')
@@ -0,0 +1,38 @@
+"""Purge expired tokens command."""
+
+# Django
+from django.core.management.base import BaseCommand
+
+# Services
+from panasystem.users.services import purge_expired_tokens, token_table_stats
+
+
+class Command(BaseCommand):
+    """Delete the expired blacklisted access tokens and outstanding refresh tokens.
+
+    Meant to be scheduled (cron, once an hour or a day), it replaces
+    simplejwt's flushexpiredtokens, which deletes every row at once.
+    """
+
+    help = 'Delete the expired blacklisted and outstanding tokens in batches, and report the tables size.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows deleted per statement (1000 by default).')
+        parser.add_argument('--stats', action='store_true', help='Only report the tables size, delete nothing.')
+
+    def write_stats(self, title):
+        self.stdout.write(title)
+        for table, stats in token_table_stats().items():
+            size = f", {stats['bytes'] / 1024:.0f} kB" if stats['bytes'] is not None else ''
+            self.stdout.write(f"  {table}: {stats['rows']} rows, {stats['expired']} expired{size}")
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.write_stats('Token tables:')
+            return
+
+        self.write_stats('Before:')
+        deleted = purge_expired_tokens(batch_size=options['batch_size'])
+        for table, count in deleted.items():
+            self.stdout.write(self.style.SUCCESS(f'Deleted {count} expired rows from {table}.'))
+        self.write_stats('After:')
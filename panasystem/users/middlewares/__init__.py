@@ -1 +0,0 @@
-from .tokens import BlacklistAccessTokenMiddleware
\ No newline at end of file
@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+# Utilities
+import jwt
+
+
+def set_jti(apps, schema_editor):
+    """Read the jti of the blacklisted tokens, dropping the unreadable ones."""
+    BlacklistedAccessToken = apps.get_model('users', 'BlacklistedAccessToken')
+    for blacklisted in BlacklistedAccessToken.objects.all():
+        try:
+            blacklisted.jti = jwt.decode(blacklisted.token, options={'verify_signature': False})['jti']
+        except (jwt.InvalidTokenError, KeyError):
+            blacklisted.delete()
+            continue
+        blacklisted.save(update_fields=['jti'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_merge_0002_blacklistedaccesstoken_0003_create_groups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blacklistedaccesstoken',
+            name='jti',
+            field=models.CharField(max_length=255, null=True),
+        ),
+        migrations.RunPython(set_jti, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='blacklistedaccesstoken',
+            name='token',
+        ),
+        migrations.AlterField(
+            model_name='blacklistedaccesstoken',
+            name='jti',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='blacklistedaccesstoken',
+            name='blacklisted_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
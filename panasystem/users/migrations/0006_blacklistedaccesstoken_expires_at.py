@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+# Utilities
+from datetime import timezone as dt_timezone
+
+
+def set_expires_at(apps, schema_editor):
+    """Expire the blacklisted tokens one access token lifetime after they were blacklisted."""
+    BlacklistedAccessToken = apps.get_model('users', 'BlacklistedAccessToken')
+    lifetime = settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME']
+    for blacklisted in BlacklistedAccessToken.objects.all():
+        blacklisted_at = blacklisted.blacklisted_at
+        if timezone.is_naive(blacklisted_at):
+            blacklisted_at = timezone.make_aware(blacklisted_at)
+        blacklisted.expires_at = (blacklisted_at + lifetime).astimezone(dt_timezone.utc).replace(tzinfo=None)
+        blacklisted.save(update_fields=['expires_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_blacklistedaccesstoken_jti'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blacklistedaccesstoken',
+            name='expires_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(set_expires_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='blacklistedaccesstoken',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True, help_text='Date time (UTC) on which the token expires, the row can be deleted after it.'),
+        ),
+        migrations.AlterField(
+            model_name='blacklistedaccesstoken',
+            name='blacklisted_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations, models
+
+
+# The outstanding tokens are purged by expiry. The table belongs to
+# simplejwt, so its index is created here.
+INDEX = models.Index(fields=['expires_at'], name='outstandingtoken_expires_at')
+
+
+def add_index(apps, schema_editor):
+    """Build the index, without locking the table against writes on PostgreSQL."""
+    model = apps.get_model('token_blacklist', 'OutstandingToken')
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.add_index(model, INDEX, concurrently=True)
+    else:
+        schema_editor.add_index(model, INDEX)
+
+
+def remove_index(apps, schema_editor):
+    """Drop the index."""
+    model = apps.get_model('token_blacklist', 'OutstandingToken')
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.remove_index(model, INDEX, concurrently=True)
+    else:
+        schema_editor.remove_index(model, INDEX)
+
+
+class Migration(migrations.Migration):
+
+    # Build the index without locking the table against writes.
+    atomic = False
+
+    dependencies = [
+        ('users', '0006_blacklistedaccesstoken_expires_at'),
+        ('token_blacklist', '0012_alter_outstandingtoken_user'),
+    ]
+
+    # Only the database is changed: the index is not part of the state of
+    # the simplejwt model, which must keep matching its Meta or
+    # makemigrations would write a migration into simplejwt.
+    operations = [
+        migrations.RunPython(add_index, remove_index),
+    ]
@@ -4,10 +4,14 @@
 from django.db import models
 
 class BlacklistedAccessToken(models.Model):
-    """Black list access token."""
+    """Black list access token, by its 'jti' claim, until it expires."""
     
-    token = models.CharField(max_length=255, unique=True)
+    jti = models.CharField(max_length=255, unique=True)
     blacklisted_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(
+        db_index=True,
+        help_text='Date time (UTC) on which the token expires, the row can be deleted after it.'
+    )
 
     def __str__(self):
-        return self.token
\ No newline at end of file
+        return self.jti
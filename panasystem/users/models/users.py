@@ -2,10 +2,38 @@
 
 # Django
 from django.contrib.auth.models import AbstractUser, Group
+from django.core.cache import cache
+from django.db import transaction
 from django.db.models import CharField
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
+DEFAULT_GROUP = "Empleado"
+DEFAULT_GROUP_KEY = "users:default_group"
+
+
+def get_default_group_id():
+    """Get the id of the default group, kept in the shared cache.
+
+    The id is cached when the transaction that read it commits, so the id
+    of a group created by a transaction rolled back is never kept.
+    """
+    group_id = cache.get(DEFAULT_GROUP_KEY)
+    if group_id is None:
+        group_id = Group.objects.values_list("pk", flat=True).get(name=DEFAULT_GROUP)
+        transaction.on_commit(lambda: cache.set(DEFAULT_GROUP_KEY, group_id, None))
+    return group_id
+
+
+def clear_default_group_id():
+    """Forget the cached id of the default group, e.g. after a group changed.
+
+    It is forgotten right away and again when the transaction commits, so
+    the old id read in between is not kept.
+    """
+    cache.delete(DEFAULT_GROUP_KEY)
+    transaction.on_commit(lambda: cache.delete(DEFAULT_GROUP_KEY))
+
 
 class User(AbstractUser):
     """
@@ -28,9 +56,25 @@ class User(AbstractUser):
         """
         return reverse("users:detail", kwargs={"username": self.username})
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Load the user, remembering the flags its tokens depend on."""
+        user = super().from_db(db, field_names, values)
+        user._loaded_access = user._access()
+        return user
+
+    def _access(self):
+        return self.__dict__.get("is_active"), self.__dict__.get("is_staff")
+
+    @property
+    def access_changed(self):
+        """Return whether is_active or is_staff changed since the user was loaded or saved."""
+        loaded = getattr(self, "_loaded_access", None)
+        return loaded is not None and loaded != self._access()
+
     def save(self, *args, **kwargs):
+        created = self._state.adding
         super().save(*args, **kwargs)
-        # Add user to a default group if not already assigned
-        if not self.groups.exists():
-            default_group = Group.objects.get(name="Empleado")
-            self.groups.add(default_group)
+        # Add new users to the default group, later saves do not touch the groups
+        if created:
+            self.groups.add(get_default_group_id())
@@ -1 +1 @@
-from .users import UserLoginSerializer, UserModelSerializer, UserCreateSerializer
\ No newline at end of file
+from .users import UserLoginSerializer, UserModelSerializer, UserCreateSerializer, UserBulkCreateSerializer
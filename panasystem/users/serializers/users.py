@@ -1,15 +1,20 @@
 """Users serializers."""
 
 # Django
-from django.contrib.auth import authenticate
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.contrib.auth.validators import UnicodeUsernameValidator
 
 # Django REST Framework
 from rest_framework import serializers
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.exceptions import Throttled
 
 # Models
 from panasystem.users.models import User
 
+# Services
+from panasystem.users.services import PasswordCheckBusy, authenticate_user, create_users
+
 
 class UserModelSerializer(serializers.ModelSerializer):
     """User model serializer."""
@@ -28,7 +33,13 @@ class UserModelSerializer(serializers.ModelSerializer):
         )
 
     def get_groups(self, obj):
-        """Get the names of the groups the user belongs to."""
+        """Get the names of the groups the user belongs to.
+
+        Taken from the token claims (or the login) when they were loaded.
+        """
+        group_names = getattr(obj, "group_names", None)
+        if group_names is not None:
+            return group_names
         return [group.name for group in obj.groups.all()]
 
 
@@ -43,20 +54,15 @@ class UserLoginSerializer(serializers.Serializer):
 
     def validate(self, data):
         """Check credentials."""
-        user = authenticate(username=data["username"], password=data["password"])
+        try:
+            user = authenticate_user(self.context.get("request"), data["username"], data["password"])
+        except PasswordCheckBusy:
+            raise Throttled(wait=getattr(settings, "LOGIN_HASH_WAIT", 5), detail="Too many logins at once, try again.") from None
         if not user:
             raise serializers.ValidationError("Invalid credentials")
         self.context["user"] = user
         return data
 
-    def create(self, validated_data):
-        """Generate JWT token."""
-        user = self.context["user"]
-        refresh = RefreshToken.for_user(user)
-        access_token = str(refresh.access_token)
-        refresh_token = str(refresh)
-        return user, access_token, refresh_token
-
 
 class UserCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating a new user."""
@@ -76,3 +82,57 @@ class UserCreateSerializer(serializers.ModelSerializer):
             email=validated_data.get("email", ""),
         )
         return user
+
+
+class UserBulkCreateListSerializer(serializers.ListSerializer):
+    """Create many users with a fixed number of queries.
+
+    Usernames are checked and groups resolved by name with one query each,
+    and the users and their group memberships are inserted in batches.
+    Nothing is created if any row has errors, which are reported per row.
+    """
+
+    def create(self, validated_data):
+        """Create the users in bulk."""
+        usernames = [data["username"] for data in validated_data]
+        taken = set(User.objects.filter(username__in=usernames).values_list("username", flat=True))
+        names = {name for data in validated_data for name in data.get("groups", [])}
+        groups = dict(Group.objects.filter(name__in=names).values_list("name", "pk"))
+        seen = set()
+
+        errors = [{} for _ in validated_data]
+        users, group_ids = [], []
+        for index, data in enumerate(validated_data):
+            username = data["username"]
+            if username in taken or username in seen:
+                errors[index]["username"] = [f"A user with username {username} already exists."]
+            seen.add(username)
+            missing = [name for name in data.get("groups", []) if name not in groups]
+            if missing:
+                errors[index]["groups"] = [f'Group "{name}" does not exist.' for name in missing]
+            users.append(User(
+                username=username,
+                password=data["password"],
+                name=data.get("name", ""),
+                email=data.get("email", ""),
+            ))
+            group_ids.append([groups[name] for name in data.get("groups", []) if name in groups])
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return create_users(users, group_ids)
+
+
+class UserBulkCreateSerializer(serializers.Serializer):
+    """Serializer for a user of a bulk creation, groups are given by name."""
+
+    username = serializers.CharField(max_length=150, validators=[UnicodeUsernameValidator()])
+    password = serializers.CharField(min_length=8, max_length=64, write_only=True)
+    name = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    email = serializers.EmailField(required=False, allow_blank=True)
+    groups = serializers.ListField(child=serializers.CharField(max_length=150), required=False)
+
+    class Meta:
+        """Meta options."""
+
+        list_serializer_class = UserBulkCreateListSerializer
@@ -0,0 +1,11 @@
+from .passwords import PasswordCheckBusy, authenticate_user, hash_passwords
+from .tokens import (
+    blacklist_access_token,
+    clear_access_blacklist,
+    is_access_token_blacklisted,
+    purge_expired_tokens,
+    revoke_user_tokens,
+    token_table_stats,
+    tokens_for_user
+)
+from .users import create_users
@@ -0,0 +1,44 @@
+"""Passwords services."""
+
+# Django
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
+
+# Utilities
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore
+import os
+
+_workers = getattr(settings, 'LOGIN_HASH_WORKERS', None) or os.cpu_count() or 1
+_pool = ThreadPoolExecutor(max_workers=_workers, thread_name_prefix='password-hash')
+# Hashing slots of the logins, one per worker.
+_slots = BoundedSemaphore(_workers)
+
+
+class PasswordCheckBusy(Exception):
+    """Every hashing slot was taken for longer than the wait allowed."""
+
+
+def authenticate_user(request, username, password):
+    """Return the active user with these credentials, or None.
+
+    The credentials are checked by ``authenticate()``, so the configured
+    backends decide, inactive users are rejected and ``user_login_failed``
+    is sent. The check runs in a hashing slot: Argon2 releases the GIL, so
+    up to ``LOGIN_HASH_WORKERS`` logins (the CPU count by default) hash in
+    parallel whatever the number of requests. Logins beyond that wait
+    ``LOGIN_HASH_WAIT`` seconds for a slot and then give up with
+    PasswordCheckBusy, instead of piling up on the CPU.
+    """
+    if not _slots.acquire(timeout=getattr(settings, 'LOGIN_HASH_WAIT', 5)):
+        raise PasswordCheckBusy()
+    try:
+        return authenticate(request, username=username, password=password)
+    finally:
+        _slots.release()
+
+
+def hash_passwords(passwords):
+    """Hash many passwords, in parallel on the pool."""
+    return list(_pool.map(make_password, passwords))
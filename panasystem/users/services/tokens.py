@@ -0,0 +1,207 @@
+"""Tokens services."""
+
+# Django
+from django.conf import settings
+from django.db import connection
+
+# Django REST Framework
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import aware_utcnow, datetime_from_epoch, datetime_to_epoch
+
+# Models
+from panasystem.users.models import BlacklistedAccessToken
+
+# Utilities
+from panasystem.utils.versions import bump_version, get_version
+from threading import Lock
+import time
+
+# Prefix of the jti of the blacklist rows that revoke the tokens of a user.
+USER_PREFIX = 'user:'
+
+
+class _Blacklist:
+    """Blacklisted access tokens of this process, by jti.
+
+    A token is checked against this set, without a query. The set is
+    reloaded from the database only when the version of the blacklist in
+    the shared cache changed, and the version is looked up at most every
+    ``refresh`` seconds, which bounds how long a token blacklisted by
+    another process keeps working here. Only tokens that did not expire
+    yet are kept.
+
+    The users whose tokens were revoked are kept apart, with the expiry of
+    the last access token issued to them before the revocation.
+    """
+
+    def __init__(self, refresh):
+        self.refresh = refresh
+        self.version = None
+        self.checked = None
+        self.expires = {}
+        self.users = {}
+        self.lock = Lock()
+
+    def load(self):
+        """Reload the set if the blacklist changed."""
+        version, _ = get_version(BlacklistedAccessToken)
+        if version == self.version:
+            return
+        rows = BlacklistedAccessToken.objects.filter(expires_at__gt=aware_utcnow()).values_list('jti', 'expires_at')
+        self.expires, self.users = {}, {}
+        for jti, expires_at in rows:
+            if jti.startswith(USER_PREFIX):
+                self.users[jti[len(USER_PREFIX):]] = datetime_to_epoch(expires_at)
+            else:
+                self.expires[jti] = datetime_to_epoch(expires_at)
+        self.version = version
+
+    def check(self):
+        """Reload the set if it was not checked for ``refresh`` seconds."""
+        now = time.monotonic()
+        if self.checked is None or now - self.checked >= self.refresh:
+            self.load()
+            self.checked = now
+
+    def __contains__(self, jti):
+        with self.lock:
+            self.check()
+            expires = self.expires.get(jti)
+        return expires is not None and expires > time.time()
+
+    def revokes(self, user_id, expires):
+        """Return whether an access token of the user, expiring at ``expires``, was revoked."""
+        with self.lock:
+            self.check()
+            cutoff = self.users.get(str(user_id))
+        return cutoff is not None and expires <= cutoff
+
+    def add(self, jti, expires):
+        """Add a token blacklisted by this process."""
+        with self.lock:
+            self.expires[jti] = expires
+
+    def add_user(self, user_id, cutoff):
+        """Add a user whose tokens were revoked by this process."""
+        with self.lock:
+            self.users[str(user_id)] = cutoff
+
+    def clear(self):
+        """Forget the set, it is reloaded on the next check."""
+        with self.lock:
+            self.version = None
+            self.checked = None
+            self.expires = {}
+            self.users = {}
+
+_blacklist = _Blacklist(refresh=getattr(settings, 'ACCESS_BLACKLIST_REFRESH', 1))
+
+
+def tokens_for_user(user):
+    """Return a refresh token for the user, with its profile as claims.
+
+    The username, staff flag and group names are signed into the token,
+    and copied into the access tokens made from it, so authenticated
+    requests read them without querying the groups. They are refreshed on
+    the next login.
+    """
+    group_names = getattr(user, 'group_names', None)
+    if group_names is None:
+        group_names = user.group_names = list(user.groups.values_list('name', flat=True))
+    refresh = RefreshToken.for_user(user)
+    refresh['username'] = user.get_username()
+    refresh['is_staff'] = user.is_staff
+    refresh['groups'] = group_names
+    return refresh
+
+
+def is_access_token_blacklisted(token):
+    """Return whether a validated access token was blacklisted, or the tokens of its user revoked."""
+    return (
+        token[api_settings.JTI_CLAIM] in _blacklist
+        or _blacklist.revokes(token[api_settings.USER_ID_CLAIM], token['exp'])
+    )
+
+
+def blacklist_access_token(token):
+    """Blacklist a validated access token until it expires."""
+    jti = token[api_settings.JTI_CLAIM]
+    BlacklistedAccessToken.objects.get_or_create(jti=jti, defaults={'expires_at': datetime_from_epoch(token['exp'])})
+    bump_version(BlacklistedAccessToken)
+    _blacklist.add(jti, token['exp'])
+
+
+def revoke_user_tokens(user):
+    """Revoke every token issued to the user until now.
+
+    Used when the user is deactivated or its staff flag changes, which the
+    access tokens carry in their claims. The access tokens are not
+    recorded when issued, so the user is blacklisted by expiry: its access
+    tokens expiring before the lifetime of a token issued now are rejected.
+    The row expires with the last of them. Its refresh tokens are
+    blacklisted, so the user has to log in again.
+    """
+    now = aware_utcnow()
+    expires_at = now + api_settings.ACCESS_TOKEN_LIFETIME
+    BlacklistedAccessToken.objects.update_or_create(jti=f'{USER_PREFIX}{user.pk}', defaults={'expires_at': expires_at})
+    BlacklistedToken.objects.bulk_create(
+        [BlacklistedToken(token=token) for token in OutstandingToken.objects.filter(user=user, expires_at__gt=now)],
+        ignore_conflicts=True
+    )
+    bump_version(BlacklistedAccessToken)
+    _blacklist.add_user(user.pk, datetime_to_epoch(expires_at))
+
+
+def clear_access_blacklist():
+    """Drop the blacklist cached by this process."""
+    _blacklist.clear()
+
+
+def _purge(queryset, batch_size):
+    """Delete the rows of a queryset in batches, return how many."""
+    deleted = 0
+    while True:
+        pks = list(queryset.order_by().values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return deleted
+        queryset.model.objects.filter(pk__in=pks).delete()
+        deleted += len(pks)
+
+
+def purge_expired_tokens(batch_size=1000):
+    """Delete the blacklisted and outstanding tokens that expired.
+
+    Expired tokens are rejected anyway, their rows only slow the lookups.
+    The rows are deleted by ranges of the expiry index, at most
+    ``batch_size`` rows per statement so the locks stay short. Deleting
+    an outstanding refresh token deletes its blacklist entry.
+
+    Returns the deleted rows per table.
+    """
+    now = aware_utcnow()
+    return {
+        BlacklistedAccessToken._meta.db_table: _purge(
+            BlacklistedAccessToken.objects.filter(expires_at__lte=now), batch_size
+        ),
+        OutstandingToken._meta.db_table: _purge(OutstandingToken.objects.filter(expires_at__lte=now), batch_size)
+    }
+
+
+def token_table_stats():
+    """Return the rows, expired rows and size on disk of the token tables."""
+    now = aware_utcnow()
+    stats = {}
+    for model, expired in (
+        (BlacklistedAccessToken, BlacklistedAccessToken.objects.filter(expires_at__lte=now)),
+        (OutstandingToken, OutstandingToken.objects.filter(expires_at__lte=now)),
+        (BlacklistedToken, BlacklistedToken.objects.filter(token__expires_at__lte=now))
+    ):
+        table = model._meta.db_table
+        stats[table] = {'rows': model.objects.count(), 'expired': expired.count(), 'bytes': None}
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_total_relation_size(%s)', [table])
+                stats[table]['bytes'] = cursor.fetchone()[0]
+    return stats
@@ -0,0 +1,35 @@
+"""Users services."""
+
+# Django
+from django.contrib.auth import get_user_model
+
+# Models
+from panasystem.users.models.users import get_default_group_id
+
+# Services
+from panasystem.users.services.passwords import hash_passwords
+
+
+def create_users(users, group_ids=None, batch_size=500):
+    """Create users and their group memberships in batched inserts.
+
+    ``users`` are unsaved users with their raw password as ``password``,
+    hashed here in parallel. ``group_ids`` has the group ids of each user,
+    users without any join the default group, as User.save does.
+
+    Returns the created users.
+    """
+    User = get_user_model()
+    for user, password in zip(users, hash_passwords([user.password for user in users])):
+        user.password = password
+    users = User.objects.bulk_create(users, batch_size=batch_size)
+
+    group_ids = group_ids or [()] * len(users)
+    default_ids = [] if all(group_ids) else [get_default_group_id()]
+    Membership = User.groups.through
+    Membership.objects.bulk_create([
+        Membership(user_id=user.pk, group_id=group_id)
+        for user, ids in zip(users, group_ids)
+        for group_id in (ids or default_ids)
+    ], batch_size=batch_size)
+    return users
@@ -0,0 +1,71 @@
+"""Users signals."""
+
+# Django
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+# Django REST Framework
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+# Models
+from panasystem.users.models import User
+from panasystem.users.models.users import clear_default_group_id
+
+# Services
+from panasystem.users.services import revoke_user_tokens
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def forget_default_group(sender, **kwargs):
+    """Forget the cached default group id when a group changes."""
+    clear_default_group_id()
+
+
+@receiver(post_save, sender=User)
+def revoke_tokens_on_access_change(sender, instance, created, raw=False, **kwargs):
+    """Revoke the tokens of a user deactivated or whose staff flag changed.
+
+    The access tokens carry the flags in their claims, they would keep
+    granting the old access until they expire.
+    """
+    if raw:
+        return
+    if not created and instance.access_changed:
+        revoke_user_tokens(instance)
+    instance._loaded_access = instance._access()
+
+
+@receiver(pre_delete, sender=User)
+def revoke_tokens_on_delete(sender, instance, **kwargs):
+    """Revoke the tokens of a user about to be deleted.
+
+    Before the delete, while its refresh tokens still point to it.
+    """
+    revoke_user_tokens(instance)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def revoke_tokens_on_groups_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Revoke the tokens of the users whose groups changed.
+
+    The access tokens carry the group names in their claims. Only users
+    with tokens are revoked, so new users joining the default group are not.
+    """
+    if reverse and action == 'pre_clear':
+        instance._cleared_user_pks = list(instance.user_set.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        user_pks = [instance.pk] if pk_set or action == 'post_clear' else []
+    elif action == 'post_clear':
+        user_pks = getattr(instance, '_cleared_user_pks', [])
+    else:
+        user_pks = pk_set
+    if not user_pks:
+        return
+    with_tokens = OutstandingToken.objects.filter(user__in=user_pks).values('user')
+    for user in User.objects.filter(pk__in=with_tokens):
+        revoke_user_tokens(user)
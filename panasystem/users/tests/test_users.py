@@ -5,13 +5,33 @@ import pytest
 
 # Django
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.contrib.auth.signals import user_login_failed
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 # Django REST Framework
 from rest_framework import status
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+# Models
+from panasystem.users.models import BlacklistedAccessToken
 
 # Serializers
 from panasystem.users.serializers import UserModelSerializer
 
+# Services
+from panasystem.users.services import clear_access_blacklist
+from panasystem.users.services import passwords
+
+# Utilities
+from datetime import timedelta
+from io import StringIO
+from threading import BoundedSemaphore
+
 # Utils
 from panasystem.utils.connect_api_tests import api_client
 
@@ -358,3 +378,289 @@ def test_admin_can_list_users(api_client):
     assert response.status_code == status.HTTP_200_OK
     assert isinstance(response.data, list)
     assert len(response.data) > 0  # Assuming there are users in the database
+
+
+@pytest.mark.django_db
+def test_logout_blacklists_access_token(api_client):
+    """
+    Test that the access token stops working after logout.
+
+    Ensures that the blacklist is checked without a query per request and
+    that the access token is rejected after logout, also by a process that
+    reloads the blacklist.
+    """
+    clear_access_blacklist()
+    url = "/api/v1/users/me/"
+    assert api_client[0].get(url).status_code == status.HTTP_200_OK
+    with CaptureQueriesContext(connection) as queries:
+        assert api_client[0].get(url).status_code == status.HTTP_200_OK
+    assert not any("users_blacklistedaccesstoken" in query["sql"] for query in queries)
+
+    response = api_client[0].post("/api/v1/users/logout/", {"refresh": api_client[1]}, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    response = api_client[0].get(url)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.data["detail"] == "Access token has been blacklisted"
+
+    clear_access_blacklist()
+    assert api_client[0].get(url).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_purge_expired_tokens():
+    """
+    Test the purge_expired_tokens command.
+
+    Ensures that only the expired blacklisted and outstanding tokens are
+    deleted, in batches, and that the tables are reported.
+    """
+    now = aware_utcnow()
+    for number in range(3):
+        BlacklistedAccessToken.objects.create(jti=f"expired{number}", expires_at=now - timedelta(hours=1))
+        expired = OutstandingToken.objects.create(jti=f"expired{number}", token="token", expires_at=now - timedelta(hours=1))
+        BlacklistedToken.objects.create(token=expired)
+    BlacklistedAccessToken.objects.create(jti="live", expires_at=now + timedelta(hours=1))
+    OutstandingToken.objects.create(jti="live", token="token", expires_at=now + timedelta(days=1))
+
+    out = StringIO()
+    call_command("purge_expired_tokens", batch_size=2, stdout=out)
+    assert list(BlacklistedAccessToken.objects.values_list("jti", flat=True)) == ["live"]
+    assert list(OutstandingToken.objects.values_list("jti", flat=True)) == ["live"]
+    assert not BlacklistedToken.objects.exists()
+    assert "Deleted 3 expired rows from users_blacklistedaccesstoken." in out.getvalue()
+    assert "users_blacklistedaccesstoken: 1 rows, 0 expired" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_login_group_claims(api_client):
+    """
+    Test the group names signed in the tokens.
+
+    Ensures that the login returns the groups in the profile and in the
+    access token, and that /users/me/ reads them without querying the groups.
+    """
+    User.objects.create_user(username="cashier", password="testpassword")
+    response = api_client[0].post("/api/v1/users/login/", {"username": "cashier", "password": "testpassword"}, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data["user"]["groups"] == ["Empleado"]
+    access = AccessToken(response.data["access"])
+    assert access["groups"] == ["Empleado"]
+    assert access["username"] == "cashier"
+
+    api_client[0].credentials(HTTP_AUTHORIZATION="Bearer " + response.data["access"])
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client[0].get("/api/v1/users/me/")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["groups"] == ["Empleado"]
+    assert not any("auth_group" in query["sql"] for query in queries)
+
+
+@pytest.mark.django_db
+def test_login_busy(api_client, monkeypatch, settings):
+    """
+    Test logins when every hashing slot is taken.
+
+    Ensures that the login gives up with a 429 instead of waiting for the CPU.
+    """
+    User.objects.create_user(username="cashier", password="testpassword")
+    settings.LOGIN_HASH_WAIT = 0
+    monkeypatch.setattr(passwords, "_slots", BoundedSemaphore(1))
+    passwords._slots.acquire()
+    response = api_client[0].post("/api/v1/users/login/", {"username": "cashier", "password": "testpassword"}, format="json")
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+@pytest.mark.django_db
+def test_login_through_backends(api_client):
+    """
+    Test that logins are checked by the authentication backends.
+
+    Ensures that failed logins send user_login_failed and that inactive
+    users cannot log in.
+    """
+    failures = []
+
+    def receiver(sender, credentials, **kwargs):
+        failures.append(credentials["username"])
+
+    user_login_failed.connect(receiver)
+    try:
+        User.objects.create_user(username="cashier", password="testpassword", is_active=False)
+        response = api_client[0].post("/api/v1/users/login/", {"username": "cashier", "password": "testpassword"}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        response = api_client[0].post("/api/v1/users/login/", {"username": "testuser", "password": "wrongpassword"}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    finally:
+        user_login_failed.disconnect(receiver)
+    assert failures == ["cashier", "testuser"]
+
+
+@pytest.mark.django_db
+def test_authentication_from_claims(api_client):
+    """
+    Test the user built from the token claims.
+
+    Ensures that authenticated requests do not load the user unless the
+    view reads a field the claims do not carry, and that staff checks
+    are made from the claims.
+    """
+    User.objects.create_user(username="cashier", password="testpassword", name="Cashier")
+    response = api_client[0].post("/api/v1/users/login/", {"username": "cashier", "password": "testpassword"}, format="json")
+    api_client[0].credentials(HTTP_AUTHORIZATION="Bearer " + response.data["access"])
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client[0].get("/api/v1/product-categories/")
+    assert response.status_code == status.HTTP_200_OK
+    assert not any("users_user" in query["sql"] for query in queries)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client[0].get("/api/v1/users/list/")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert not any("users_user" in query["sql"] for query in queries)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client[0].get("/api/v1/users/me/")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["name"] == "Cashier"
+    assert response.data["groups"] == ["Empleado"]
+    assert len([query for query in queries if "users_user" in query["sql"]]) == 1
+
+
+@pytest.mark.django_db
+def test_user_save_keeps_groups():
+    """
+    Test that only new users join the default group.
+
+    Ensures that saving an existing user does not query or change its groups.
+    """
+    user = User.objects.create_user(username="cashier", password="testpassword")
+    assert list(user.groups.values_list("name", flat=True)) == ["Empleado"]
+    user.groups.clear()
+    with CaptureQueriesContext(connection) as queries:
+        user.save()
+    assert len(queries) == 1
+    assert not user.groups.exists()
+
+
+@pytest.mark.django_db
+def test_default_group_recreated():
+    """
+    Test creating users after the default group was recreated.
+
+    Ensures that the cached id of the old group is not used.
+    """
+    User.objects.create_user(username="cashier", password="testpassword")
+    Group.objects.get(name="Empleado").delete()
+    group = Group.objects.create(name="Empleado")
+    user = User.objects.create_user(username="baker", password="testpassword")
+    assert list(user.groups.all()) == [group]
+
+
+@pytest.mark.django_db
+def test_bulk_create_users(api_client):
+    """
+    Test creating many users at once via the API.
+
+    Ensures that the users are created with their groups in a fixed number
+    of queries, and that nothing is created when a row has errors.
+    """
+    User.objects.create_superuser(username="adminuser", password="testpassword")
+    response = api_client[0].post("/api/v1/users/login/", {"username": "adminuser", "password": "testpassword"}, format="json")
+    api_client[0].credentials(HTTP_AUTHORIZATION="Bearer " + response.data["access"])
+    url = "/api/v1/users/bulk-create/"
+
+    response = api_client[0].post(url, [
+        {"username": "cashier1", "password": "testpassword"},
+        {"username": "cashier1", "password": "testpassword", "groups": ["Nobody"]},
+    ], format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "username" in response.data[1] and "groups" in response.data[1]
+    assert not User.objects.filter(username="cashier1").exists()
+
+    data = [{"username": f"cashier{number}", "password": "testpassword", "name": f"Cashier {number}"} for number in range(20)]
+    data[0]["groups"] = ["Administrador"]
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client[0].post(url, data, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data["count"] == 20
+    assert len(queries) < 12
+    assert list(User.objects.get(username="cashier0").groups.values_list("name", flat=True)) == ["Administrador"]
+    assert list(User.objects.get(username="cashier19").groups.values_list("name", flat=True)) == ["Empleado"]
+    response = api_client[0].post("/api/v1/users/login/", {"username": "cashier19", "password": "testpassword"}, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+
+
+@pytest.mark.django_db
+def test_deactivated_user_tokens_revoked(api_client):
+    """
+    Test the tokens of a deactivated or demoted user.
+
+    Ensures that deactivating a logged in user rejects its access and
+    refresh tokens, also in a process that reloads the blacklist, and
+    that a staff user who loses the flag has to log in again.
+    """
+    clear_access_blacklist()
+    url = "/api/v1/users/me/"
+    assert api_client[0].get(url).status_code == status.HTTP_200_OK
+    user = User.objects.get(username="testuser")
+    user.name = "Test"
+    user.save()
+    assert api_client[0].get(url).status_code == status.HTTP_200_OK
+
+    user.is_active = False
+    user.save()
+    assert api_client[0].get(url).status_code == status.HTTP_401_UNAUTHORIZED
+    clear_access_blacklist()
+    assert api_client[0].get(url).status_code == status.HTTP_401_UNAUTHORIZED
+    response = api_client[0].post("/api/v1/token/refresh/", {"refresh": api_client[1]}, format="json")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    User.objects.create_user(username="manager", password="testpassword", is_staff=True)
+    api_client[0].credentials()
+    response = api_client[0].post("/api/v1/users/login/", {"username": "manager", "password": "testpassword"}, format="json")
+    api_client[0].credentials(HTTP_AUTHORIZATION="Bearer " + response.data["access"])
+    assert api_client[0].get("/api/v1/users/list/").status_code == status.HTTP_200_OK
+    manager = User.objects.get(username="manager")
+    manager.is_staff = False
+    manager.save()
+    assert api_client[0].get("/api/v1/users/list/").status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_deleted_user_tokens_revoked(api_client):
+    """
+    Test the tokens of a deleted user.
+
+    Ensures that its access and refresh tokens stop working.
+    """
+    clear_access_blacklist()
+    assert api_client[0].get("/api/v1/users/me/").status_code == status.HTTP_200_OK
+    User.objects.get(username="testuser").delete()
+    assert api_client[0].get("/api/v1/product-categories/").status_code == status.HTTP_401_UNAUTHORIZED
+    response = api_client[0].post("/api/v1/token/refresh/", {"refresh": api_client[1]}, format="json")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_user_groups_change_revokes_tokens(api_client):
+    """
+    Test the tokens of a user whose groups changed.
+
+    Ensures that the access token, which carries the old group names, is
+    rejected when a group is added or removed from either side, and that
+    creating a user does not revoke anything.
+    """
+    clear_access_blacklist()
+    url = "/api/v1/product-categories/"
+    User.objects.create_user(username="cashier", password="testpassword")
+    assert not BlacklistedAccessToken.objects.exists()
+
+    User.objects.get(username="testuser").groups.add(Group.objects.get(name="Administrador"))
+    assert api_client[0].get(url).status_code == status.HTTP_401_UNAUTHORIZED
+
+    api_client[0].credentials()
+    response = api_client[0].post("/api/v1/users/login/", {"username": "cashier", "password": "testpassword"}, format="json")
+    api_client[0].credentials(HTTP_AUTHORIZATION="Bearer " + response.data["access"])
+    assert api_client[0].get(url).status_code == status.HTTP_200_OK
+    Group.objects.get(name="Empleado").user_set.remove(User.objects.get(username="cashier"))
+    assert api_client[0].get(url).status_code == status.HTTP_401_UNAUTHORIZED
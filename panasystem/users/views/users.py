@@ -16,8 +16,11 @@ from panasystem.users.serializers import (
     UserLoginSerializer,
     UserModelSerializer,
     UserCreateSerializer,
+    UserBulkCreateSerializer,
 )
-from panasystem.users.models import BlacklistedAccessToken
+
+# Services
+from panasystem.users.services import blacklist_access_token, tokens_for_user
 
 
 User = get_user_model()
@@ -31,6 +34,7 @@ class UsersViewSet(viewsets.GenericViewSet):
     - User login.
     - User logout (authenticated only).
     - Create a new user (admin only).
+    - Create many users at once (admin only).
     - List all users (admin only).
     """
 
@@ -45,11 +49,11 @@ class UsersViewSet(viewsets.GenericViewSet):
         Expects 'username' and 'password' in the request data.
         Returns the user's data along with an access and refresh token upon successful login.
         """
-        serializer = UserLoginSerializer(data=request.data)
+        serializer = UserLoginSerializer(data=request.data, context={"request": request})
         serializer.is_valid(raise_exception=True)
         user = serializer.context["user"]
 
-        refresh = RefreshToken.for_user(user)
+        refresh = tokens_for_user(user)
         data = {
             "user": UserModelSerializer(user).data,
             "access": str(refresh.access_token),
@@ -67,7 +71,7 @@ class UsersViewSet(viewsets.GenericViewSet):
         """
         User log out.
 
-        Invalidates the refresh token to log out the user.
+        Invalidates the refresh token and the access token to log out the user.
         Returns a success message upon successful logout.
         """
         refresh_token = request.data.get("refresh")
@@ -81,10 +85,9 @@ class UsersViewSet(viewsets.GenericViewSet):
             token = RefreshToken(refresh_token)
             token.blacklist()
 
-            # # Add access token to the blacklist
-            # access_token = request.auth
-            # if access_token:
-            #     BlacklistedAccessToken.objects.create(token=str(access_token))
+            # Add access token to the blacklist
+            if request.auth:
+                blacklist_access_token(request.auth)
 
             return Response(
                 {"success": True, "detail": "Logged out!"}, status=status.HTTP_200_OK
@@ -112,6 +115,32 @@ class UsersViewSet(viewsets.GenericViewSet):
         user = serializer.save()
         return Response(UserModelSerializer(user).data, status=status.HTTP_201_CREATED)
 
+    @action(
+        detail=False,
+        methods=["post"],
+        permission_classes=[IsAuthenticated, IsAdminUser],
+        url_path="bulk-create",
+    )
+    def bulk_create_users(self, request):
+        """
+        Create many users at once (Admin only).
+
+        Expects a list of users with 'username', 'password' and optionally 'name',
+        'email' and 'groups' (group names, the default group when not given).
+        The users and their groups are inserted in batches.
+
+        Nothing is created if any user has errors, which are returned per user.
+        """
+        if not isinstance(request.data, list):
+            return Response({"detail": "Expected a list of users."}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = UserBulkCreateSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        users = serializer.save()
+        return Response(
+            {"count": len(users), "users": [user.username for user in users]},
+            status=status.HTTP_201_CREATED,
+        )
+
     @action(
         detail=False,
         methods=["get"],
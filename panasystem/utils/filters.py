@@ -0,0 +1,54 @@
+"""Filter backends."""
+
+# Django
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F
+
+# Django REST Framework
+from rest_framework.filters import SearchFilter
+
+# Utilities
+import re
+
+
+class RankedSearchFilter(SearchFilter):
+    """Search over the ``search_vector`` full-text index, best matches first.
+
+    Every word of the search must start a word of the indexed columns, so
+    the autocomplete matches while typing ('pan' finds 'Pan casero'). The
+    results are capped to the view ``search_limit``. Without PostgreSQL the
+    search falls back to the icontains lookups over ``search_fields``.
+    """
+
+    search_limit = 50
+
+    def get_search_query(self, terms):
+        """Return a prefix tsquery matching every word of the terms."""
+        words = [word for term in terms for word in re.findall(r'\w+', term)]
+        if not words:
+            return None
+        return SearchQuery(' & '.join(f'{word}:*' for word in words), search_type='raw', config='simple')
+
+    def filter_queryset(self, request, queryset, view):
+        """Return the best matches of the search, at most ``search_limit``."""
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        limit = getattr(view, 'search_limit', self.search_limit)
+
+        if connection.vendor != 'postgresql':
+            matches = super().filter_queryset(request, queryset, view)
+            return queryset.filter(pk__in=matches.order_by('pk').values('pk')[:limit])
+
+        query = self.get_search_query(terms)
+        if query is None:
+            return queryset.none()
+        rank = SearchRank(F('search_vector'), query)
+        best = queryset.filter(search_vector=query).annotate(search_rank=rank).order_by('-search_rank', 'pk')
+        return (
+            queryset
+            .filter(pk__in=best.values('pk')[:limit])
+            .annotate(search_rank=rank)
+            .order_by('-search_rank', 'pk')
+        )
@@ -0,0 +1,122 @@
+"""Views mixins."""
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+
+# Django REST Framework
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+# Utilities
+from panasystem.utils.versions import get_version
+import hashlib
+import math
+
+LIST_KEY = 'lists:{}:{}:{}'
+
+
+class CachedListMixin:
+    """Serve the list from the cache, with conditional GET.
+
+    For tables that change rarely. The list carries the version of the
+    model's table as its ETag and the time of its last write as its
+    Last-Modified, a request with a matching 'If-None-Match' (or, without
+    it, an 'If-Modified-Since' not older than the last write) gets a 304
+    without body. Otherwise the serialized list is read from the cache,
+    keyed by the version and the query string, so filters and pages are
+    cached separately and every write to the table invalidates them.
+
+    The version is replaced by the signals of the model, see
+    ``panasystem.utils.versions``.
+    """
+
+    list_cache_timeout = None
+
+    def get_list_cache_timeout(self):
+        """Return how long a cached list lives."""
+        if self.list_cache_timeout is not None:
+            return self.list_cache_timeout
+        return getattr(settings, 'LIST_CACHE_TIMEOUT', 60 * 60)
+
+    def is_not_modified(self, request, etag, modified):
+        """Return whether the client already has this version of the list."""
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return etag in parse_etags(if_none_match) or if_none_match.strip() == '*'
+        since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        return since is not None and modified <= since
+
+    def list(self, request, *args, **kwargs):
+        """List the objects, from the cache when the table did not change."""
+        if 'stream' in request.query_params:
+            return super().list(request, *args, **kwargs)
+
+        model = self.get_queryset().model
+        version, modified = get_version(model)
+        modified = math.ceil(modified)
+        headers = {'ETag': f'"{version}"', 'Last-Modified': http_date(modified)}
+        if self.is_not_modified(request, headers['ETag'], modified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        key = LIST_KEY.format(model._meta.label_lower, version, path)
+        data = cache.get(key)
+        if data is None:
+            response = super().list(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            cache.set(key, response.data, self.get_list_cache_timeout())
+        else:
+            response = Response(data)
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+
+class StreamingListMixin:
+    """Stream the whole list with ``?stream=json`` or ``?stream=ndjson``.
+
+    The rows are read from the database in chunks of ``stream_chunk_size``
+    and serialized one by one while the response is sent, so the memory
+    does not grow with the size of the table. Filters, search and ordering
+    apply, pagination does not.
+    """
+
+    stream_chunk_size = 500
+    stream_content_types = {
+        'json': 'application/json',
+        'ndjson': 'application/x-ndjson'
+    }
+
+    def list(self, request, *args, **kwargs):
+        """List the objects, streaming them if asked."""
+        stream = request.query_params.get('stream')
+        if stream is None:
+            return super().list(request, *args, **kwargs)
+        if stream not in self.stream_content_types:
+            raise ValidationError({'stream': [f"Invalid stream. Use {' or '.join(self.stream_content_types)}."]})
+
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(
+            self.stream_rows(queryset, ndjson=stream == 'ndjson'),
+            content_type=self.stream_content_types[stream]
+        )
+
+    def stream_rows(self, queryset, ndjson=False):
+        """Yield the serialized rows as a JSON array or as JSON lines."""
+        encoder = JSONEncoder(ensure_ascii=False)
+        rows = queryset.iterator(chunk_size=self.stream_chunk_size)
+        if ndjson:
+            for instance in rows:
+                yield encoder.encode(self.get_serializer(instance).data) + '\n'
+            return
+
+        yield '['
+        for position, instance in enumerate(rows):
+            yield (',' if position else '') + encoder.encode(self.get_serializer(instance).data)
+        yield ']'
@@ -0,0 +1,239 @@
+"""Pagination classes."""
+
+# Django
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+
+# Django REST Framework
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+# Utilities
+from base64 import b64decode, b64encode
+import json
+
+
+def query_flag(request, name, default=False):
+    """Return a true/false query parameter as a boolean."""
+    value = request.query_params.get(name)
+    if value is None:
+        return default
+    return value.lower() in ('true', '1', 'yes')
+
+
+class PagePagination(PageNumberPagination):
+    """Page number pagination.
+
+    The total count costs a COUNT(*) of the filtered table, with
+    ``?count=false`` it is skipped and one more row is fetched to know if
+    there is a next page.
+    """
+
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Paginate with or without the total count."""
+        self.with_count = query_flag(request, 'count', default=True)
+        if self.with_count:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.request = request
+        try:
+            self.number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            self.number = 0
+        if self.number < 1:
+            raise NotFound(self.invalid_page_message.format(page_number=self.number, message='Invalid page.'))
+
+        offset = (self.number - 1) * page_size
+        results = list(queryset[offset:offset + page_size + 1])
+        self.has_next = len(results) > page_size
+        return results[:page_size]
+
+    def get_next_link(self):
+        """Return the next page link."""
+        if self.with_count:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.page_query_param, self.number + 1)
+
+    def get_previous_link(self):
+        """Return the previous page link."""
+        if self.with_count:
+            return super().get_previous_link()
+        if self.number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.number - 1)
+
+    def get_paginated_response(self, data):
+        """Return the page without the count when it was skipped."""
+        if self.with_count:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data
+        })
+
+
+class KeysetPagination(BasePagination):
+    """Keyset pagination on (field, pk), by date and newest first unless the view sets ``cursor_ordering``.
+
+    The cursor holds the field value and the pk of the last row of a page.
+    The next page is read with the row comparison (field, pk) < (value, pk),
+    or > when ascending, written as ``field <= value AND (field < value OR
+    pk < pk)`` so the index of the field bounds the scan. No OFFSET is
+    used: rows with equal values are told apart by their pk, and deep pages
+    cost the same as the first one. The ordering field must not be null.
+    The total count is only added with ``?count=true``.
+    """
+
+    ordering = ('-date', '-pk')
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_ordering(self, view):
+        """Return the ordering field and whether it is descending."""
+        first, second = getattr(view, 'cursor_ordering', self.ordering)
+        assert second.lstrip('-') == 'pk', 'The cursor ordering must end with the pk.'
+        return first.lstrip('-'), first.startswith('-')
+
+    def get_page_size(self, request):
+        """Return the page size asked, up to the maximum."""
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(size, self.max_page_size) if size > 0 else self.page_size
+
+    def decode_cursor(self, request, model):
+        """Return the (value, pk, backwards) of the cursor of the request, or None."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            value, pk, backwards = json.loads(b64decode(encoded.encode(), altchars=b'-_'))
+            return model._meta.get_field(self.field).to_python(value), int(pk), bool(backwards)
+        except (TypeError, ValueError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message) from None
+
+    def encode_cursor(self, row, backwards):
+        """Return the link to the page after (or before) a row."""
+        value = getattr(row, self.field)
+        value = value if isinstance(value, int) else str(value)
+        cursor = b64encode(json.dumps([value, row.pk, backwards]).encode(), altchars=b'-_').decode()
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return the page after (or before) the cursor, and count the filtered rows if asked."""
+        self.request = request
+        self.field, descending = self.get_ordering(view)
+        self.count = queryset.count() if query_flag(request, 'count') else None
+        size = self.get_page_size(request)
+        cursor = self.decode_cursor(request, queryset.model)
+        backwards = bool(cursor and cursor[2])
+
+        # Reading back towards the previous page walks the ordering in reverse.
+        downwards = descending != backwards
+        if cursor:
+            value, pk, _ = cursor
+            if downwards:
+                seek = Q(**{f'{self.field}__lte': value}) & (Q(**{f'{self.field}__lt': value}) | Q(pk__lt=pk))
+            else:
+                seek = Q(**{f'{self.field}__gte': value}) & (Q(**{f'{self.field}__gt': value}) | Q(pk__gt=pk))
+            queryset = queryset.filter(seek)
+        ordering = (f'-{self.field}', '-pk') if downwards else (self.field, 'pk')
+        rows = list(queryset.order_by(*ordering)[:size + 1])
+
+        more = len(rows) > size
+        self.page = rows[:size]
+        if backwards:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, more
+        else:
+            self.has_next, self.has_previous = more, cursor is not None
+        return self.page
+
+    def get_next_link(self):
+        """Return the link to the next page."""
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], backwards=False)
+
+    def get_previous_link(self):
+        """Return the link to the previous page."""
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], backwards=True)
+
+    def get_paginated_response(self, data):
+        """Return the page, with the count if asked."""
+        response = {'next': self.get_next_link(), 'previous': self.get_previous_link(), 'results': data}
+        if self.count is not None:
+            response = {'count': self.count, **response}
+        return Response(response)
+
+
+class SelectablePagination(BasePagination):
+    """Pagination selected by the client, the keyset cursor by default.
+
+    Infinite scroll clients only follow the next links of the cursor, which
+    never counts or offsets. ``?pagination=page`` uses page numbers, as
+    does a request with a ``page`` or an ``ordering`` (the cursor has its
+    own), ``?pagination=cursor`` or a ``cursor`` the keyset cursor, and
+    ``?pagination=none`` returns every row.
+    """
+
+    paginators = {
+        'page': PagePagination,
+        'cursor': KeysetPagination
+    }
+    default_mode = 'cursor'
+
+    def get_mode(self, request):
+        """Return the pagination mode of the request."""
+        params = request.query_params
+        mode = params.get('pagination')
+        if mode is None:
+            if 'cursor' in params:
+                mode = 'cursor'
+            elif 'page' in params or (self.default_mode == 'cursor' and 'ordering' in params):
+                mode = 'page'
+            else:
+                mode = self.default_mode
+        if mode != 'none' and mode not in self.paginators:
+            raise ValidationError({'pagination': [f"Invalid pagination. Use {', '.join(self.paginators)} or none."]})
+        return mode
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Paginate with the paginator of the selected mode."""
+        mode = self.get_mode(request)
+        if mode == 'none':
+            return None
+        self.paginator = self.paginators[mode]()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        """Return the response of the selected paginator."""
+        return self.paginator.get_paginated_response(data)
+
+
+class OptionalPagination(SelectablePagination):
+    """Selectable pagination that returns every row unless asked to paginate."""
+
+    default_mode = 'none'
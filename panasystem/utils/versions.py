@@ -0,0 +1,49 @@
+"""Model versions."""
+
+# Django
+from django.core.cache import cache
+from django.db import transaction
+
+# Utilities
+import time
+import uuid
+
+VERSION_KEY = 'versions:{}'
+
+
+def _version_key(model):
+    return VERSION_KEY.format(model._meta.label_lower)
+
+
+def _new_version():
+    return {'version': uuid.uuid4().hex[:16], 'modified': time.time()}
+
+
+def get_version(model):
+    """Return the version of a model's table and when it last changed.
+
+    The version is a random stamp kept in the cache and replaced on every
+    write, so it costs no query. When the cache lost it a new one is made,
+    which only invalidates what was cached with the old one.
+    """
+    key = _version_key(model)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), None)
+        version = cache.get(key) or _new_version()
+    return version['version'], version['modified']
+
+
+def bump_version(model):
+    """Replace the version of a model's table after a write.
+
+    The version is replaced right away and again when the transaction
+    commits, so a read made in between cannot be cached as the new version.
+    """
+    key = _version_key(model)
+
+    def bump():
+        cache.set(key, _new_version(), None)
+
+    bump()
+    transaction.on_commit(bump)
@@ -0,0 +1,118 @@
+"""Async views."""
+
+# Django
+from django.db import transaction
+from django.http import HttpResponse, JsonResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+
+# Django REST Framework
+from rest_framework import exceptions
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+# Utilities
+from asgiref.sync import sync_to_async
+
+
+class AsyncAPIView(View):
+    """Read-only API view served with Django's async ORM.
+
+    Under ASGI the worker keeps serving other requests while the queries
+    of this one run, so slow clients and slow queries do not hold a whole
+    worker. It authenticates and checks permissions like the DRF views
+    (the JWT user comes from the token claims, the blacklist check may
+    query, so it runs off the event loop) and applies the view's
+    ``filter_backends``. Subclasses implement ``async def get`` returning
+    the data to render as JSON.
+
+    The views are not wrapped in ATOMIC_REQUESTS, which does not support
+    async views, they only read.
+    """
+
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    permission_classes = (IsAuthenticated,)
+    filter_backends = ()
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 100
+    http_method_names = ['get', 'options']
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        """Return the view, outside the request transaction."""
+        return transaction.non_atomic_requests(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        """Authenticate, check the permissions and render the data or the error."""
+        self.request = Request(request, authenticators=[auth() for auth in self.authentication_classes])
+        try:
+            await sync_to_async(self.check_permissions)(self.request)
+            data = await super().dispatch(self.request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self.handle_exception(exc)
+        if isinstance(data, HttpResponse):
+            return data
+        return JsonResponse(data, encoder=JSONEncoder, safe=False, json_dumps_params={'ensure_ascii': False})
+
+    def check_permissions(self, request):
+        """Raise if the request is not permitted, as DRF does."""
+        for permission in [permission() for permission in self.permission_classes]:
+            if not permission.has_permission(request, self):
+                if request.authenticators and not request.successful_authenticator:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied(getattr(permission, 'message', None))
+
+    def handle_exception(self, exc):
+        """Return the error response of an API exception."""
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        response = JsonResponse(data, encoder=JSONEncoder, safe=False, status=exc.status_code)
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            authenticator = self.authentication_classes[0]() if self.authentication_classes else None
+            header = authenticator.authenticate_header(self.request) if authenticator else None
+            if header:
+                response['WWW-Authenticate'] = header
+            else:
+                response.status_code = 403
+        return response
+
+    def filter_queryset(self, queryset):
+        """Apply the filter backends, the filter forms may query to validate."""
+        for backend in self.filter_backends:
+            queryset = backend().filter_queryset(self.request, queryset, self)
+        return queryset
+
+    async def afilter_queryset(self, queryset):
+        """Apply the filter backends off the event loop."""
+        return await sync_to_async(self.filter_queryset)(queryset)
+
+    async def apaginate(self, queryset, serialize):
+        """Return a page of the queryset, numbered by '?page' and sized by '?page_size'."""
+        try:
+            number = int(self.request.query_params.get('page', 1))
+            size = min(int(self.request.query_params.get('page_size', self.page_size)), self.max_page_size)
+        except ValueError:
+            raise exceptions.NotFound('Invalid page.') from None
+        if number < 1 or size < 1:
+            raise exceptions.NotFound('Invalid page.')
+
+        count = await queryset.acount()
+        offset = (number - 1) * size
+        if offset and offset >= count:
+            raise exceptions.NotFound('Invalid page.')
+        results = [obj async for obj in queryset[offset:offset + size]]
+
+        url = self.request.build_absolute_uri()
+        previous = None
+        if number == 2:
+            previous = remove_query_param(url, 'page')
+        elif number > 2:
+            previous = replace_query_param(url, 'page', number - 1)
+        return {
+            'count': count,
+            'next': replace_query_param(url, 'page', number + 1) if offset + size < count else None,
+            'previous': previous,
+            'results': serialize(results)
+        }
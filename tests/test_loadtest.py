@@ -0,0 +1,25 @@
+import pytest
+
+from loadtest import percentile, summarize
+
+
+@pytest.mark.parametrize(
+    ("values", "percent", "expected"),
+    [
+        ([], 50, None),
+        ([1], 99, 1),
+        ([1, 2, 3, 4], 50, 2),
+        (list(range(1, 101)), 99, 99),
+        (list(range(1, 101)), 100, 100),
+    ],
+)
+def test_percentile(values: list[int], percent: int, expected: int | None):
+    assert percentile(values, percent) == expected
+
+
+def test_summarize():
+    results = [(200, 0.1), (200, 0.3), (500, 0.2), (None, 30)]
+    summary = summarize("http://localhost/", results, elapsed=2)
+    assert "2 ok (1.0/s), 1 errors, 1 timeouts" in summary
+    assert "p50 100 ms" in summary
+    assert "p99 300 ms" in summary